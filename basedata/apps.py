@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class BasedataConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "basedata"
+
+    def ready(self):
+        from django.contrib.auth.models import Group as Role
+
+        from basedata.models import ChallengeGroup, ChallengeType, Department, Position
+        from core.cache import invalidate_on_change
+        from core.versions import track_model_versions
+
+        track_model_versions(ChallengeType, ChallengeGroup, Department, Position, Role)
+        invalidate_on_change(ChallengeType, ChallengeGroup, Department, Position, Role)
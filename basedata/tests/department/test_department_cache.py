@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from users.models import Role
+
+User = get_user_model()
+
+
+class DepartmentCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        # Create users
+        Role.objects.create(name="Super-Admin")
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+
+        # Create a department
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            department_description="Handles technical tasks.",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Authenticate as admin user for tests
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.list_create_url = reverse("department-list", kwargs={"version": "v1"})
+        self.detail_url = reverse(
+            "department-detail", kwargs={"version": "v1", "pk": self.department.id}
+        )
+
+    def _get_department_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query["sql"]
+            for query in queries.captured_queries
+            if "basedata_department" in query["sql"]
+        ]
+
+    def test_departments_are_served_from_cache(self):
+        """
+        Ensure repeated reads do not query the departments table.
+        """
+        for url in [self.list_create_url, self.detail_url]:
+            self.assertTrue(self._get_department_queries(url))
+            self.assertEqual(
+                self._get_department_queries(url),
+                [],
+                f"Second read of '{url}' should be served from cache",
+            )
+
+    def test_cached_list_keeps_response_format(self):
+        """
+        Ensure cached responses are wrapped like uncached ones.
+        """
+        first_response = self.client.get(self.list_create_url)
+        second_response = self.client.get(self.list_create_url)
+        self.assertEqual(first_response.json(), second_response.json())
+        self.assertEqual(second_response.json()["data"]["count"], 1)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "api.example.com"])
+    def test_cached_links_point_to_the_requested_host(self):
+        """
+        Ensure cached pagination links are not served to another host.
+        """
+        Department.objects.create(
+            department_name="Finance",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        for host in ["testserver", "api.example.com", "api.example.com"]:
+            response = self.client.get(
+                self.list_create_url, {"limit": 1}, HTTP_HOST=host
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(
+                response.json()["data"]["next"].startswith(f"http://{host}/"), host
+            )
+
+    def test_update_department_invalidates_cache(self):
+        """
+        Ensure updating a department is visible on the next read.
+        """
+        self.client.get(self.detail_url)
+
+        data = {"name": "Software Engineering"}
+        self.client.patch(self.detail_url, data, format="json")
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.json()["data"]["name"], "Software Engineering")
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from users.models import Role
+
+User = get_user_model()
+
+
+class DepartmentConditionalRequestsTestCase(APITestCase):
+    def setUp(self):
+        # Create users
+        Role.objects.create(name="Super-Admin")
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+
+        # Create a department
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            department_description="Handles technical tasks.",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Authenticate as admin user for tests
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.list_create_url = reverse("department-list", kwargs={"version": "v1"})
+        self.detail_url = reverse(
+            "department-detail", kwargs={"version": "v1", "pk": self.department.id}
+        )
+
+    def test_unchanged_departments_are_not_modified(self):
+        """
+        Ensure polling unchanged departments returns 304.
+        """
+        for url in [self.list_create_url, self.detail_url]:
+            etag = self.client.get(url)["ETag"]
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_304_NOT_MODIFIED,
+                f"Unchanged '{url}' should not be modified",
+            )
+
+    def test_create_department_invalidates_etag(self):
+        """
+        Ensure creating a department changes the ETag of the list.
+        """
+        etag = self.client.get(self.list_create_url)["ETag"]
+
+        data = {"name": "Finance", "description": "Handles financial matters."}
+        self.client.post(self.list_create_url, data, format="json")
+
+        response = self.client.get(self.list_create_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["count"], 2)
+
+    def test_delete_department_invalidates_etag(self):
+        """
+        Ensure deleting a department changes the ETag of the list.
+        """
+        etag = self.client.get(self.list_create_url)["ETag"]
+
+        self.client.delete(self.detail_url)
+
+        response = self.client.get(self.list_create_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["count"], 0)
@@ -0,0 +1,112 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department, Position
+from users.models import Role
+
+User = get_user_model()
+
+
+class PositionCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        leads_role = Role.objects.create(name="Leads")
+        leads_role.permissions.add(*Permission.objects.filter(codename="view_position"))
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.lead_user = User.objects.create_user(
+            email="lead@email.com",
+            password="1234abcd!A",
+            first_name="Lead",
+            last_name="User",
+        )
+        self.lead_user.groups.add(leads_role)
+        self.lead_user2 = User.objects.create_user(
+            email="lead2@email.com",
+            password="1234abcd!A",
+            first_name="Lead2",
+            last_name="User",
+        )
+        self.lead_user2.groups.add(leads_role)
+
+        # Create departments and positions
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.department2 = Department.objects.create(
+            department_name="HR",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.position = Position.objects.create(
+            department=self.department,
+            position_name="Engineering Lead",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.position2 = Position.objects.create(
+            department=self.department2,
+            position_name="HR Lead",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.lead_user.position = self.position
+        self.lead_user.save()
+        self.lead_user2.position = self.position2
+        self.lead_user2.save()
+
+        # Generate JWT tokens
+        self.lead_token = str(RefreshToken.for_user(self.lead_user).access_token)
+        self.lead2_token = str(RefreshToken.for_user(self.lead_user2).access_token)
+
+        # Define URLs
+        self.list_create_url = reverse("position-list", kwargs={"version": "v1"})
+
+    def _list_position_names(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.get(self.list_create_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [position["name"] for position in response.json()["data"]["results"]]
+
+    def test_cached_lists_are_scoped_per_lead_department(self):
+        """
+        Ensure a lead never receives another department's cached positions.
+        """
+        for _ in range(2):
+            self.assertEqual(
+                self._list_position_names(self.lead_token), ["Engineering Lead"]
+            )
+            self.assertEqual(self._list_position_names(self.lead2_token), ["HR Lead"])
+
+    def test_department_rename_invalidates_cached_positions(self):
+        """
+        Ensure positions embedding a renamed department are not served stale.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.lead_token}")
+        self.client.get(self.list_create_url)
+
+        self.department.department_name = "Software Engineering"
+        self.department.save()
+
+        response = self.client.get(self.list_create_url)
+        self.assertEqual(
+            response.json()["data"]["results"][0]["department"]["name"],
+            "Software Engineering",
+        )
@@ -13,9 +13,14 @@ from basedata.serializers import (
     PositionSerializer,
     RoleSerializer,
 )
+from core.mixins import CacheResponseMixin, ConditionalGetMixin
+from users.claims import get_role_claims, has_role
+from users.models import User
 
 
-class ChallengeTypeViewSet(viewsets.ModelViewSet):
+class ChallengeTypeViewSet(
+    ConditionalGetMixin, CacheResponseMixin, viewsets.ModelViewSet
+):
     queryset = ChallengeType.objects.all()
     serializer_class = ChallengeTypeSerializer
     search_fields = ["challenge_type_name"]
@@ -47,11 +52,15 @@ class ChallengeTypeViewSet(viewsets.ModelViewSet):
         return super().perform_update(serializer)
 
 
-class ChallengeGroupViewSet(viewsets.ModelViewSet):
+class ChallengeGroupViewSet(
+    ConditionalGetMixin, CacheResponseMixin, viewsets.ModelViewSet
+):
     queryset = ChallengeGroup.objects.all()
     serializer_class = ChallengeGroupSerializer
     search_fields = ["challenge_group_name"]
     ordering_fields = ["challenge_group_name"]
+    conditional_models = [ChallengeType]
+    cache_models = [ChallengeType]
 
     @extend_schema(
         parameters=[
@@ -79,7 +88,7 @@ class ChallengeGroupViewSet(viewsets.ModelViewSet):
         return super().perform_update(serializer)
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(ConditionalGetMixin, CacheResponseMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
     search_fields = ["department_name"]
@@ -111,24 +120,36 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         return super().perform_update(serializer)
 
 
-class PositionViewSet(viewsets.ModelViewSet):
+class PositionViewSet(ConditionalGetMixin, CacheResponseMixin, viewsets.ModelViewSet):
     queryset = Position.objects.all()
     serializer_class = PositionSerializer
     search_fields = ["position_name"]
     filterset_class = PositionFilter
     ordering_fields = ["position_name"]
+    conditional_models = [Department, User]
+    cache_models = [Department]
 
-    def get_queryset(self):
-        user = self.request.user
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
+    def get_lead_department(self):
+        """Returns the id of the department leads' position lists are scoped to."""
+        claims = get_role_claims(self.request)
+        user_is_lead = has_role(self.request, "Leads")
+
+        if self.action == "list" and user_is_lead and claims.department_id:
+            return claims.department_id
 
-        if self.action == "list" and user_is_lead and user.position:
-            return Position.objects.filter(department=user.position.department)
+        return None
+
+    def get_queryset(self):
+        department = self.get_lead_department()
+        if department:
+            return Position.objects.filter(department=department)
 
         return super().get_queryset()
 
+    def get_cache_scope(self):
+        department = self.get_lead_department()
+        return str(department) if department else ""
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -168,7 +189,7 @@ class PositionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(ConditionalGetMixin, CacheResponseMixin, viewsets.ModelViewSet):
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
     search_fields = ["name"]
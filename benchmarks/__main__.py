@@ -0,0 +1,66 @@
+"""Runs the endpoint benchmarks against the configured database, e.g. one
+filled by the `generate_load_data` command:
+
+    python -m benchmarks --repeat 5 --role Leads --only task-
+
+Appends the run to the history file and exits with status 1 when it
+regresses from the last passing run on the same dataset.
+"""
+
+import argparse
+import os
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--role", action="append", dest="roles")
+    parser.add_argument("--only", help="Run the scenarios containing this text")
+    parser.add_argument("--history", help="Defaults to benchmarks/history.json")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25)
+    parser.add_argument("--latency-floor-ms", type=float, default=5.0)
+    parser.add_argument("--query-tolerance", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="Do not record the run")
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+    from benchmarks import runner
+
+    history_path = options.history or runner.DEFAULT_HISTORY_PATH
+    runs = runner.load_history(history_path)
+    dataset = runner.get_dataset()
+    baseline = runner.get_baseline(runs, dataset)
+
+    results = runner.run_benchmarks(
+        repeat=options.repeat,
+        warmup=options.warmup,
+        roles=options.roles,
+        only=options.only,
+    )
+    regressions = runner.find_regressions(
+        results,
+        baseline["results"] if baseline else {},
+        options.latency_tolerance,
+        options.latency_floor_ms,
+        options.query_tolerance,
+    )
+
+    if not options.no_save:
+        runs.append(runner.make_run(results, dataset, regressions))
+        runner.save_history(history_path, runs)
+
+    if baseline is None:
+        print("No previous run on this dataset to compare with")
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Timing of the benchmark scenarios and comparison with their history.
+
+Every request runs in a rolled back transaction with cold caches, as the
+user of a role authenticated by JWT, and is timed through the whole
+middleware stack. A result regresses from the baseline, the last passing
+run on the same dataset, when it makes more queries or gets slower than the
+tolerances allow, or when its status code changes.
+"""
+
+import json
+import statistics
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from benchmarks.scenarios import Fixtures, get_role_users, get_scenarios
+from core.cache import local_cache
+from core.instrumentation import profile_request
+from core.schema import get_code_version
+from tasks.models import KSI, Task
+from users.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent / "history.json"
+
+
+def get_benchmark_settings():
+    return {
+        # A private cache, cleared before every request
+        "CACHES": {
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "benchmarks",
+            }
+        },
+        "EMAIL_BACKEND": "django.core.mail.backends.locmem.EmailBackend",
+        "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+        "REQUEST_INSTRUMENTATION": False,
+        "SLOW_QUERY_THRESHOLD": 0,
+    }
+
+
+def get_dataset():
+    """
+    Identifies the dataset, as only runs on the same one are comparable.
+    """
+    return {
+        "vendor": connection.vendor,
+        "users": User.objects.count(),
+        "ksis": KSI.objects.count(),
+        "tasks": Task.objects.count(),
+    }
+
+
+def clear_caches():
+    caches["default"].clear()
+    local_cache.clear()
+
+
+def run_scenario(client, scenario, fixtures, repeat, warmup):
+    timings = []
+    for iteration in range(warmup + repeat):
+        url_kwargs, payload = scenario.build(fixtures)
+        url = reverse(scenario.url_name, kwargs={"version": "v1", **url_kwargs})
+        clear_caches()
+
+        with transaction.atomic(), profile_request(detailed=False) as profile:
+            if scenario.method == "get":
+                response = client.get(url)
+            else:
+                send = getattr(client, scenario.method)
+                response = send(url, payload, format="json")
+            # Streamed content runs most of its queries while iterated
+            if response.streaming:
+                b"".join(response.streaming_content)
+            transaction.set_rollback(True)
+
+        if iteration >= warmup:
+            timings.append(profile.total_time * 1000)
+
+    return {
+        "status": response.status_code,
+        "queries": profile.query_count,
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+    }
+
+
+def run_benchmarks(repeat=5, warmup=1, roles=None, only=None, write=print):
+    """
+    Returns the results of the scenarios whose name contains `only`, keyed
+    by `<role>/<scenario>`, for each of `roles`.
+    """
+    results = {}
+    with override_settings(**get_benchmark_settings()):
+        scenarios = [
+            scenario
+            for scenario in get_scenarios()
+            if not only or only in scenario.name
+        ]
+        for role, user in get_role_users().items():
+            if roles and role not in roles:
+                continue
+
+            client = APIClient()
+            token = TokenObtainPairSerializer.get_token(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            fixtures = Fixtures.load(user)
+
+            for scenario in scenarios:
+                result = run_scenario(client, scenario, fixtures, repeat, warmup)
+                key = f"{role}/{scenario.name}"
+                results[key] = result
+                write(
+                    f"{key:<45} {result['status']:>3}"
+                    f" {result['queries']:>5} queries"
+                    f" {result['median_ms']:>9.1f}ms"
+                )
+    return results
+
+
+def find_regressions(
+    results, baseline, latency_tolerance, latency_floor_ms, query_tolerance
+):
+    """
+    Describes each result worse than its baseline result.
+
+    Latency regresses past `latency_tolerance` (a fraction of the baseline)
+    plus `latency_floor_ms`, which absorbs the noise of fast endpoints.
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+
+        if result["status"] != previous["status"]:
+            regressions.append(
+                f"{key}: status {previous['status']} -> {result['status']}"
+            )
+        if result["queries"] > previous["queries"] + query_tolerance:
+            regressions.append(
+                f"{key}: {previous['queries']} -> {result['queries']} queries"
+            )
+        max_latency = previous["median_ms"] * (1 + latency_tolerance)
+        if result["median_ms"] > max_latency + latency_floor_ms:
+            regressions.append(
+                f"{key}: {previous['median_ms']}ms -> {result['median_ms']}ms"
+            )
+    return regressions
+
+
+def load_history(path):
+    path = Path(path)
+    if not path.exists():
+        return []
+    return json.loads(path.read_text())["runs"]
+
+
+def save_history(path, runs):
+    Path(path).write_text(json.dumps({"runs": runs}, indent=2) + "\n")
+
+
+def get_baseline(runs, dataset):
+    for run in reversed(runs):
+        if run["dataset"] == dataset and not run["regressions"]:
+            return run
+    return None
+
+
+def make_run(results, dataset, regressions):
+    return {
+        "date": timezone.now().isoformat(),
+        "code_version": get_code_version(),
+        "dataset": dataset,
+        "results": results,
+        "regressions": regressions,
+    }
@@ -0,0 +1,264 @@
+"""Endpoints measured by the benchmark suite.
+
+Each scenario builds its request from a `Fixtures` sample of the dataset
+visible to the user it runs as.
+Payloads respect the serializers' invariants, e.g. weights of 0 so sibling
+weights of the generated data keep summing to 100.
+"""
+
+import secrets
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from string import ascii_lowercase
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group as Role
+from django.db.models import F
+
+from basedata.models import ChallengeGroup, ChallengeType, Department, Position
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+
+User = get_user_model()
+
+ROLES = ["Super-Admin", "Leads", "Experts", "HR", "Operation-Team"]
+
+# Router basename and model of every resource with list, retrieve and create
+RESOURCES = {
+    "department": Department,
+    "position": Position,
+    "role": Role,
+    "challenge_type": ChallengeType,
+    "challenge_group": ChallengeGroup,
+    "ksi": KSI,
+    "milestone": Milestone,
+    "kpi": KPI,
+    "major_activity": MajorActivity,
+    "task": Task,
+    "user": User,
+}
+
+
+def no_arguments(fixtures):
+    return {}, None
+
+
+# `build` returns the URL kwargs and payload of the request from the fixtures
+Scenario = namedtuple(
+    "Scenario", ["name", "method", "url_name", "build"], defaults=[no_arguments]
+)
+
+
+def get_role_users():
+    """
+    Returns a user of every role in `ROLES` that has one.
+    """
+    users = {}
+    for role in ROLES:
+        queryset = User.objects.filter(is_active=True, is_not_deactivated=True)
+        if role == "Super-Admin":
+            queryset = queryset.filter(is_superuser=True)
+        else:
+            queryset = queryset.filter(groups__name=role, is_superuser=False)
+        # Users holding a position see their department's data
+        user = queryset.order_by(F("position").asc(nulls_last=True)).first()
+        if user:
+            users[role] = user
+    return users
+
+
+class Fixtures:
+    """
+    A sample of the dataset the scenarios of a user act on.
+    """
+
+    def __init__(self, user, objects, vacant_position, target_user):
+        self.user = user
+        self.objects = objects
+        self.vacant_position = vacant_position
+        self.target_user = target_user
+
+    @classmethod
+    def load(cls, user):
+        objects = {
+            basename: model.objects.order_by("pk").first()
+            for basename, model in RESOURCES.items()
+        }
+
+        # The hierarchy of a task the user can see, so dates and parents line up
+        tasks = Task.objects.filter(parent_task=None).order_by("pk")
+        task = user.position and tasks.filter(positions=user.position).first()
+        task = task or tasks.first()
+        if task:
+            objects["task"] = task
+            objects["major_activity"] = task.major_activity
+            objects["kpi"] = task.major_activity.kpi
+            objects["milestone"] = objects["kpi"].milestone
+            objects["ksi"] = objects["milestone"].ksi
+            objects["department"] = objects["ksi"].department
+
+        return cls(
+            user=user,
+            objects=objects,
+            vacant_position=Position.objects.filter(user__isnull=True).first(),
+            target_user=User.objects.filter(is_superuser=False)
+            .exclude(pk=user.pk)
+            .order_by("pk")
+            .first(),
+        )
+
+    def pk(self, basename):
+        return str(self.objects[basename].pk)
+
+
+def random_letters(count):
+    return "".join(secrets.choice(ascii_lowercase) for _ in range(count))
+
+
+def unique_name(prefix):
+    return f"{prefix} {uuid.uuid4().hex[:8]}"
+
+
+def detail(basename):
+    return lambda fixtures: ({"pk": fixtures.pk(basename)}, None)
+
+
+def user_detail(fixtures, user=None):
+    # Djoser's viewset looks users up by "id"
+    return {"id": str((user or fixtures.target_user).pk)}
+
+
+def create_payloads(fixtures):
+    ksi = fixtures.objects["ksi"]
+    milestone = fixtures.objects["milestone"]
+    kpi = fixtures.objects["kpi"]
+    major_activity = fixtures.objects["major_activity"]
+    return {
+        "department": {"name": unique_name("Department")},
+        "position": {
+            "name": unique_name("Position"),
+            "department": fixtures.pk("department"),
+        },
+        "role": {"name": unique_name("Role")},
+        "challenge_type": {"name": unique_name("Challenge type")},
+        "challenge_group": {
+            "name": unique_name("Challenge group"),
+            "challenge_type": fixtures.pk("challenge_type"),
+        },
+        "ksi": {
+            "name": unique_name("KSI"),
+            "start_date": str(ksi.start_date),
+            "end_date": str(ksi.end_date),
+            "department": fixtures.pk("department"),
+            "status": "not_started",
+        },
+        "milestone": {
+            "name": unique_name("Milestone"),
+            "start_date": str(milestone.start_date),
+            "end_date": str(milestone.end_date),
+            "ksi": fixtures.pk("ksi"),
+            "weight": "0",
+            "status": "not_started",
+        },
+        "kpi": {
+            "name": unique_name("KPI"),
+            "start_date": str(kpi.start_date),
+            "end_date": str(kpi.end_date),
+            "milestone": fixtures.pk("milestone"),
+            "status": "pending",
+        },
+        "major_activity": {
+            "name": unique_name("Major activity"),
+            "start_date": str(kpi.start_date),
+            "end_date": str(
+                min(kpi.end_date, kpi.start_date + MajorActivity.MAX_DAYS_SPAN)
+            ),
+            "kpi": fixtures.pk("kpi"),
+            "department": fixtures.pk("department"),
+            "weight": "0",
+            "status": "not_started",
+        },
+        "task": {
+            "name": unique_name("Task"),
+            "start_date": str(major_activity.start_date),
+            "end_date": str(
+                min(
+                    major_activity.end_date,
+                    major_activity.start_date + timedelta(days=1),
+                )
+            ),
+            "major_activity": fixtures.pk("major_activity"),
+            "weight": "0",
+        },
+        "user": {
+            # Signup only accepts first.last@ addresses of the allowed domains
+            "email": (
+                f"{random_letters(8)}.{random_letters(8)}"
+                f"@{settings.ALLOWED_EMAIL_DOMAINS[0]}"
+            ),
+            "password": "Quarterly-Review-2024!",
+        },
+    }
+
+
+def create(basename):
+    return lambda fixtures: ({}, create_payloads(fixtures)[basename])
+
+
+def get_scenarios():
+    scenarios = []
+    for basename in RESOURCES:
+        scenarios += [
+            Scenario(f"{basename}-list", "get", f"{basename}-list"),
+            Scenario(
+                f"{basename}-retrieve",
+                "get",
+                f"{basename}-detail",
+                # Users other than admins may only see themselves
+                (lambda fixtures: (user_detail(fixtures, fixtures.user), None))
+                if basename == "user"
+                else detail(basename),
+            ),
+            Scenario(
+                f"{basename}-create",
+                "post",
+                # Users are created by signing up
+                "user-signup" if basename == "user" else f"{basename}-list",
+                create(basename),
+            ),
+        ]
+
+    scenarios += [
+        Scenario("ksi-structure", "get", "ksi-structure"),
+        Scenario("major_activity-assigned", "get", "major_activity-assigned"),
+        Scenario(
+            "task-add_positions",
+            "patch",
+            "task-add-positions",
+            lambda fixtures: (
+                {"pk": fixtures.pk("task")},
+                {"positions": [fixtures.pk("position")]},
+            ),
+        ),
+        Scenario(
+            "user-assign_role",
+            "patch",
+            "user-assign-role",
+            lambda fixtures: (user_detail(fixtures), {"role": fixtures.pk("role")}),
+        ),
+        Scenario(
+            "user-assign_position",
+            "patch",
+            "user-assign-position",
+            lambda fixtures: (
+                user_detail(fixtures),
+                {
+                    "position": str(fixtures.vacant_position.pk)
+                    if fixtures.vacant_position
+                    else None
+                },
+            ),
+        ),
+    ]
+    return scenarios
@@ -0,0 +1,217 @@
+"""Database routing for config project.
+
+Reads of safe (GET, HEAD, OPTIONS) requests go to one of the replicas in
+`DATABASE_REPLICAS`, everything else goes to the primary ("default").
+
+A user is pinned to the primary for `DATABASE_REPLICA_PIN_TIMEOUT` seconds
+after any unsafe request, so they read their own writes, and replicas
+lagging more than `DATABASE_REPLICA_MAX_LAG` seconds are left out until they
+catch up.
+"""
+
+import contextlib
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+PRIMARY = "default"
+PIN_KEY_PREFIX = "config.db_routers.pinned"
+
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+"""
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.replica = None
+
+
+_routing_state = ContextVar("routing_state", default=None)
+
+_replica_health = {}
+_replica_health_lock = threading.Lock()
+
+
+def get_replica_lag(alias):
+    """
+    Returns how many seconds the replica `alias` is behind the primary.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(REPLICA_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def is_replica_healthy(alias):
+    # Lag is checked at most once per interval in each process
+    now = time.monotonic()
+    with _replica_health_lock:
+        checked_at, healthy = _replica_health.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < (
+        settings.DATABASE_REPLICA_CHECK_INTERVAL
+    ):
+        return healthy
+
+    try:
+        healthy = get_replica_lag(alias) <= settings.DATABASE_REPLICA_MAX_LAG
+    except DatabaseError:
+        healthy = False
+
+    with _replica_health_lock:
+        _replica_health[alias] = (now, healthy)
+    return healthy
+
+
+def reset_replica_health():
+    with _replica_health_lock:
+        _replica_health.clear()
+
+
+def get_pin_key(user_id):
+    return f"{PIN_KEY_PREFIX}:{user_id}"
+
+
+def pin_to_primary(user_id):
+    cache.set(get_pin_key(user_id), 1, timeout=settings.DATABASE_REPLICA_PIN_TIMEOUT)
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(get_pin_key(user_id)) is not None
+
+
+def get_request_user_id(request):
+    """
+    Returns the id of the requesting user without querying the database,
+    from the access token or, for session users, the session.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is not None:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        try:
+            token = authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            return None
+        return token.get(jwt_settings.USER_ID_CLAIM)
+
+    session = getattr(request, "session", None)
+    if session is not None and settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return session.get("_auth_user_id")
+    return None
+
+
+@contextlib.contextmanager
+def use_primary():
+    """
+    Sends every read inside the block to the primary, e.g. when the result
+    outlives the request and must not capture replica lag.
+    """
+    token = _routing_state.set(RoutingState(use_replica=False))
+    try:
+        yield
+    finally:
+        _routing_state.reset(token)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decides for each request whether its reads may be served by a replica
+    and pins users to the primary after they write.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        token = _routing_state.set(self.get_routing_state(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+
+        self.pin_writer(request)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        state = await sync_to_async(self.get_routing_state)(request)
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+
+        await sync_to_async(self.pin_writer)(request)
+        return response
+
+    def get_routing_state(self, request):
+        use_replica = request.method in SAFE_METHODS
+        if use_replica:
+            user_id = get_request_user_id(request)
+            use_replica = user_id is None or not is_pinned_to_primary(user_id)
+        return RoutingState(use_replica=use_replica)
+
+    def pin_writer(self, request):
+        # The view has authenticated the user by now
+        user = getattr(request, "user", None)
+        if request.method not in SAFE_METHODS and user and user.is_authenticated:
+            pin_to_primary(user.pk)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica:
+            return PRIMARY
+
+        # Stick to one replica per request for a consistent snapshot
+        if state.replica is None:
+            replicas = [
+                alias
+                for alias in settings.DATABASE_REPLICAS
+                if is_replica_healthy(alias)
+            ]
+            state.replica = random.choice(replicas) if replicas else PRIMARY  # noqa: S311
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,106 @@
+"""Gunicorn configuration for config project.
+
+Usage: gunicorn -c config/gunicorn.conf.py
+
+GUNICORN_WORKER_CLASS selects the worker model:
+- sync: one request at a time per worker process, serving config.wsgi
+- gthread: GUNICORN_THREADS requests at a time per worker, serving config.wsgi
+- uvicorn: an asyncio event loop per worker, serving config.asgi
+
+Send SIGHUP to the master process to gracefully replace the workers. The
+application is preloaded in the master, so deploying new code needs a
+restart (or SIGUSR2 followed by SIGTERM to the old master).
+"""
+
+import os
+import shutil
+
+from environs import Env
+from marshmallow.validate import OneOf
+
+env = Env()
+env.read_env()
+
+WORKER_CLASSES = {
+    "sync": ("sync", "config.wsgi:application"),
+    "gthread": ("gthread", "config.wsgi:application"),
+    "uvicorn": ("uvicorn_worker.UvicornWorker", "config.asgi:application"),
+}
+
+
+def get_cpu_count():
+    # Honour the CPUs the container is pinned to rather than the host's
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_default_workers(worker_model):
+    # Blocking workers only serve one request each, so oversubscribe the CPUs
+    if worker_model == "sync":
+        return get_cpu_count() * 2 + 1
+    return get_cpu_count() + 1
+
+
+worker_model = env.str(
+    "GUNICORN_WORKER_CLASS", default="gthread", validate=OneOf(WORKER_CLASSES)
+)
+worker_class, wsgi_app = WORKER_CLASSES[worker_model]
+
+# Let the async read views run on the event loop. Persistent connections
+# leak under ASGI, where requests don't reuse threads, so pool them instead.
+if worker_model == "uvicorn":
+    os.environ.setdefault("ASYNC_VIEWS", "true")
+    os.environ.setdefault("DB_POOL", "true")
+
+bind = env.str("GUNICORN_BIND", default="0.0.0.0:8000")
+workers = env.int("GUNICORN_WORKERS", default=get_default_workers(worker_model))
+# Tell Django how many workers serve it, see core.checks
+os.environ["GUNICORN_WORKERS"] = str(workers)
+threads = env.int("GUNICORN_THREADS", default=4)
+
+# Import Django once in the master and share the memory with the workers
+preload_app = env.bool("GUNICORN_PRELOAD", default=True)
+
+# Recycle workers to bound memory growth, staggered so they don't all restart
+max_requests = env.int("GUNICORN_MAX_REQUESTS", default=1000)
+max_requests_jitter = env.int("GUNICORN_MAX_REQUESTS_JITTER", default=100)
+
+timeout = env.int("GUNICORN_TIMEOUT", default=30)
+graceful_timeout = env.int("GUNICORN_GRACEFUL_TIMEOUT", default=30)
+keepalive = env.int("GUNICORN_KEEPALIVE", default=5)
+
+# Heartbeat files on the container's overlay filesystem can stall workers
+SHM_DIR = "/dev/shm"  # noqa: S108
+worker_tmp_dir = SHM_DIR if os.path.isdir(SHM_DIR) else None
+
+accesslog = "-"
+errorlog = "-"
+
+# Workers write their metrics here, aggregated when /metrics is scraped
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(SHM_DIR, "prometheus"))
+
+
+def on_starting(server):
+    # Drop the samples of a previous run
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+    # Report the caches the workers can't share, once Django is loaded
+    if server.cfg.preload_app:
+        from django.core.management import call_command
+
+        call_command("check", tags=["caches"])
+
+
+def post_fork(server, worker):
+    # Never share connections opened while preloading across processes
+    from django.db import connections
+
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -56,12 +56,16 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "core.middleware.ProfilerMiddleware",
+    "core.middleware.RequestInstrumentationMiddleware",
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.db_routers.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "social_django.middleware.SocialAuthExceptionMiddleware",
@@ -90,6 +94,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Serve hierarchy reads as coroutines, enabled by gunicorn's uvicorn workers
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+# Worker processes of gunicorn, which sets it when serving. Unset otherwise,
+# e.g. under runserver. State every worker must see can't live in
+# process-local caches with several of them, see core.checks.
+SERVER_WORKERS = env.int("GUNICORN_WORKERS", default=None)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -102,8 +113,108 @@ DATABASES = {
         'PASSWORD': env.str("DB_PASSWORD"),  # Replace with your actual password
         'HOST': env.str("DB_HOST"),  # Use the container's IP
         'PORT': env.str("DB_PORT"),
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': env.int("DB_CONN_MAX_AGE", default=60),
+        'CONN_HEALTH_CHECKS': env.bool("DB_CONN_HEALTH_CHECKS", default=True),
     }
 }
+
+# In-process connection pool, requires psycopg 3 with psycopg-pool. It replaces
+# persistent connections and, unlike them, also pays off under ASGI.
+if env.bool("DB_POOL", default=False):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("DB_POOL_MAX_SIZE", default=4),
+            "timeout": env.int("DB_POOL_TIMEOUT", default=10),
+        }
+    }
+
+# Read replicas, served by config.db_routers
+DATABASE_REPLICAS = []
+for index, replica_host in enumerate(env.list("DB_REPLICA_HOSTS", default=[])):
+    host, _, port = replica_host.partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["config.db_routers.PrimaryReplicaRouter"]
+DATABASE_REPLICA_PIN_TIMEOUT = env.int("DB_REPLICA_PIN_TIMEOUT", default=5)
+DATABASE_REPLICA_MAX_LAG = env.float("DB_REPLICA_MAX_LAG", default=2.0)
+DATABASE_REPLICA_CHECK_INTERVAL = env.int("DB_REPLICA_CHECK_INTERVAL", default=5)
+
+# Logging
+# https://docs.djangoproject.com/en/5.1/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core": {
+            "handlers": ["console"],
+            "level": env.str("LOG_LEVEL", default="INFO"),
+        },
+    },
+}
+
+# Per-request SQL and timing instrumentation, see core.middleware
+REQUEST_INSTRUMENTATION = env.bool("REQUEST_INSTRUMENTATION", default=False)
+
+# Lets superusers profile single requests, see core.middleware.ProfilerMiddleware
+REQUEST_PROFILER = env.bool("REQUEST_PROFILER", default=False)
+# Seconds between the stack samples of flame graphs
+REQUEST_PROFILER_INTERVAL = env.float("REQUEST_PROFILER_INTERVAL", default=0.005)
+
+# Queries slower than this many seconds are logged with their EXPLAIN plan and
+# reported by the slow_queries command, 0 disables the capture
+SLOW_QUERY_THRESHOLD = env.float("SLOW_QUERY_THRESHOLD", default=0.5)
+# Run EXPLAIN ANALYZE for slow reads, which executes them a second time
+SLOW_QUERY_EXPLAIN_ANALYZE = env.bool("SLOW_QUERY_EXPLAIN_ANALYZE", default=False)
+
+# Bearer token Prometheus presents to scrape /metrics, which is off without it
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Process-local by default, set CACHE_URL to a shared cache, e.g. Redis, when
+# serving with several workers
+CACHES = {
+    "default": env.dj_cache_url("CACHE_URL", default="locmem://"),
+    # Login lockout counters, shared by the workers like the default cache.
+    # Point it at another Redis database so cached responses never evict them.
+    "lockout": env.dj_cache_url(
+        "LOCKOUT_CACHE_URL", default=env.str("CACHE_URL", default="locmem://")
+    ),
+}
+CACHE_RESPONSE_TIMEOUT = env.int("CACHE_RESPONSE_TIMEOUT", default=60 * 60)
+CACHE_LOCAL_MAX_ENTRIES = env.int("CACHE_LOCAL_MAX_ENTRIES", default=1000)
+CACHE_LOCK_TIMEOUT = env.int("CACHE_LOCK_TIMEOUT", default=10)
+CACHE_EARLY_REFRESH_BETA = env.float("CACHE_EARLY_REFRESH_BETA", default=1.0)
+
+# Django's default hashers, hashing on a bounded pool of threads per process
+PASSWORD_HASHERS = [
+    "users.hashers.PBKDF2PasswordHasher",
+    "users.hashers.PBKDF2SHA1PasswordHasher",
+    "users.hashers.Argon2PasswordHasher",
+    "users.hashers.BCryptSHA256PasswordHasher",
+    "users.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASHING_CONCURRENCY = env.int("PASSWORD_HASHING_CONCURRENCY", default=1)
+# Seconds a hash may wait for a slot before the request fails with a 503
+PASSWORD_HASHING_QUEUE_TIMEOUT = env.float(
+    "PASSWORD_HASHING_QUEUE_TIMEOUT", default=5.0
+)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -140,12 +251,14 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
-STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
-
-DEFAULT_FILE_STORAGE = "minio_storage.storage.MinioMediaStorage"
+# Django 5.1 dropped DEFAULT_FILE_STORAGE and STATICFILES_STORAGE
+STORAGES = {
+    "default": {"BACKEND": "minio_storage.storage.MinioMediaStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
 
 MINIO_STORAGE_ENDPOINT = env.str("MINIO_STORAGE_ENDPOINT")
 MINIO_STORAGE_USE_HTTPS = env.bool("MINIO_STORAGE_USE_HTTPS", True)
@@ -161,6 +274,7 @@ MINIO_STORAGE_MEDIA_BACKUP_BUCKET = env.str(
     "MINIO_STORAGE_MEDIA_BACKUP_BUCKET", "Recycle bin"
 )
 MINIO_STORAGE_MEDIA_BACKUP_FORMAT = "backup_%Y-%m-%d_%H-%M-%S_"
+MINIO_STORAGE_MEDIA_USE_PRESIGNED = env.bool("MINIO_STORAGE_MEDIA_USE_PRESIGNED", False)
 
 protocol = "https" if MINIO_STORAGE_USE_HTTPS else "http"
 MINIO_STORAGE_MEDIA_URL = (
@@ -169,6 +283,36 @@ MINIO_STORAGE_MEDIA_URL = (
 
 MEDIA_URL = MINIO_STORAGE_MEDIA_URL
 
+# Generated media URLs are cached, see core.media. Seconds presigned URLs
+# are valid for, they are cached for half of it.
+MEDIA_URL_EXPIRY = env.int("MEDIA_URL_EXPIRY", default=60 * 60)
+MEDIA_URL_LOCAL_MAX_ENTRIES = env.int("MEDIA_URL_LOCAL_MAX_ENTRIES", default=10000)
+
+# Direct uploads to the media storage, see core.uploads
+DIRECT_UPLOAD_EXPIRY = env.int("DIRECT_UPLOAD_EXPIRY", default=15 * 60)
+PROFILE_PICTURE_MAX_SIZE = env.int("PROFILE_PICTURE_MAX_SIZE", default=5 * 1024 * 1024)
+
+# Task files are uploaded in chunks, see tasks.files
+TASK_FILE_CHUNK_SIZE = env.int("TASK_FILE_CHUNK_SIZE", default=8 * 1024 * 1024)
+TASK_FILE_MAX_SIZE = env.int("TASK_FILE_MAX_SIZE", default=2 * 1024 * 1024 * 1024)
+# Hours after which unfinished uploads are pruned
+TASK_FILE_UPLOAD_EXPIRY = env.int("TASK_FILE_UPLOAD_EXPIRY", default=48)
+# Threads assembling completed uploads in each process, 0 assembles them in
+# requests
+TASK_FILE_ASSEMBLY_WORKERS = env.int("TASK_FILE_ASSEMBLY_WORKERS", default=2)
+# Seconds after which an assembly is assumed lost, e.g. to a restart, and
+# can be started again
+TASK_FILE_ASSEMBLY_TIMEOUT = env.int("TASK_FILE_ASSEMBLY_TIMEOUT", default=60 * 60)
+
+# Square thumbnails of profile pictures, see users.thumbnails
+PROFILE_PICTURE_THUMBNAIL_SIZES = env.list(
+    "PROFILE_PICTURE_THUMBNAIL_SIZES", subcast=int, default=[64, 256]
+)
+# Threads generating thumbnails in each process, 0 generates them in requests
+PROFILE_PICTURE_THUMBNAIL_WORKERS = env.int(
+    "PROFILE_PICTURE_THUMBNAIL_WORKERS", default=1
+)
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -213,8 +357,15 @@ REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
         "core.renderers.JSONRenderer",
     ],
+    # Answers the password hashing rejections with a 503 response
+    "EXCEPTION_HANDLER": "core.exceptions.exception_handler",
 }
 
+# Identifies the deployed code, e.g. the image tag or commit hash. Defaults to a
+# digest of the source files.
+CODE_VERSION = env.str("CODE_VERSION", default="")
+SCHEMA_CACHE_TIMEOUT = env.int("SCHEMA_CACHE_TIMEOUT", default=60 * 60 * 24 * 7)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "iCog Task Tracker API",
     "DESCRIPTION": "API documentation for the iCog Task Tracker system.",
@@ -238,14 +389,35 @@ SIMPLE_JWT = {
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
     "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "users.serializers.TokenVerifySerializer",
 }
+# Sign roles, department and position into access tokens, see users.claims.
+# Needs a shared CACHE_URL.
+TOKEN_ROLE_CLAIMS = env.bool("TOKEN_ROLE_CLAIMS", default=False)
+# False positive rate of the filter of revoked tokens, see users.revocation
+TOKEN_REVOCATION_ERROR_RATE = env.float("TOKEN_REVOCATION_ERROR_RATE", default=0.01)
 
 ALLOWED_EMAIL_DOMAINS = env.list("ALLOWED_EMAIL_DOMAINS", default=["icog.et"])
 FRONTEND_DOMAIN = env.str("FRONTEND_DOMAIN")
 SITE_NAME = env.str("SITE_NAME")
 SITE_ID = env.int("SITE_ID")
 
-EMAIL_BACKEND = env.str("EMAIL_BACKEND")
+# Emails are queued in the database and sent by the send_queued_email
+# command through EMAIL_BACKEND, see core.mail. EMAIL_OUTBOX=false sends
+# them within the requests instead.
+EMAIL_DELIVERY_BACKEND = env.str("EMAIL_BACKEND")
+EMAIL_BACKEND = (
+    "core.mail.OutboxEmailBackend"
+    if env.bool("EMAIL_OUTBOX", True)
+    else EMAIL_DELIVERY_BACKEND
+)
+EMAIL_OUTBOX_BATCH_SIZE = env.int("EMAIL_OUTBOX_BATCH_SIZE", default=100)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int("EMAIL_OUTBOX_MAX_ATTEMPTS", default=8)
+# Seconds before the first retry, doubled after each failed attempt
+EMAIL_OUTBOX_RETRY_DELAY = env.int("EMAIL_OUTBOX_RETRY_DELAY", default=60)
+# Seconds a worker has to send the emails it claimed before others may
+EMAIL_OUTBOX_CLAIM_TIMEOUT = env.int("EMAIL_OUTBOX_CLAIM_TIMEOUT", default=10 * 60)
 EMAIL_HOST = env.str("EMAIL_HOST")
 EMAIL_PORT = env.int("EMAIL_PORT")
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS")
@@ -260,7 +432,7 @@ DJOSER = {
         "user_create": "users.serializers.UserCreateSerializer",
     },
     "SEND_ACTIVATION_EMAIL": True,
-    "ACTIVATION_URL": f"activate/{{uid}}/{{token}}",
+    "ACTIVATION_URL": "activate/{uid}/{token}",
     "PASSWORD_RESET_CONFIRM_URL": (
         f"{FRONTEND_DOMAIN}/password/reset/confirm/{{uid}}/{{token}}/"
     ),
@@ -289,3 +461,6 @@ AXES_FAILURE_LIMIT = 5
 AXES_COOLOFF_TIME = timedelta(minutes=30)
 AXES_LOCKOUT_PARAMETERS = ["ip_address"]
 AXES_LOCKOUT_CALLABLE = "users.helpers.lockout_response"
+# Failed logins are counted in the cache, expiring after AXES_COOLOFF_TIME
+AXES_HANDLER = "users.lockout.CacheLockoutHandler"
+AXES_CACHE = "lockout"
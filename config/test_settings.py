@@ -27,14 +27,52 @@ TEMPLATES = settings.TEMPLATES
 
 WSGI_APPLICATION = settings.WSGI_APPLICATION
 
+# Exercise the async read path
+ASYNC_VIEWS = True
+SERVER_WORKERS = 1
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # Only routed to by tests that enable it through DATABASE_REPLICAS
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
 }
 
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = settings.DATABASE_ROUTERS
+DATABASE_REPLICA_PIN_TIMEOUT = settings.DATABASE_REPLICA_PIN_TIMEOUT
+DATABASE_REPLICA_MAX_LAG = settings.DATABASE_REPLICA_MAX_LAG
+DATABASE_REPLICA_CHECK_INTERVAL = settings.DATABASE_REPLICA_CHECK_INTERVAL
+
+REQUEST_INSTRUMENTATION = False
+REQUEST_PROFILER = False
+REQUEST_PROFILER_INTERVAL = settings.REQUEST_PROFILER_INTERVAL
+SLOW_QUERY_THRESHOLD = 0
+SLOW_QUERY_EXPLAIN_ANALYZE = False
+METRICS_TOKEN = "test-metrics-token"  # noqa: S105
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "lockout": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "lockout",
+    },
+}
+CACHE_RESPONSE_TIMEOUT = settings.CACHE_RESPONSE_TIMEOUT
+CACHE_LOCAL_MAX_ENTRIES = settings.CACHE_LOCAL_MAX_ENTRIES
+CACHE_LOCK_TIMEOUT = settings.CACHE_LOCK_TIMEOUT
+CACHE_EARLY_REFRESH_BETA = settings.CACHE_EARLY_REFRESH_BETA
+
+PASSWORD_HASHERS = settings.PASSWORD_HASHERS
+PASSWORD_HASHING_CONCURRENCY = settings.PASSWORD_HASHING_CONCURRENCY
+PASSWORD_HASHING_QUEUE_TIMEOUT = settings.PASSWORD_HASHING_QUEUE_TIMEOUT
 AUTH_PASSWORD_VALIDATORS = settings.AUTH_PASSWORD_VALIDATORS
 
 
@@ -47,9 +85,24 @@ USE_I18N = settings.USE_I18N
 USE_TZ = settings.USE_TZ
 
 
-DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": settings.STORAGES["staticfiles"],
+}
 MEDIA_ROOT = BASE_DIR / "test_media"
 MEDIA_URL = "/media/"
+MEDIA_URL_EXPIRY = settings.MEDIA_URL_EXPIRY
+MEDIA_URL_LOCAL_MAX_ENTRIES = settings.MEDIA_URL_LOCAL_MAX_ENTRIES
+
+DIRECT_UPLOAD_EXPIRY = settings.DIRECT_UPLOAD_EXPIRY
+PROFILE_PICTURE_MAX_SIZE = settings.PROFILE_PICTURE_MAX_SIZE
+TASK_FILE_CHUNK_SIZE = settings.TASK_FILE_CHUNK_SIZE
+TASK_FILE_MAX_SIZE = settings.TASK_FILE_MAX_SIZE
+TASK_FILE_UPLOAD_EXPIRY = settings.TASK_FILE_UPLOAD_EXPIRY
+TASK_FILE_ASSEMBLY_WORKERS = 0
+TASK_FILE_ASSEMBLY_TIMEOUT = settings.TASK_FILE_ASSEMBLY_TIMEOUT
+PROFILE_PICTURE_THUMBNAIL_SIZES = settings.PROFILE_PICTURE_THUMBNAIL_SIZES
+PROFILE_PICTURE_THUMBNAIL_WORKERS = 0
 
 DEFAULT_AUTO_FIELD = settings.DEFAULT_AUTO_FIELD
 
@@ -61,6 +114,9 @@ REST_FRAMEWORK = settings.REST_FRAMEWORK
 REST_FRAMEWORK["DEFAULT_THROTTLE_CLASSES"] = []
 REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {}
 
+CODE_VERSION = settings.CODE_VERSION
+SCHEMA_CACHE_TIMEOUT = settings.SCHEMA_CACHE_TIMEOUT
+
 SPECTACULAR_SETTINGS = settings.SPECTACULAR_SETTINGS
 
 AUTH_USER_MODEL = "users.User"
@@ -72,14 +128,23 @@ SIMPLE_JWT = {
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
     "TOKEN_OBTAIN_SERIALIZER": "users.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "users.serializers.TokenVerifySerializer",
 }
+TOKEN_ROLE_CLAIMS = settings.TOKEN_ROLE_CLAIMS
+TOKEN_REVOCATION_ERROR_RATE = settings.TOKEN_REVOCATION_ERROR_RATE
 
 ALLOWED_EMAIL_DOMAINS = ["icog.et"]
 FRONTEND_DOMAIN = "task-tracker.icog.et"
 SITE_NAME = "task-tracker"
 SITE_ID = 1
 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+EMAIL_DELIVERY_BACKEND = "django.core.mail.backends.console.EmailBackend"
+EMAIL_BACKEND = EMAIL_DELIVERY_BACKEND
+EMAIL_OUTBOX_BATCH_SIZE = settings.EMAIL_OUTBOX_BATCH_SIZE
+EMAIL_OUTBOX_MAX_ATTEMPTS = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+EMAIL_OUTBOX_RETRY_DELAY = settings.EMAIL_OUTBOX_RETRY_DELAY
+EMAIL_OUTBOX_CLAIM_TIMEOUT = settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -94,3 +159,9 @@ AUTHENTICATION_BACKENDS = (
     "axes.backends.AxesBackend",
     "django.contrib.auth.backends.ModelBackend",
 )
+AXES_FAILURE_LIMIT = settings.AXES_FAILURE_LIMIT
+AXES_COOLOFF_TIME = settings.AXES_COOLOFF_TIME
+AXES_LOCKOUT_PARAMETERS = settings.AXES_LOCKOUT_PARAMETERS
+AXES_LOCKOUT_CALLABLE = settings.AXES_LOCKOUT_CALLABLE
+AXES_HANDLER = settings.AXES_HANDLER
+AXES_CACHE = settings.AXES_CACHE
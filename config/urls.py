@@ -1,16 +1,20 @@
 from django.contrib import admin
 from django.urls import include, path, re_path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
+
+from core.views import SchemaView, metrics_view, upload_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
+    path("uploads/<str:upload_id>", upload_view, name="direct-upload"),
     re_path(r"^api/(?P<version>v[0-9]+)/", include("basedata.urls")),
     re_path(r"^api/(?P<version>v[0-9]+)/", include("tasks.urls")),
     re_path(r"^api/(?P<version>v[0-9]+)/", include("users.urls")),
     # Documentation
     re_path(
         r"^api/(?P<version>v[0-9]+)/schema/$",
-        SpectacularAPIView.as_view(),
+        SchemaView.as_view(),
         name="schema",
     ),
     re_path(
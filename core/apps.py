@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_login_failed
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from axes.signals import user_locked_out
+
+        # Registers the system checks
+        from core import checks  # noqa: F401
+        from core.instrumentation import install_query_recorder
+        from core.metrics import on_login_failed, on_user_locked_out
+        from core.slow_queries import install_slow_query_capture
+
+        connection_created.connect(
+            install_query_recorder, dispatch_uid="core.install_query_recorder"
+        )
+        connection_created.connect(
+            install_slow_query_capture, dispatch_uid="core.install_slow_query_capture"
+        )
+        user_login_failed.connect(on_login_failed, dispatch_uid="core.login_failed")
+        user_locked_out.connect(on_user_locked_out, dispatch_uid="core.locked_out")
@@ -0,0 +1,216 @@
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.metrics import CACHE_EVENTS
+from core.signals import connect_model_changes
+
+TAG_KEY_PREFIX = "core.cache.tag"
+KEY_PREFIX = "core.cache"
+LOCK_POLL_INTERVAL = 0.05
+
+
+def tag_for_model(model):
+    return model._meta.label_lower
+
+
+def get_tag_versions(tags):
+    """
+    Returns the current version of each tag, initializing missing ones.
+    """
+    tag_keys = {f"{TAG_KEY_PREFIX}:{tag}": tag for tag in tags}
+    versions = cache.get_many(tag_keys.keys())
+
+    missing_keys = [key for key in tag_keys if key not in versions]
+    if missing_keys:
+        # `add` keeps whichever version another worker initialized first
+        for key in missing_keys:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions.update(cache.get_many(missing_keys))
+
+    return {tag_keys[key]: version for key, version in versions.items()}
+
+
+def make_key(*parts, tags=()):
+    """
+    Builds a cache key from `parts` that changes whenever one of `tags`
+    is invalidated, so stale entries are never read and simply expire.
+    """
+    tag_versions = get_tag_versions(tags)
+    fingerprint = "|".join(
+        [
+            *(str(part) for part in parts),
+            *(f"{tag}:{tag_versions[tag]}" for tag in sorted(tag_versions)),
+        ]
+    )
+    return f"{KEY_PREFIX}:{hashlib.sha256(fingerprint.encode()).hexdigest()}"
+
+
+def invalidate_tags(*tags):
+    cache.set_many(
+        {f"{TAG_KEY_PREFIX}:{tag}": uuid.uuid4().hex for tag in tags}, timeout=None
+    )
+
+
+def _invalidate_model(model):
+    tag = tag_for_model(model)
+    invalidate_tags(tag)
+    # Invalidate again once committed, in case a concurrent request cached
+    # the pre-commit state in between.
+    transaction.on_commit(lambda: invalidate_tags(tag))
+
+
+def invalidate_on_change(*models):
+    """
+    Invalidate each model's tag on save, delete and many-to-many changes.
+    Call from `AppConfig.ready()`.
+    """
+    connect_model_changes(
+        _invalidate_model, models, dispatch_uid="invalidate_on_change"
+    )
+
+
+CacheEntry = namedtuple("CacheEntry", ["value", "expires_at", "delta"])
+
+
+class CacheStats:
+    """Per-process counters of two-tier cache outcomes, for monitoring."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name):
+        with self._lock:
+            self._counts[name] += 1
+        CACHE_EVENTS.labels(event=name).inc()
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+class LocalCache:
+    """Bounded, thread-safe, least-recently-used cache local to the process."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+stats = CacheStats()
+local_cache = LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES)
+
+
+def _should_refresh_early(entry):
+    # Probabilistic early expiration (XFetch): the closer to expiry and the
+    # slower the computation, the likelier a single request refreshes early.
+    beta = settings.CACHE_EARLY_REFRESH_BETA
+    jitter = -math.log(1.0 - random.random())  # noqa: S311
+    return time.time() + entry.delta * beta * jitter >= entry.expires_at
+
+
+def _wait_for_entry(key, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def _recompute(key, compute, timeout, stale_entry=None):
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.CACHE_LOCK_TIMEOUT
+
+    # Single flight: only the worker holding the lock recomputes, the others
+    # serve the stale value or wait for the new one.
+    locked = cache.add(lock_key, 1, timeout=lock_timeout)
+    if not locked:
+        if stale_entry is not None:
+            return stale_entry.value
+
+        stats.increment("lock_wait")
+        entry = _wait_for_entry(key, lock_timeout)
+        if entry is not None:
+            local_cache.set(key, entry)
+            return entry.value
+
+    try:
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        stats.increment("recompute")
+
+        entry = CacheEntry(value, time.time() + timeout, delta)
+        cache.set(key, entry, timeout=timeout)
+        local_cache.set(key, entry)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Returns the value cached under `key`, looking in the process-local LRU
+    first and the shared cache second, calling `compute()` on a miss.
+    """
+    if timeout is None:
+        timeout = settings.CACHE_RESPONSE_TIMEOUT
+
+    entry = local_cache.get(key)
+    if entry is not None:
+        stats.increment("local_hit")
+    else:
+        entry = cache.get(key)
+        if entry is not None:
+            stats.increment("shared_hit")
+            local_cache.set(key, entry)
+        else:
+            stats.increment("miss")
+
+    if entry is None:
+        return _recompute(key, compute, timeout)
+
+    if _should_refresh_early(entry):
+        stats.increment("early_refresh")
+        return _recompute(key, compute, timeout, stale_entry=entry)
+
+    return entry.value
@@ -0,0 +1,41 @@
+"""System checks of the deployment.
+
+Several gunicorn workers only share what they keep in a shared cache.
+Process-local caches are fine with a single worker, e.g. in development,
+but with several each worker keeps its own copy: invalidations, counters
+and revocations then only reach the worker that handled them.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Backends whose entries no other process can see
+PROCESS_LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def is_process_local(alias):
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_BACKENDS
+
+
+def has_several_workers():
+    # Unknown outside gunicorn, e.g. under runserver or in management commands
+    workers = settings.SERVER_WORKERS
+    return workers is not None and workers > 1
+
+
+@register(Tags.caches)
+def check_default_cache(app_configs, **kwargs):
+    if has_several_workers() and is_process_local("default"):
+        return [
+            Warning(
+                "The default cache is process-local while serving with several "
+                "workers, so cached responses invalidated by one worker are "
+                "still served by the others until they expire.",
+                hint="Set CACHE_URL to a shared cache, e.g. redis://...",
+                id="core.W001",
+            )
+        ]
+    return []
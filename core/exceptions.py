@@ -0,0 +1,26 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as base_exception_handler
+
+from users.hashers import PasswordHashingBusy
+
+
+class ServerBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The server is busy, please try again shortly."
+    default_code = "password_hashing_busy"
+
+    def __init__(self, wait):
+        super().__init__()
+        # Sent as the Retry-After header
+        self.wait = wait
+
+
+def exception_handler(exc, context):
+    """
+    Answers the password hashing rejections with a 503 response, on top of
+    the default handling.
+    """
+    if isinstance(exc, PasswordHashingBusy):
+        exc = ServerBusy(wait=exc.wait)
+    return base_exception_handler(exc, context)
@@ -0,0 +1,37 @@
+"""Thread pools started once per process."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+class ProcessExecutor:
+    """
+    Lazily starts a thread pool sized by the `setting` name.
+
+    Threads don't survive a fork, so every worker process starts its own
+    pool, and a changed setting replaces the pool of the process.
+    """
+
+    def __init__(self, setting, thread_name_prefix):
+        self.setting = setting
+        self.thread_name_prefix = thread_name_prefix
+        self.lock = threading.Lock()
+        self.executor = None
+        self.key = None
+
+    def get_executor(self):
+        max_workers = getattr(settings, self.setting)
+        key = (os.getpid(), max_workers)
+        with self.lock:
+            if self.key != key:
+                if self.executor and self.key[0] == key[0]:
+                    self.executor.shutdown(wait=False)
+                self.executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+                self.key = key
+            return self.executor
@@ -0,0 +1,68 @@
+"""Files streamed from other stored files, without holding them in memory."""
+
+import io
+
+from django.core.files import File
+
+
+class ConcatenatedReader(io.RawIOBase):
+    """
+    Reads the objects `names` of `storage` one after the other, opening each
+    only once reached, and feeds what it reads to `hasher` if given.
+    """
+
+    def __init__(self, storage, names, hasher=None):
+        self.storage = storage
+        self.names = iter(names)
+        self.hasher = hasher
+        self.current = None
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                name = next(self.names, None)
+                if name is None:
+                    return 0
+                self.current = self.storage.open(name)
+
+            data = self.current.read(len(buffer))
+            if data:
+                break
+            self.current.close()
+            self.current = None
+
+        buffer[: len(data)] = data
+        self.position += len(data)
+        if self.hasher is not None:
+            self.hasher.update(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # Storages rewind the content before saving it
+        if (offset, whence) == (0, io.SEEK_SET) and self.position == 0:
+            return 0
+        raise io.UnsupportedOperation("seek")
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+class ConcatenatedFile(File):
+    """
+    A `File` of `size` bytes made of the objects `names` of `storage`, to
+    save them as one object.
+    """
+
+    def __init__(self, storage, names, size, name=None, hasher=None):
+        super().__init__(ConcatenatedReader(storage, names, hasher), name)
+        self.size = size
@@ -0,0 +1,182 @@
+import contextlib
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+_current_profile = ContextVar("request_profile", default=None)
+
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+
+
+def fingerprint_sql(sql):
+    """
+    Normalizes `sql` so queries differing only in their values, or in the
+    length of an `IN (...)` list, share a fingerprint.
+    """
+    sql = STRING_LITERAL_RE.sub("?", sql)
+    sql = NUMBER_LITERAL_RE.sub("?", sql)
+    return PLACEHOLDER_LIST_RE.sub("(...)", sql)
+
+
+class RequestProfile:
+    """
+    Timings and SQL queries of a single request, collected while it is the
+    current profile.
+    """
+
+    def __init__(self, detailed=True, capture_queries=False):
+        self.detailed = detailed
+        # (sql, duration) of every query, for the profiler
+        self.queries = [] if capture_queries else None
+        # Viewset and action handling the request, once resolved
+        self.view = None
+        self.action = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.phases = Counter()
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.db_time += duration
+        if self.detailed:
+            self.fingerprints[fingerprint_sql(sql)] += 1
+        if self.queries is not None:
+            self.queries.append((sql, duration))
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def total_time(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def duplicate_queries(self):
+        return {sql: count for sql, count in self.fingerprints.items() if count > 1}
+
+    @property
+    def serializer_time(self):
+        # Time in the view outside SQL and rendering, i.e. mostly serialization
+        return max(self.total_time - self.db_time - self.phases["render"], 0.0)
+
+
+def get_current_profile():
+    return _current_profile.get()
+
+
+@contextlib.contextmanager
+def profile_request(detailed=True, capture_queries=False):
+    """
+    Makes a new profile current for the block. Undetailed profiles skip
+    fingerprinting queries, for always-on metrics.
+    """
+    profile = RequestProfile(detailed=detailed, capture_queries=capture_queries)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        profile.finish()
+        _current_profile.reset(token)
+
+
+@contextlib.contextmanager
+def _current(profile):
+    token = _current_profile.set(profile)
+    try:
+        yield
+    finally:
+        _current_profile.reset(token)
+
+
+def profile_streaming_content(response, profile, on_finish):
+    """
+    Keeps recording into `profile` while the content of the streamed
+    `response` is produced, after the middleware returned it, then finishes
+    the profile and calls `on_finish` once the content is exhausted or closed.
+    """
+    content = response.streaming_content
+
+    def wrapper():
+        try:
+            while True:
+                with _current(profile):
+                    chunk = next(content, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            profile.finish()
+            on_finish()
+
+    async def awrapper():
+        try:
+            while True:
+                with _current(profile):
+                    try:
+                        chunk = await content.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield chunk
+        finally:
+            profile.finish()
+            on_finish()
+
+    response.streaming_content = awrapper() if response.is_async else wrapper()
+
+
+def ensure_profile(detailed=True):
+    """
+    Returns a context manager yielding the current profile if one is already
+    recording, or else a new one made current for the block.
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        return contextlib.nullcontext(profile)
+    return profile_request(detailed=detailed)
+
+
+@contextlib.contextmanager
+def measure(phase):
+    """
+    Adds the time spent in the block to `phase` of the current profile.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.phases[phase] += time.perf_counter() - started
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper feeding the current profile, if any.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    `connection_created` receiver adding `record_query` to every connection,
+    so queries are recorded whichever thread runs them.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
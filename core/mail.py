@@ -0,0 +1,220 @@
+"""Outbox of emails, sent apart from the requests that queue them.
+
+With `OutboxEmailBackend` as the `EMAIL_BACKEND`, sending mail, e.g. the
+activation and password reset emails of djoser, only stores it in the
+`OutboundEmail` table, within the transaction of the request. The
+`send_queued_email` command sends the queued emails in batches over one
+connection of `EMAIL_DELIVERY_BACKEND`, retrying failed ones with an
+exponential backoff.
+
+Emails are claimed for `EMAIL_OUTBOX_CLAIM_TIMEOUT` before being sent, and
+the claim is renewed before each one, so several workers never send the
+same one and those of a worker that died meanwhile are sent again
+afterwards.
+
+Sent emails, and those that failed for good, are kept for a while without
+their content, as bodies carry live links such as those of password
+resets, then deleted.
+"""
+
+import base64
+import contextlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def encode_attachment(attachment):
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return [filename, base64.b64encode(content).decode("ascii"), mimetype]
+
+
+def to_outbound_email(message):
+    if any(not isinstance(attachment, tuple) for attachment in message.attachments):
+        raise ValueError("MIME attachments cannot be queued.")
+    return OutboundEmail(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[
+            [content, mimetype]
+            for content, mimetype in getattr(message, "alternatives", [])
+        ],
+        attachments=[
+            encode_attachment(attachment) for attachment in message.attachments
+        ],
+    )
+
+
+def to_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        alternatives=[tuple(alternative) for alternative in email.alternatives],
+        connection=connection,
+    )
+    for filename, content, mimetype in email.attachments:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Queues the messages in the outbox instead of sending them.
+    """
+
+    def send_messages(self, email_messages):
+        emails = [
+            to_outbound_email(message)
+            for message in email_messages
+            if message.recipients()
+        ]
+        OutboundEmail.objects.bulk_create(emails)
+        return len(emails)
+
+
+def get_retry_delay(attempts):
+    # Doubled after each failed attempt
+    return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def get_claim_deadline():
+    return timezone.now() + timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+
+
+def claim_emails(batch_size):
+    """
+    Returns up to `batch_size` due emails, claimed for this worker until
+    the claim timeout.
+    """
+    now = timezone.now()
+    claimed_until = get_claim_deadline()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="queued", next_attempt_date__lte=now)
+            .order_by("next_attempt_date")[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            attempts=F("attempts") + 1, next_attempt_date=claimed_until
+        )
+    for email in emails:
+        email.attempts += 1
+        email.next_attempt_date = claimed_until
+    return emails
+
+
+def renew_claim(email):
+    """
+    Extends the claim on `email` for the claim timeout and returns whether
+    it still held, i.e. no other worker claimed it since it expired.
+    """
+    claimed_until = get_claim_deadline()
+    renewed = OutboundEmail.objects.filter(
+        pk=email.pk, status="queued", next_attempt_date=email.next_attempt_date
+    ).update(next_attempt_date=claimed_until)
+    email.next_attempt_date = claimed_until
+    return bool(renewed)
+
+
+def send_email(email, connection):
+    """
+    Sends `email` over `connection`, and records whether it was sent or
+    when to try again.
+    """
+    try:
+        # Opened once for the batch, unless a failure closed it
+        connection.open()
+        to_message(email, connection).send()
+    except Exception as error:
+        # The connection may be broken, it is opened again for the next email
+        with contextlib.suppress(Exception):
+            connection.close()
+
+        fields = {"last_error": f"{type(error).__name__}: {error}"}
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            # Kept for a while like sent emails, without their content
+            fields.update(status="failed", body="", alternatives=[], attachments=[])
+            logger.exception("Giving up sending email %s to %s", email.pk, email.to)
+        else:
+            fields["next_attempt_date"] = timezone.now() + get_retry_delay(
+                email.attempts
+            )
+            logger.warning("Failed to send email %s: %s", email.pk, error)
+        OutboundEmail.objects.filter(pk=email.pk).update(**fields)
+        return False
+
+    # Only the envelope is kept, the content may hold live links
+    OutboundEmail.objects.filter(pk=email.pk).update(
+        status="sent",
+        sent_date=timezone.now(),
+        last_error="",
+        body="",
+        alternatives=[],
+        attachments=[],
+    )
+    return True
+
+
+def send_queued_emails(batch_size=None):
+    """
+    Sends a batch of due emails over one connection and returns how many
+    were sent and how many failed.
+
+    The claim on each email is renewed before sending it, so a batch slower
+    than the claim timeout skips the emails another worker claimed since.
+    """
+    emails = claim_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    try:
+        for email in emails:
+            if not renew_claim(email):
+                logger.warning("Email %s was claimed by another worker", email.pk)
+            elif send_email(email, connection):
+                sent += 1
+            else:
+                failed += 1
+    finally:
+        with contextlib.suppress(Exception):
+            connection.close()
+    return sent, failed
+
+
+def prune_emails(retention):
+    """
+    Deletes the emails sent, or queued and failed for good, longer than
+    `retention` ago and returns how many.
+    """
+    cutoff = timezone.now() - retention
+    emails = OutboundEmail.objects.filter(
+        Q(status="sent", sent_date__lt=cutoff)
+        | Q(status="failed", created_date__lt=cutoff)
+    )
+    return emails.delete()[0]
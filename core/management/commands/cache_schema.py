@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+from core.checks import is_process_local
+from core.schema import get_code_version, get_schema_artifact
+
+
+class Command(BaseCommand):
+    help = "Generates the OpenAPI schema of every API version into the cache"
+
+    def handle(self, *args, **options):
+        if is_process_local("default"):
+            # It would be lost when this process exits
+            self.stderr.write(
+                self.style.WARNING(
+                    "The default cache is process-local, skipping. Set "
+                    "CACHE_URL to a shared cache to generate the schema ahead."
+                )
+            )
+            return
+
+        code_version = get_code_version()
+
+        for api_version in settings.REST_FRAMEWORK["ALLOWED_VERSIONS"]:
+            for renderer_class in [OpenApiYamlRenderer, OpenApiJsonRenderer]:
+                artifact = get_schema_artifact(api_version, renderer_class)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Cached {renderer_class.format} schema of API"
+                        f" '{api_version}' ({len(artifact.content)} bytes)"
+                        f" for code version '{code_version}'"
+                    )
+                )
@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.storage import blob_storage
+
+
+class Command(BaseCommand):
+    help = "Deletes the stored blobs no file has referred to for the grace period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Hours an unreferenced blob is kept, in case it is saved again",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Count the references of every blob again first",
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep collecting every this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            if options["recount"]:
+                changed = blob_storage.recount_references()
+                self.stdout.write(f"Corrected the references of {changed} blobs")
+
+            deleted = blob_storage.collect_garbage(
+                timedelta(hours=options["grace_hours"])
+            )
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} blobs"))
+
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
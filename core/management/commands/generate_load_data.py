@@ -0,0 +1,462 @@
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group as Role
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from basedata.models import ChallengeGroup, ChallengeType, Department, Position
+from core.cache import invalidate_tags, tag_for_model
+from core.versions import bump_model_version
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+
+User = get_user_model()
+
+# Share of generated users per role of `seed_roles`
+ROLE_SHARES = {
+    "Experts": 60,
+    "Leads": 15,
+    "Operation-Team": 10,
+    "Not-Assigned": 9,
+    "HR": 5,
+    "CEO": 1,
+}
+DEPARTMENT_NAMES = [
+    "Engineering",
+    "Finance",
+    "Operations",
+    "Human Resources",
+    "Marketing",
+    "Sales",
+    "Legal",
+    "Procurement",
+    "Research",
+    "Customer Service",
+]
+POSITION_TITLES = ["Director", "Manager", "Lead", "Senior Expert", "Expert", "Officer"]
+FIRST_NAMES = ["Abebe", "Sara", "Dawit", "Hana", "Yonas", "Meron", "Samuel", "Liya"]
+LAST_NAMES = ["Tesfaye", "Bekele", "Alemu", "Girma", "Haile", "Kebede", "Mengistu"]
+WORDS = [
+    "improve",
+    "deliver",
+    "review",
+    "plan",
+    "align",
+    "report",
+    "measure",
+    "launch",
+    "support",
+    "quarterly",
+    "budget",
+    "customer",
+    "process",
+    "quality",
+    "system",
+    "training",
+    "policy",
+    "target",
+    "audit",
+    "risk",
+    "digital",
+    "service",
+    "network",
+    "capacity",
+    "growth",
+    "compliance",
+    "strategy",
+    "partner",
+]
+TASK_STATUSES = [status for status, _ in Task._meta.get_field("status").choices]
+APPROVAL_STATUSES = [status for status, _ in Task.APPROVAL_STATUS_CHOICES]
+
+
+def split_weights(rng, count):
+    """
+    Returns `count` positive weights with two decimals summing to 100.
+    """
+    cuts = sorted(rng.sample(range(1, 10000), count - 1))
+    bounds = [0, *cuts, 10000]
+    return [Decimal(bounds[index + 1] - bounds[index]) / 100 for index in range(count)]
+
+
+def split_period(rng, start, end, count):
+    """
+    Splits `start`..`end` into `count` consecutive periods, or repeats it
+    when too short.
+    """
+    days = (end - start).days + 1
+    if days < count:
+        return [(start, end)] * count
+    cuts = sorted(rng.sample(range(1, days), count - 1))
+    bounds = [0, *cuts, days]
+    return [
+        (
+            start + timedelta(days=bounds[index]),
+            start + timedelta(days=bounds[index + 1] - 1),
+        )
+        for index in range(count)
+    ]
+
+
+def random_period(rng, start, end, max_span):
+    """
+    Returns a period within `start`..`end` lasting at most `max_span`.
+    """
+    period_start = start + timedelta(days=rng.randint(0, (end - start).days))
+    latest_end = min(end, period_start + max_span)
+    period_end = period_start + timedelta(
+        days=rng.randint(0, (latest_end - period_start).days)
+    )
+    return period_start, period_end
+
+
+class BulkWriter:
+    """
+    Buffers unsaved model instances and inserts them with `bulk_create`,
+    flushing every buffer in the order the models were first added. Rows
+    may reference rows of a later buffer, e.g. users their positions, which
+    reference their creators in turn: the foreign key constraints Django
+    creates are only checked when the transaction commits.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = {}
+        self.counts = Counter()
+
+    def add(self, instance):
+        pending = self.pending.setdefault(type(instance), [])
+        pending.append(instance)
+        if len(pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model, instances in self.pending.items():
+            model.objects.bulk_create(instances, batch_size=self.batch_size)
+            self.counts[model] += len(instances)
+            instances.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a large synthetic organisation with its task hierarchy for "
+        "benchmarking, e.g. 120k tasks with the defaults"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=20)
+        parser.add_argument("--positions-per-department", type=int, default=25)
+        parser.add_argument("--users", type=int, default=600)
+        parser.add_argument("--challenge-types", type=int, default=5)
+        parser.add_argument("--challenge-groups", type=int, default=30)
+        parser.add_argument("--ksis-per-department", type=int, default=5)
+        parser.add_argument("--milestones-per-ksi", type=int, default=4)
+        parser.add_argument("--kpis-per-milestone", type=int, default=2)
+        parser.add_argument("--major-activities-per-kpi", type=int, default=5)
+        parser.add_argument("--tasks-per-major-activity", type=int, default=10)
+        parser.add_argument(
+            "--sub-tasks", type=int, default=2, help="Sub-tasks per (sub-)task"
+        )
+        parser.add_argument(
+            "--sub-task-depth", type=int, default=1, help="Levels of sub-tasks"
+        )
+        parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+        parser.add_argument("--password", default="1234abcd!A")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        counts = [
+            options[name]
+            for name in [
+                "departments",
+                "positions_per_department",
+                "users",
+                "challenge_types",
+                "challenge_groups",
+                "ksis_per_department",
+                "milestones_per_ksi",
+                "kpis_per_milestone",
+                "major_activities_per_kpi",
+                "tasks_per_major_activity",
+            ]
+        ]
+        if min(counts) < 1 or options["sub_tasks"] < 0:
+            raise CommandError("Counts must be positive")
+
+        self.options = options
+        self.rng = random.Random(options["seed"])  # noqa: S311
+        # Keeps names unique across runs
+        self.tag = uuid.uuid4().hex[:6]
+        self.writer = BulkWriter(options["batch_size"])
+        roles = self.get_roles()
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            self.create_departments()
+            self.create_positions()
+            self.create_users(roles)
+            self.create_challenge_groups()
+            self.create_hierarchy()
+            self.writer.flush()
+
+            # bulk_create sends no signals, and many-to-many rows change the
+            # model declaring the field
+            changed_models = {
+                model._meta.auto_created or model for model in self.writer.counts
+            }
+            for model in changed_models:
+                bump_model_version(model)
+        invalidate_tags(*(tag_for_model(model) for model in changed_models))
+
+        for model, count in self.writer.counts.items():
+            self.stdout.write(f"{model._meta.label}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated load data '{self.tag}' in"
+                f" {time.perf_counter() - started:.1f}s"
+            )
+        )
+
+    def get_roles(self):
+        roles = {role.name: role for role in Role.objects.filter(name__in=ROLE_SHARES)}
+        if not roles:
+            raise CommandError("No roles found, run 'seed_roles' first")
+        return roles
+
+    def describe(self, min_words=5, max_words=30):
+        words = self.rng.choices(WORDS, k=self.rng.randint(min_words, max_words))
+        return " ".join(words).capitalize() + "."
+
+    def create_departments(self):
+        self.departments = []
+        # Department names are unique, so only creators are set later
+        for index in range(self.options["departments"]):
+            name = DEPARTMENT_NAMES[index % len(DEPARTMENT_NAMES)]
+            self.departments.append(
+                Department(
+                    department_name=f"{name} {self.tag}-{index}",
+                    department_description=self.describe(),
+                )
+            )
+
+    def create_positions(self):
+        self.positions = []
+        self.department_positions = {}
+        for department_index, department in enumerate(self.departments):
+            positions = [
+                Position(
+                    department=department,
+                    position_name=(
+                        f"{POSITION_TITLES[index % len(POSITION_TITLES)]}"
+                        f" {self.tag}-{department_index}-{index}"
+                    ),
+                    position_description=self.describe(),
+                )
+                for index in range(self.options["positions_per_department"])
+            ]
+            self.positions.extend(positions)
+            self.department_positions[department] = positions
+
+    def create_users(self, roles):
+        # Hashing is slow, so every user shares the same hash
+        password = make_password(self.options["password"])
+        role_names = [name for name in ROLE_SHARES if name in roles]
+        role_weights = [ROLE_SHARES[name] for name in role_names]
+        vacant_positions = self.rng.sample(self.positions, len(self.positions))
+
+        user_roles = {}
+        for index in range(self.options["users"]):
+            first_name = self.rng.choice(FIRST_NAMES)
+            last_name = self.rng.choice(LAST_NAMES)
+            user = User(
+                email=(
+                    f"{first_name.lower()}.{last_name.lower()}"
+                    f"{index}.{self.tag}@example.com"
+                ),
+                first_name=first_name,
+                last_name=last_name,
+                password=password,
+                bio=self.describe(),
+                position=vacant_positions.pop() if vacant_positions else None,
+            )
+            user_roles[user] = roles[
+                self.rng.choices(role_names, weights=role_weights)[0]
+            ]
+        users = list(user_roles)
+
+        leads = [
+            user for user, role in user_roles.items() if role.name in ("Leads", "CEO")
+        ]
+        self.creators = leads or users
+
+        # Users reference each other, and departments and positions reference
+        # users, so every row needs its creators before the first insert
+        for user in users:
+            user.created_by = user.updated_by = self.rng.choice(self.creators)
+        for instance in [*self.departments, *self.positions]:
+            instance.created_by = instance.updated_by = self.rng.choice(self.creators)
+
+        for instance in [*users, *self.departments, *self.positions]:
+            self.writer.add(instance)
+        self.writer.flush()
+        for user, role in user_roles.items():
+            self.writer.add(User.groups.through(user=user, group=role))
+
+    def create_challenge_groups(self):
+        challenge_types = []
+        for index in range(self.options["challenge_types"]):
+            creator = self.rng.choice(self.creators)
+            challenge_type = ChallengeType(
+                challenge_type_name=f"Challenge type {self.tag}-{index}",
+                challenge_type_description=self.describe(),
+                created_by=creator,
+                updated_by=creator,
+            )
+            challenge_types.append(challenge_type)
+            self.writer.add(challenge_type)
+
+        self.challenge_groups = []
+        for index in range(self.options["challenge_groups"]):
+            creator = self.rng.choice(self.creators)
+            challenge_group = ChallengeGroup(
+                challenge_type=self.rng.choice(challenge_types),
+                challenge_group_name=f"Challenge group {self.tag}-{index}",
+                challenge_group_description=self.describe(),
+                created_by=creator,
+                updated_by=creator,
+            )
+            self.challenge_groups.append(challenge_group)
+            self.writer.add(challenge_group)
+
+    def create(self, model, **fields):
+        creator = self.rng.choice(self.creators)
+        instance = model(created_by=creator, updated_by=creator, **fields)
+        self.writer.add(instance)
+        return instance
+
+    def create_hierarchy(self):
+        options = self.options
+        start_date = options["start_date"] or date(date.today().year, 1, 1)
+        end_date = start_date + timedelta(days=364)
+
+        for department_index, department in enumerate(self.departments):
+            for ksi_index in range(options["ksis_per_department"]):
+                ksi = self.create(
+                    KSI,
+                    department=department,
+                    ksi_name=f"KSI {department_index}-{ksi_index}",
+                    ksi_description=self.describe(),
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+                self.create_milestones(ksi, department)
+
+    def create_milestones(self, ksi, department):
+        count = self.options["milestones_per_ksi"]
+        weights = split_weights(self.rng, count)
+        periods = split_period(self.rng, ksi.start_date, ksi.end_date, count)
+        for index, weight in enumerate(weights):
+            start_date, end_date = periods[index]
+            milestone = self.create(
+                Milestone,
+                ksi=ksi,
+                milestone_name=f"{ksi.ksi_name} milestone {index}",
+                milestone_description=self.describe(),
+                start_date=start_date,
+                end_date=end_date,
+                weight=weight,
+            )
+            self.create_kpis(milestone, department)
+
+    def create_kpis(self, milestone, department):
+        count = self.options["kpis_per_milestone"]
+        periods = split_period(
+            self.rng, milestone.start_date, milestone.end_date, count
+        )
+        for index, (start_date, end_date) in enumerate(periods):
+            kpi = self.create(
+                KPI,
+                milestone=milestone,
+                kpi_name=f"{milestone.milestone_name} KPI {index}",
+                kpi_description=self.describe(),
+                start_date=start_date,
+                end_date=end_date,
+                planed_kpi=self.rng.randint(1, 100),
+            )
+            self.create_major_activities(kpi, department)
+
+    def create_major_activities(self, kpi, department):
+        count = self.options["major_activities_per_kpi"]
+        for index, weight in enumerate(split_weights(self.rng, count)):
+            start_date, end_date = random_period(
+                self.rng, kpi.start_date, kpi.end_date, MajorActivity.MAX_DAYS_SPAN
+            )
+            major_activity = self.create(
+                MajorActivity,
+                kpi=kpi,
+                department=department,
+                major_activity_name=f"{kpi.kpi_name} activity {index}",
+                major_activity_description=self.describe(),
+                start_date=start_date,
+                end_date=end_date,
+                weight=weight,
+            )
+            self.create_tasks(
+                major_activity,
+                department,
+                parent_task=None,
+                count=self.options["tasks_per_major_activity"],
+                depth=0,
+            )
+
+    def create_tasks(self, major_activity, department, parent_task, count, depth):
+        parent = parent_task or major_activity
+        positions = self.department_positions[department]
+        for index, weight in enumerate(split_weights(self.rng, count)):
+            start_date, end_date = random_period(
+                self.rng, parent.start_date, parent.end_date, Task.MAX_DAYS_SPAN
+            )
+            status = self.rng.choice(TASK_STATUSES)
+            has_started = status != "not_started"
+            task = self.create(
+                Task,
+                major_activity=major_activity,
+                parent_task=parent_task,
+                task_name=(
+                    f"{parent_task.task_name if parent_task else 'Task'}.{index}"
+                ),
+                task_description=self.describe(),
+                start_date=start_date,
+                end_date=end_date,
+                actual_start_date=start_date if has_started else None,
+                actual_end_date=end_date if status == "completed" else None,
+                weight=weight,
+                status=status,
+                approval_status=self.rng.choice(APPROVAL_STATUSES),
+            )
+
+            for position in self.rng.sample(positions, min(2, len(positions))):
+                self.writer.add(Task.positions.through(task=task, position=position))
+            if self.rng.random() < 0.2:
+                challenge_group = self.rng.choice(self.challenge_groups)
+                self.writer.add(
+                    Task.challenge_groups.through(
+                        task=task, challengegroup=challenge_group
+                    )
+                )
+
+            if depth < self.options["sub_task_depth"] and self.options["sub_tasks"]:
+                self.create_tasks(
+                    major_activity,
+                    department,
+                    parent_task=task,
+                    count=self.options["sub_tasks"],
+                    depth=depth + 1,
+                )
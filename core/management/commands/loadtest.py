@@ -0,0 +1,68 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends concurrent GET requests to a running server and reports its "
+        "throughput and latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="e.g. http://localhost:8000/api/v1/tasks/")
+        parser.add_argument("--email", help="Authenticate as this user")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--warmup", type=int, default=50)
+
+    def get_headers(self, email):
+        if not email:
+            return {}
+        try:
+            user = User.objects.get(email=email)
+        except User.DoesNotExist as exc:
+            raise CommandError(f"User '{email}' does not exist") from exc
+        return {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+    def handle(self, *args, **options):
+        url = options["url"]
+        headers = self.get_headers(options["email"])
+        local = threading.local()
+
+        def send_request(_):
+            # One keep-alive connection per client thread
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+                local.session.headers.update(headers)
+
+            started = time.perf_counter()
+            response = local.session.get(url, timeout=60)
+            return time.perf_counter() - started, response.status_code
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            list(executor.map(send_request, range(options["warmup"])))
+
+            started = time.perf_counter()
+            results = list(executor.map(send_request, range(options["requests"])))
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        errors = sum(1 for _, status_code in results if status_code >= 400)
+        percentiles = statistics.quantiles(latencies, n=100)
+
+        self.stdout.write(
+            f"requests={len(results)} concurrency={options['concurrency']} "
+            f"errors={errors}\n"
+            f"throughput={len(results) / elapsed:.1f} req/s\n"
+            f"p50={percentiles[49]:.1f}ms p95={percentiles[94]:.1f}ms "
+            f"p99={percentiles[98]:.1f}ms max={latencies[-1]:.1f}ms"
+        )
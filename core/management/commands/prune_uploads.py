@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.uploads import prune_uploads
+
+
+class Command(BaseCommand):
+    help = "Deletes the direct uploads that can no longer be confirmed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep pruning every this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = prune_uploads()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} uploads"))
+
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
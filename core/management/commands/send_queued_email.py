@@ -0,0 +1,51 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.mail import prune_emails, send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Sends the emails queued in the outbox, retrying those that failed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Emails sent over each connection, EMAIL_OUTBOX_BATCH_SIZE by default",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=float,
+            default=7,
+            help="Days sent and failed emails are kept before being deleted",
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep sending every this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"] or settings.EMAIL_OUTBOX_BATCH_SIZE
+        while True:
+            # Connections broken or aged meanwhile are opened again
+            close_old_connections()
+            sent, failed = send_queued_emails(batch_size)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed")
+            pruned = prune_emails(timedelta(days=options["retention_days"]))
+            if pruned:
+                self.stdout.write(f"Deleted {pruned} sent or failed emails")
+
+            if options["every"] is None:
+                self.stdout.write(self.style.SUCCESS("Sent the queued emails"))
+                return
+            # A full batch likely left more emails due
+            if sent + failed < batch_size:
+                time.sleep(options["every"])
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from core.models import SlowQuery
+
+ORDERINGS = {
+    "total": F("total_time").desc(),
+    "mean": (F("total_time") / F("count")).desc(),
+    "max": F("max_time").desc(),
+    "count": F("count").desc(),
+}
+
+
+class Command(BaseCommand):
+    help = "Reports the captured slow queries costing the most time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--order-by", choices=ORDERINGS, default="total")
+        parser.add_argument(
+            "--plans", action="store_true", help="Print the last EXPLAIN plans"
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete the captured queries"
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} slow queries"))
+            return
+
+        slow_queries = SlowQuery.objects.order_by(ORDERINGS[options["order_by"]])[
+            : options["limit"]
+        ]
+        for rank, slow_query in enumerate(slow_queries, start=1):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"#{rank} {slow_query.view or '-'} "
+                    f"total={slow_query.total_time:.2f}s "
+                    f"count={slow_query.count} "
+                    f"mean={slow_query.mean_time * 1000:.1f}ms "
+                    f"max={slow_query.max_time * 1000:.1f}ms "
+                    f"last_seen={slow_query.last_seen:%Y-%m-%d %H:%M}"
+                )
+            )
+            self.stdout.write(f"  {slow_query.fingerprint}")
+            if options["plans"] and slow_query.plan:
+                for line in slow_query.plan.splitlines():
+                    self.stdout.write(f"    {line}")
@@ -0,0 +1,181 @@
+"""Cached URLs of stored media.
+
+Generating the URL of an object costs string work on every storage and,
+with presigned URLs, a signature. URLs are cached by object name, in the
+process then in the shared cache. Presigned URLs are cached for half
+their lifetime, so a URL handed out is always valid for at least half of
+it.
+
+List serializers collect the names of all their items first, so a page
+costs a lookup or two instead of storage work per row.
+"""
+
+import hashlib
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.utils.http import content_disposition_header
+from minio_storage.storage import MinioStorage
+from rest_framework import serializers
+
+from core.cache import CacheEntry, LocalCache, stats
+
+KEY_PREFIX = "core.media.url"
+# Context key of the URLs generated by `MediaURLListSerializer`
+CONTEXT_KEY = "media_urls"
+
+local_urls = LocalCache(settings.MEDIA_URL_LOCAL_MAX_ENTRIES)
+
+
+def is_presigned(storage):
+    return bool(getattr(storage, "presign_urls", False))
+
+
+def get_url_timeout(storage):
+    if is_presigned(storage):
+        return settings.MEDIA_URL_EXPIRY // 2
+    return settings.MEDIA_URL_EXPIRY
+
+
+def generate_url(storage, name):
+    if is_presigned(storage):
+        return storage.url(name, max_age=timedelta(seconds=settings.MEDIA_URL_EXPIRY))
+    return storage.url(name)
+
+
+def make_key(storage, name):
+    # URLs change with the storage and its location
+    fingerprint = "|".join(
+        [
+            f"{storage.__class__.__module__}.{storage.__class__.__qualname__}",
+            str(getattr(storage, "base_url", "")),
+            str(getattr(storage, "bucket_name", "")),
+            str(is_presigned(storage)),
+            name,
+        ]
+    )
+    return f"{KEY_PREFIX}:{hashlib.sha256(fingerprint.encode()).hexdigest()}"
+
+
+def get_media_urls(names, storage=None):
+    """
+    Returns the URL of each of the objects `names` of `storage`, the
+    default storage by default, generating only those not cached.
+    """
+    storage = storage or default_storage
+    keys = {make_key(storage, name): name for name in set(names) if name}
+    urls = {}
+
+    missing = []
+    for key, name in keys.items():
+        entry = local_urls.get(key)
+        if entry is None:
+            missing.append(key)
+        else:
+            urls[name] = entry.value
+    if not missing:
+        stats.increment("media_url_local_hit")
+        return urls
+
+    timeout = get_url_timeout(storage)
+    shared = cache.get_many(missing)
+    generated = {}
+    for key in missing:
+        entry = shared.get(key)
+        if entry is None:
+            entry = CacheEntry(
+                generate_url(storage, keys[key]), time.time() + timeout, 0
+            )
+            generated[key] = entry
+        local_urls.set(key, entry)
+        urls[keys[key]] = entry.value
+    stats.increment("media_url_generated" if generated else "media_url_shared_hit")
+
+    if generated:
+        cache.set_many(generated, timeout=timeout)
+    return urls
+
+
+def get_media_url(name, storage=None):
+    return get_media_urls([name], storage)[name]
+
+
+def get_download_url(name, filename, content_type, storage=None):
+    """
+    Returns a presigned URL downloading `name` of `storage`, the default
+    storage by default, as an attachment named `filename`, or None where
+    URLs are not presigned: those are public and can't name the attachment.
+
+    Not cached, as objects are shared by files of different names.
+    """
+    storage = storage or default_storage
+    if not isinstance(storage, MinioStorage) or not storage.presign_urls:
+        return None
+
+    # Signed for the public host when it differs from the API's endpoint
+    client = storage.base_url_client if storage.base_url else storage.client
+    url = client.presigned_get_object(
+        storage.bucket_name,
+        name,
+        expires=timedelta(seconds=settings.MEDIA_URL_EXPIRY),
+        response_headers={
+            "response-content-disposition": content_disposition_header(True, filename),
+            "response-content-type": content_type,
+        },
+    )
+    if storage.base_url:
+        # The base URL stands for the bucket, as in the storage's own URLs
+        parts = urlsplit(url)
+        key_path = parts.path[len(storage.bucket_name) + 1 :]
+        base_path = urlsplit(storage.base_url).path.rstrip("/")
+        url = urlunsplit(parts._replace(path=base_path + key_path))
+    return url
+
+
+def get_context_media_url(context, name):
+    """
+    Returns the URL of `name` generated for the serializer of `context`,
+    or the cached one.
+    """
+    urls = context.get(CONTEXT_KEY, {})
+    url = urls[name] if name in urls else get_media_url(name)
+    request = context.get("request")
+    return request.build_absolute_uri(url) if request else url
+
+
+class MediaURLMixin:
+    """
+    Represents files by their cached URL, of the default storage where all
+    media are stored.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return get_context_media_url(self.context, value.name)
+
+
+class MediaFileField(MediaURLMixin, serializers.FileField):
+    pass
+
+
+class MediaImageField(MediaURLMixin, serializers.ImageField):
+    pass
+
+
+class MediaURLListSerializer(serializers.ListSerializer):
+    """
+    Generates the media URLs of all the items in one batch before
+    serializing them, from the names of each returned by the child's
+    `get_media_names(instance)`.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        names = [name for item in items for name in self.child.get_media_names(item)]
+        self.context.setdefault(CONTEXT_KEY, {}).update(get_media_urls(names))
+        return super().to_representation(items)
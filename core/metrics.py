@@ -0,0 +1,103 @@
+"""Prometheus metrics of the API.
+
+Under gunicorn every worker writes its samples to files in
+`PROMETHEUS_MULTIPROC_DIR`, aggregated when `/metrics` is scraped.
+"""
+
+import functools
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUESTS = Counter(
+    "api_requests_total",
+    "Requests by view, action and status code",
+    ["view", "action", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Request latency by view and action",
+    ["view", "action"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "api_request_db_queries",
+    "SQL queries per request by view and action",
+    ["view", "action"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+CACHE_EVENTS = Counter(
+    "api_cache_events_total",
+    "Two-tier cache outcomes, see core.cache.CacheStats",
+    ["event"],
+)
+LOGIN_FAILURES = Counter("api_login_failures_total", "Failed login attempts")
+LOCKOUTS = Counter("api_lockouts_total", "Users locked out by axes")
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "api_password_hash_queue_depth",
+    "Password hashes waiting for a slot of the hashing pool",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "api_password_hash_queue_wait_seconds",
+    "Time password hashes waited for a slot of the hashing pool",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PASSWORD_HASH_REJECTIONS = Counter(
+    "api_password_hash_rejections_total",
+    "Password hashes rejected after waiting PASSWORD_HASHING_QUEUE_TIMEOUT",
+)
+ROLLUP_LATENCY = Histogram(
+    "api_completion_rollup_duration_seconds",
+    "Time to compute completion_percentage by model",
+    ["model"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+def timed_rollup(method):
+    """
+    Records the duration of a `completion_percentage` computation.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self):
+        started = time.perf_counter()
+        try:
+            return method(self)
+        finally:
+            ROLLUP_LATENCY.labels(model=self._meta.model_name).observe(
+                time.perf_counter() - started
+            )
+
+    return wrapper
+
+
+def on_login_failed(sender, **kwargs):
+    LOGIN_FAILURES.inc()
+
+
+def on_user_locked_out(sender, **kwargs):
+    LOCKOUTS.inc()
+
+
+def render_metrics():
+    """
+    Returns the metrics of all workers in the text exposition format.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,312 @@
+import json
+import logging
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from rest_framework.exceptions import APIException
+
+from core.instrumentation import (
+    ensure_profile,
+    get_current_profile,
+    profile_request,
+    profile_streaming_content,
+)
+from core.metrics import REQUEST_LATENCY, REQUEST_QUERIES, REQUESTS
+from core.profiling import PROFILERS, build_archive, make_profiler
+from users.authentication import JWTAuthentication
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "HTTP_X_PROFILE_REQUEST"
+PROFILER_PARAM = "_profile"
+PROFILER_HEADER = "HTTP_X_PROFILER"
+
+
+class ProfilerMiddleware:
+    """
+    Answers a request with a zip archive profiling it, instead of its
+    response, when a superuser adds `?_profile=cprofile` (call tree) or
+    `?_profile=flamegraph` (sampled stacks), or sends an `X-Profiler` header.
+    The archive also lists the request's SQL queries. Streamed responses are
+    profiled until their content is exhausted.
+
+    Disabled unless `REQUEST_PROFILER` is set. Under ASGI the call tree only
+    covers the event loop thread, while the flame graph samples every thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    # cProfile cannot run twice at once, so profile one request at a time
+    lock = threading.Lock()
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        name = self.get_requested_profiler(request)
+        if name is None or not self.is_allowed(self.authenticate(request)):
+            return self.get_response(request)
+        error_response = self.check_profiler(name)
+        if error_response:
+            return error_response
+
+        try:
+            profiler = make_profiler(
+                name,
+                settings.REQUEST_PROFILER_INTERVAL,
+                thread_ids={threading.get_ident()},
+            )
+            with profile_request(capture_queries=True) as request_profile:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                    # Streamed content mostly runs its queries once iterated
+                    if response.streaming:
+                        response.getvalue()
+                finally:
+                    profiler.disable()
+        finally:
+            self.lock.release()
+        return self.make_response(request, response, request_profile, profiler, name)
+
+    async def __acall__(self, request):
+        name = self.get_requested_profiler(request)
+        if name is None or not self.is_allowed(await self.aauthenticate(request)):
+            return await self.get_response(request)
+        error_response = self.check_profiler(name)
+        if error_response:
+            return error_response
+
+        try:
+            # Views may run in executor threads, so sample every thread
+            profiler = make_profiler(name, settings.REQUEST_PROFILER_INTERVAL)
+            with profile_request(capture_queries=True) as request_profile:
+                profiler.enable()
+                try:
+                    response = await self.get_response(request)
+                    if response.streaming:
+                        async for _chunk in response:
+                            pass
+                finally:
+                    profiler.disable()
+        finally:
+            self.lock.release()
+        return self.make_response(request, response, request_profile, profiler, name)
+
+    def get_requested_profiler(self, request):
+        if not settings.REQUEST_PROFILER:
+            return None
+        return request.GET.get(PROFILER_PARAM) or request.META.get(PROFILER_HEADER)
+
+    def authenticate(self, request):
+        # Runs before the view authenticates, so checks the token itself
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except APIException:
+            return None
+        return result[0] if result else None
+
+    async def aauthenticate(self, request):
+        try:
+            result = await JWTAuthentication().aauthenticate(request)
+        except APIException:
+            return None
+        return result[0] if result else None
+
+    def is_allowed(self, user):
+        return bool(user and user.is_superuser)
+
+    def check_profiler(self, name):
+        """
+        Returns an error response unless `name` can be profiled now, in which
+        case the caller holds the lock.
+        """
+        if name not in PROFILERS:
+            return self.error_response(
+                f"Unknown profiler '{name}', use one of: {', '.join(PROFILERS)}.",
+                400,
+            )
+        if not self.lock.acquire(blocking=False):
+            return self.error_response("Another request is being profiled.", 409)
+        return None
+
+    def error_response(self, message, status):
+        return JsonResponse(
+            {"message": message, "errors": {"detail": message}, "status_code": status},
+            status=status,
+        )
+
+    def make_response(self, request, response, request_profile, profiler, name):
+        content = build_archive(request, response, request_profile, profiler)
+        profile_response = HttpResponse(content, content_type="application/zip")
+        profile_response.headers["Content-Disposition"] = (
+            f'attachment; filename="profile-{name}.zip"'
+        )
+        profile_response.headers["X-Profiled-Status"] = str(response.status_code)
+        return profile_response
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Records each request's SQL queries, duplicate query fingerprints (the N+1
+    signal), DB, serializer and render time, and emits them as
+    `Server-Timing` headers and a JSON log line.
+
+    Enabled for every request by `REQUEST_INSTRUMENTATION`, or per request by
+    superusers sending an `X-Profile-Request: 1` header. Streamed responses
+    are only logged, once their content is exhausted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.is_requested(request):
+            return self.get_response(request)
+
+        with ensure_profile() as profile:
+            response = self.get_response(request)
+        self.finish(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_requested(request):
+            return await self.get_response(request)
+
+        with ensure_profile() as profile:
+            response = await self.get_response(request)
+        self.finish(request, response, profile)
+        return response
+
+    def is_requested(self, request):
+        return settings.REQUEST_INSTRUMENTATION or request.META.get(PROFILE_HEADER)
+
+    def is_enabled(self, request):
+        if settings.REQUEST_INSTRUMENTATION:
+            return True
+        # The view has authenticated the user by now
+        user = getattr(request, "user", None)
+        return bool(user and user.is_superuser)
+
+    def finish(self, request, response, profile):
+        if not self.is_enabled(request):
+            return
+        if response.streaming:
+            profile_streaming_content(
+                response, profile, lambda: self.report(request, response, profile)
+            )
+        else:
+            self.report(request, response, profile)
+
+    def report(self, request, response, profile):
+        duplicates = profile.duplicate_queries
+        # The headers of streamed responses are sent before their content runs
+        if not response.streaming:
+            response.headers["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={profile.db_time * 1000:.1f};desc="{profile.query_count}'
+                    f' queries, {len(duplicates)} duplicated"',
+                    f"serializer;dur={profile.serializer_time * 1000:.1f}",
+                    f"render;dur={profile.phases['render'] * 1000:.1f}",
+                    f"total;dur={profile.total_time * 1000:.1f}",
+                ]
+            )
+
+        user = getattr(request, "user", None)
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_profile",
+                    "method": request.method,
+                    "path": request.get_full_path(),
+                    "status": response.status_code,
+                    "user": str(user.pk) if user and user.is_authenticated else None,
+                    "queries": profile.query_count,
+                    "db_ms": round(profile.db_time * 1000, 1),
+                    "serializer_ms": round(profile.serializer_time * 1000, 1),
+                    "render_ms": round(profile.phases["render"] * 1000, 1),
+                    "total_ms": round(profile.total_time * 1000, 1),
+                    "duplicate_queries": [
+                        {"sql": sql, "count": count}
+                        for sql, count in sorted(
+                            duplicates.items(), key=lambda item: -item[1]
+                        )
+                    ],
+                }
+            )
+        )
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and observes their latency and SQL query count, labelled
+    by view (the viewset class) and action, for `/metrics`. Streamed
+    responses are observed once their content is exhausted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with ensure_profile(detailed=False) as profile:
+            response = self.get_response(request)
+        self.finish(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        with ensure_profile(detailed=False) as profile:
+            response = await self.get_response(request)
+        self.finish(request, response, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = get_current_profile()
+        method = request.method.lower()
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None:
+            profile.view, profile.action = request.resolver_match.view_name, method
+            return None
+
+        actions = getattr(view_func, "actions", None) or {}
+        profile.view, profile.action = view_class.__name__, actions.get(method, method)
+        return None
+
+    def finish(self, request, response, profile):
+        if response.streaming:
+            profile_streaming_content(
+                response, profile, lambda: self.observe(request, response, profile)
+            )
+        else:
+            self.observe(request, response, profile)
+
+    def observe(self, request, response, profile):
+        view = profile.view or "unresolved"
+        action = profile.action or "none"
+        REQUESTS.labels(
+            view=view, action=action, method=request.method, status=response.status_code
+        ).inc()
+        REQUEST_LATENCY.labels(view=view, action=action).observe(profile.total_time)
+        REQUEST_QUERIES.labels(view=view, action=action).observe(profile.query_count)
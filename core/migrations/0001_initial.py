@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:33
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ModelVersion",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("model_label", models.CharField(max_length=100, unique=True)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("updated_date", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Model Version",
+                "verbose_name_plural": "Model Versions",
+                "db_table": "core_model_version",
+            },
+        ),
+    ]
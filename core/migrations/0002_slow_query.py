@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:42
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("digest", models.CharField(max_length=40)),
+                ("view", models.CharField(blank=True, max_length=200)),
+                ("fingerprint", models.TextField()),
+                ("sql", models.TextField()),
+                ("plan", models.TextField(blank=True)),
+                ("count", models.PositiveBigIntegerField(default=0)),
+                ("total_time", models.FloatField(default=0)),
+                ("max_time", models.FloatField(default=0)),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Slow Query",
+                "verbose_name_plural": "Slow Queries",
+                "db_table": "core_slow_query",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("digest", "view"), name="unique_slow_query_per_view"
+                    )
+                ],
+            },
+        ),
+    ]
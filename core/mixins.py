@@ -0,0 +1,293 @@
+import hashlib
+from collections import namedtuple
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.decorators import classonlymethod
+from django.utils.http import http_date
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from config.db_routers import use_primary
+from core.cache import get_or_compute, make_key, tag_for_model
+from core.versions import aget_model_versions, get_model_versions
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to read actions and answers
+    `304 Not Modified` without touching the queryset or serializer when none
+    of the models the response depends on have changed.
+
+    Validators are derived from the change counters kept by
+    `core.versions.track_model_versions`, so every model listed here must be
+    tracked. Usage: conditional_models = [Milestone, Task]
+    """
+
+    conditional_models = []
+    conditional_actions = ["list", "retrieve"]
+
+    def get_conditional_models(self):
+        return [self.queryset.model, *self.conditional_models]
+
+    def make_conditional_validators(self, request, versions):
+        # Representations vary per user (role scoping) and per day (overdue
+        # status), so both are part of the validator as well as the full URL.
+        fingerprint = "|".join(
+            [
+                request.build_absolute_uri(),
+                str(request.user.pk),
+                timezone.localdate().isoformat(),
+                *(f"{label}:{version}" for label, version, _ in versions),
+            ]
+        )
+        etag = f'"{hashlib.sha256(fingerprint.encode()).hexdigest()[:32]}"'
+        last_modified = max(
+            (int(updated_date.timestamp()) for _, _, updated_date in versions),
+            default=None,
+        )
+        return etag, last_modified
+
+    def get_conditional_validators(self, request):
+        versions = get_model_versions(self.get_conditional_models())
+        return self.make_conditional_validators(request, versions)
+
+    async def aget_conditional_validators(self, request):
+        versions = await aget_model_versions(self.get_conditional_models())
+        return self.make_conditional_validators(request, versions)
+
+    def is_conditional_request(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and self.action in self.conditional_actions
+        )
+
+    def evaluate_preconditions(self, request):
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            self.set_conditional_headers(response)
+        return response
+
+    def get_not_modified_response(self, request):
+        """
+        Returns a `304 Not Modified` (or `412 Precondition Failed`) response if
+        the request's validators match, otherwise None.
+        """
+        self.conditional_validators = None
+        if not self.is_conditional_request(request):
+            return None
+
+        self.conditional_validators = self.get_conditional_validators(request)
+        return self.evaluate_preconditions(request)
+
+    async def aget_not_modified_response(self, request):
+        """
+        Async variant of `get_not_modified_response`.
+        """
+        self.conditional_validators = None
+        if not self.is_conditional_request(request):
+            return None
+
+        self.conditional_validators = await self.aget_conditional_validators(request)
+        return self.evaluate_preconditions(request)
+
+    def set_conditional_headers(self, response):
+        etag, last_modified = self.conditional_validators
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        response.headers["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ["Authorization"])
+
+    def list(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = self.get_not_modified_response(request)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return response
+
+    # Polls with matching validators are answered without leaving the event
+    # loop; the rest is rendered by the sync handler in a thread.
+    async def alist(self, request, *args, **kwargs):
+        response = await self.aget_not_modified_response(request)
+        if response is None:
+            response = await sync_to_async(super().list)(request, *args, **kwargs)
+        return response
+
+    async def aretrieve(self, request, *args, **kwargs):
+        response = await self.aget_not_modified_response(request)
+        if response is None:
+            response = await sync_to_async(super().retrieve)(request, *args, **kwargs)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (
+            getattr(self, "conditional_validators", None)
+            and response.status_code == 200
+        ):
+            self.set_conditional_headers(response)
+        return response
+
+
+CachedResponse = namedtuple("CachedResponse", ["data", "status", "headers"])
+
+
+class CacheResponseMixin:
+    """
+    Serves read actions through `core.cache.get_or_compute`. Entries are
+    tagged with the viewset's model and `cache_models`, each of which must be
+    registered with `invalidate_on_change`. Usage: cache_models = [Department]
+
+    Override `get_cache_scope` when the response varies per user.
+    """
+
+    cache_models = []
+    cache_actions = ["list", "retrieve"]
+
+    def get_cache_scope(self):
+        return ""
+
+    def get_response_cache_key(self, request):
+        models = [self.queryset.model, *self.cache_models]
+        return make_key(
+            self.__class__.__name__,
+            self.action,
+            # Pagination links are absolute, so vary by host too
+            request.build_absolute_uri(),
+            self.get_cache_scope(),
+            tags=[tag_for_model(model) for model in models],
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cache_actions:
+            return handler(request, *args, **kwargs)
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            return CachedResponse(
+                response.data, response.status_code, dict(response.items())
+            )
+
+        # Cached entries outlive replica lag, so they are filled from the primary
+        with use_primary():
+            cached = get_or_compute(self.get_response_cache_key(request), compute)
+        return Response(cached.data, status=cached.status, headers=cached.headers)
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class AsyncReadMixin:
+    """
+    Serves `async_actions` as coroutines when `ASYNC_VIEWS` is enabled, so an
+    ASGI worker keeps serving other requests while one waits on the database.
+    Other actions run the regular sync dispatch in a thread.
+
+    An action awaits its `a<action>` method if defined (e.g. `alist`),
+    otherwise runs its sync handler in a thread. Authenticators and
+    permissions may likewise define `aauthenticate` and `ahas_permission`.
+    """
+
+    async_actions = ["list", "retrieve"]
+    serve_async = False
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        serve_async = settings.ASYNC_VIEWS
+        view = super().as_view(actions, serve_async=serve_async, **initkwargs)
+        if serve_async:
+            markcoroutinefunction(view)
+        return view
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.serve_async:
+            return super().dispatch(request, *args, **kwargs)
+        if self.action_map.get(request.method.lower()) in self.async_actions:
+            return self.async_dispatch(request, *args, **kwargs)
+        return sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        """
+        `APIView.dispatch` with async authentication, permission checks and
+        handler.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            handler = getattr(self, f"a{self.action}", None)
+            if handler is None:
+                handler = sync_to_async(getattr(self, self.action))
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        if self.get_throttles():
+            await sync_to_async(self.check_throttles)(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, "ahas_permission"):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(request, self)
+
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 
 class BaseModel(models.Model):
@@ -8,3 +9,122 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ModelVersion(BaseModel):
+    model_label = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Model Version"
+        verbose_name_plural = "Model Versions"
+        db_table = "core_model_version"
+
+    def __str__(self):
+        return f"{self.model_label} (v{self.version})"
+
+
+class SlowQuery(BaseModel):
+    digest = models.CharField(max_length=40)
+    view = models.CharField(max_length=200, blank=True)
+    fingerprint = models.TextField()
+    sql = models.TextField()
+    plan = models.TextField(blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+    total_time = models.FloatField(default=0)
+    max_time = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Slow Query"
+        verbose_name_plural = "Slow Queries"
+        db_table = "core_slow_query"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["digest", "view"], name="unique_slow_query_per_view"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.fingerprint[:80]} ({self.count}x)"
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.count if self.count else 0.0
+
+
+class Blob(BaseModel):
+    """
+    A file stored once under the digest of its content, see core.storage.
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_date = models.DateTimeField(auto_now_add=True)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Blob"
+        verbose_name_plural = "Blobs"
+        db_table = "core_blob"
+        indexes = [
+            models.Index(
+                fields=["updated_date"],
+                condition=models.Q(ref_count=0),
+                name="unreferenced_blob",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+
+class OutboundEmail(BaseModel):
+    """
+    An email queued to be sent by the `send_queued_email` command, see
+    core.mail.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    subject = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=320)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    # [content, mimetype] pairs, e.g. the HTML version of the body
+    alternatives = models.JSONField(default=list)
+    # [filename, base64 content, mimetype] triples
+    attachments = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_date = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+    sent_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Outbound Emails"
+        db_table = "core_outbound_email"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_date"],
+                condition=models.Q(status="queued"),
+                name="queued_outbound_email",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)} ({self.status})"
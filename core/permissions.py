@@ -1,22 +1,43 @@
+from asgiref.sync import sync_to_async
 from rest_framework import permissions
 from rest_framework.permissions import DjangoModelPermissions
 
+from users.claims import has_role
 
-class CustomDjangoModelPermissions(DjangoModelPermissions):
-    def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
-            return False
 
+class CustomDjangoModelPermissions(DjangoModelPermissions):
+    def get_view_permission(self, request, view):
+        """
+        Returns the view permission required by safe requests, otherwise None.
+        """
         model_cls = getattr(getattr(view, "queryset", None), "model", None)
 
         if request.method in permissions.SAFE_METHODS and model_cls:
             app_label = model_cls._meta.app_label
             model_name = model_cls._meta.model_name
-            permission_codename = f"{app_label}.view_{model_name}"
+            return f"{app_label}.view_{model_name}"
+        return None
+
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+
+        permission_codename = self.get_view_permission(request, view)
+        if permission_codename:
             return request.user.has_perm(permission_codename)
 
         return super().has_permission(request, view)
 
+    async def ahas_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+
+        permission_codename = self.get_view_permission(request, view)
+        if permission_codename:
+            return await request.user.ahas_perm(permission_codename)
+
+        return await sync_to_async(super().has_permission)(request, view)
+
 
 class HasRole(permissions.BasePermission):
     """
@@ -28,7 +49,4 @@ class HasRole(permissions.BasePermission):
         self.allowed_roles = allowed_role
 
     def has_permission(self, request, view):
-        return (
-            request.user.is_authenticated
-            and request.user.groups.filter(name=self.allowed_roles).exists()
-        )
+        return request.user.is_authenticated and has_role(request, self.allowed_roles)
@@ -0,0 +1,119 @@
+"""On-demand profiling of single requests, see core.middleware.ProfilerMiddleware.
+
+A profile is a zip archive of the request's SQL queries and either a cProfile
+call tree or the collapsed stacks of a sampled flame graph.
+"""
+
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import zipfile
+from collections import Counter
+
+PROFILERS = ("cprofile", "flamegraph")
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of `thread_ids`, or of every other thread, each
+    `interval` seconds and counts them in the collapsed format read by
+    flamegraph.pl and speedscope. Busy threads only yield the GIL every
+    `sys.getswitchinterval()`, which bounds the effective sampling rate.
+    """
+
+    def __init__(self, interval, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self.run, name="request-profiler", daemon=True
+        )
+
+    # Named after the methods of cProfile.Profile
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.stacks[self.fold(names.get(thread_id, thread_id), frame)] += 1
+
+    @staticmethod
+    def fold(thread_name, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.append(str(thread_name))
+        # Semicolons separate the frames of a collapsed stack
+        return ";".join(name.replace(";", ":") for name in reversed(names))
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def make_profiler(name, interval, thread_ids=None):
+    if name == "cprofile":
+        return cProfile.Profile()
+    return SamplingProfiler(interval, thread_ids)
+
+
+def format_call_tree(profiler, limit=60):
+    """
+    Returns the functions of `profiler` by cumulative time, then what each
+    of them called.
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    stats.print_stats(limit)
+    stats.print_callees(limit)
+    return output.getvalue()
+
+
+def build_archive(request, response, request_profile, profiler):
+    """
+    Returns the zip archive of a profiled request.
+    """
+    summary = {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "total_ms": round(request_profile.total_time * 1000, 1),
+        "db_ms": round(request_profile.db_time * 1000, 1),
+        "query_count": request_profile.query_count,
+        "queries": [
+            {"sql": sql, "duration_ms": round(duration * 1000, 3)}
+            for sql, duration in request_profile.queries
+        ],
+    }
+
+    content = io.BytesIO()
+    with zipfile.ZipFile(content, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("queries.json", json.dumps(summary, indent=2))
+        if isinstance(profiler, cProfile.Profile):
+            profiler.create_stats()
+            # Loadable with pstats, snakeviz or gprof2dot
+            archive.writestr("profile.pstats", marshal.dumps(profiler.stats))
+            archive.writestr("call_tree.txt", format_call_tree(profiler))
+        else:
+            archive.writestr("flamegraph.folded", profiler.collapsed())
+    return content.getvalue()
@@ -1,5 +1,12 @@
+import itertools
+
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from rest_framework import status
 from rest_framework.renderers import JSONRenderer
 
+from core.instrumentation import measure
+
 
 class JSONRenderer(JSONRenderer):
     def render(self, data, accepted_media_type=None, renderer_context=None):
@@ -40,4 +47,55 @@ class JSONRenderer(JSONRenderer):
                 "status_code": response.status_code if response else 200,
             }
 
-        return super().render(formatted_response, accepted_media_type, renderer_context)
+        with measure("render"):
+            return super().render(
+                formatted_response, accepted_media_type, renderer_context
+            )
+
+    def render_stream(self, items, status_code=status.HTTP_200_OK):
+        """
+        Render an iterable of items as the `data` list of the response envelope,
+        yielding one chunk per item so only a single item is held in memory.
+        """
+        yield b'{"message":"","data":['
+
+        for index, item in enumerate(items):
+            if index:
+                yield b","
+            with measure("render"):
+                chunk = super().render(item)
+            yield chunk
+
+        yield f'],"status_code":{status_code}}}'.encode()
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    Streams the `{message, data, status_code}` envelope for unpaginated list
+    endpoints, e.g. `StreamingJSONResponse(serializer.data for obj in queryset)`.
+
+    The first item is computed before the headers are sent, so a failing
+    query gets an error response. An item failing later can only abort the
+    response midway: its status is already sent, and clients are left with
+    a body that is not valid JSON.
+
+    Under ASGI the items are computed one at a time in a thread, rather than
+    all at once before anything is sent.
+    """
+
+    def __init__(self, items, status=status.HTTP_200_OK, **kwargs):
+        items = iter(items)
+        first = list(itertools.islice(items, 1))
+        super().__init__(
+            JSONRenderer().render_stream(itertools.chain(first, items), status),
+            status=status,
+            content_type=JSONRenderer.media_type,
+            **kwargs,
+        )
+
+    async def __aiter__(self):
+        # StreamingHttpResponse would consume the whole sync iterator first
+        chunks = iter(self)
+        next_chunk = sync_to_async(next)
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
@@ -0,0 +1,64 @@
+import functools
+import gzip
+import hashlib
+from collections import namedtuple
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from drf_spectacular.settings import spectacular_settings
+
+from core.cache import get_or_compute
+
+SchemaArtifact = namedtuple("SchemaArtifact", ["content", "compressed_content", "etag"])
+
+
+@functools.cache
+def get_code_version():
+    """
+    Returns `CODE_VERSION` if set (e.g. the image tag or commit), otherwise a
+    digest of the project's source files, computed once per process.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+
+    base_dir = Path(settings.BASE_DIR)
+    source_dirs = [base_dir / "config"] + [
+        Path(app_config.path)
+        for app_config in apps.get_app_configs()
+        if Path(app_config.path).is_relative_to(base_dir)
+    ]
+
+    digest = hashlib.sha256()
+    for source_dir in sorted(source_dirs):
+        for path in sorted(source_dir.rglob("*.py")):
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_schema_artifact(api_version, renderer_class):
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(api_version=api_version)
+    schema = generator.get_schema(request=None, public=True)
+    content = renderer_class().render(schema, renderer_context={})
+
+    return SchemaArtifact(
+        content=content,
+        compressed_content=gzip.compress(content, mtime=0),
+        etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+    )
+
+
+def get_schema_cache_key(api_version, renderer_class):
+    return f"core.schema:{get_code_version()}:{api_version}:{renderer_class.format}"
+
+
+def get_schema_artifact(api_version, renderer_class):
+    """
+    Returns the rendered schema of `api_version`, generated at most once per
+    code version and shared through the cache.
+    """
+    return get_or_compute(
+        get_schema_cache_key(api_version, renderer_class),
+        lambda: build_schema_artifact(api_version, renderer_class),
+        timeout=settings.SCHEMA_CACHE_TIMEOUT,
+    )
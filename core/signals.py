@@ -0,0 +1,40 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+
+def connect_model_changes(callback, models, dispatch_uid, ignore_fields=()):
+    """
+    Call `callback(model)` whenever one of `models` is saved or deleted, or
+    one of its many-to-many relations changes. Saves of `ignore_fields`
+    only, and fixture loading, are skipped. Call from `AppConfig.ready()`.
+    """
+    ignored_fields = frozenset(ignore_fields)
+
+    def on_save_or_delete(sender, **kwargs):
+        if kwargs.get("raw"):
+            return
+        update_fields = kwargs.get("update_fields")
+        if update_fields and update_fields <= ignored_fields:
+            return
+        callback(sender)
+
+    def on_m2m_changed(sender, instance, action, reverse, model, **kwargs):
+        if not action.startswith("post_"):
+            return
+        # The change belongs to the model declaring the many-to-many field
+        callback(model if reverse else type(instance))
+
+    for model in models:
+        model_uid = f"{dispatch_uid}:{model._meta.label_lower}"
+        post_save.connect(
+            on_save_or_delete, sender=model, weak=False, dispatch_uid=model_uid
+        )
+        post_delete.connect(
+            on_save_or_delete, sender=model, weak=False, dispatch_uid=model_uid
+        )
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(
+                on_m2m_changed,
+                sender=field.remote_field.through,
+                weak=False,
+                dispatch_uid=f"{model_uid}:{field.name}",
+            )
@@ -0,0 +1,158 @@
+"""Capture of slow SQL queries with their EXPLAIN plans.
+
+Queries slower than `SLOW_QUERY_THRESHOLD` are logged with their plan and
+aggregated per fingerprint and originating view in `SlowQuery`, reported by
+the `slow_queries` management command.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.instrumentation import fingerprint_sql, get_current_profile
+
+logger = logging.getLogger(__name__)
+
+# Set while a slow query is explained and saved, so those queries are skipped
+_capturing = ContextVar("capturing_slow_query", default=False)
+
+EXPLAINABLE_STATEMENTS = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"}
+
+
+def get_statement(sql):
+    words = sql.split(None, 1)
+    return words[0].upper() if words else ""
+
+
+def explain(connection, sql, params):
+    """
+    Returns the plan of `sql`, executed by EXPLAIN ANALYZE when
+    `SLOW_QUERY_EXPLAIN_ANALYZE` is set and the statement is a read.
+    """
+    statement = get_statement(sql)
+    if statement not in EXPLAINABLE_STATEMENTS:
+        return ""
+
+    prefix = connection.ops.explain_query_prefix()
+    # ANALYZE runs the statement again, so never for writes
+    if settings.SLOW_QUERY_EXPLAIN_ANALYZE and statement == "SELECT":
+        # Unless the backend does not support it, e.g. SQLite
+        with contextlib.suppress(ValueError):
+            prefix = connection.ops.explain_query_prefix(analyze=True)
+
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            rows = cursor.fetchall()
+    except DatabaseError as exc:
+        return f"EXPLAIN failed: {exc}"
+    # The plan text is the last column, SQLite prepends node ids
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def record_slow_query(connection, sql, params, duration):
+    from core.models import SlowQuery
+
+    fingerprint = fingerprint_sql(sql)
+    profile = get_current_profile()
+    view = f"{profile.view}.{profile.action}" if profile and profile.view else ""
+    plan = explain(connection, sql, params)
+
+    logger.warning(
+        json.dumps(
+            {
+                "event": "slow_query",
+                "database": connection.alias,
+                "view": view or None,
+                "duration_ms": round(duration * 1000, 1),
+                "fingerprint": fingerprint,
+                "plan": plan,
+            }
+        )
+    )
+
+    # Saved once the caller's transaction commits rather than within it, so
+    # concurrent slow requests don't wait on each other's lock of the record.
+    # The record of a rolled back transaction is lost, not its log line.
+    transaction.on_commit(
+        lambda: save_slow_query(view, fingerprint, sql, plan, duration),
+        using=router.db_for_write(SlowQuery),
+    )
+
+
+def save_slow_query(view, fingerprint, sql, plan, duration):
+    from core.models import SlowQuery
+
+    digest = hashlib.sha1(fingerprint.encode(), usedforsecurity=False).hexdigest()
+    queryset = SlowQuery.objects.filter(digest=digest, view=view)
+    changes = {
+        "count": F("count") + 1,
+        "total_time": F("total_time") + duration,
+        "max_time": Greatest("max_time", Value(duration)),
+        "sql": sql,
+        "plan": plan,
+        "last_seen": timezone.now(),
+    }
+    token = _capturing.set(True)
+    try:
+        with transaction.atomic():
+            if queryset.update(**changes):
+                return
+            try:
+                with transaction.atomic():
+                    SlowQuery.objects.create(
+                        digest=digest,
+                        view=view,
+                        fingerprint=fingerprint,
+                        sql=sql,
+                        plan=plan,
+                        count=1,
+                        total_time=duration,
+                        max_time=duration,
+                    )
+            except IntegrityError:
+                # Recorded concurrently by another request
+                queryset.update(**changes)
+    except DatabaseError:
+        logger.exception("Could not record slow query")
+    finally:
+        _capturing.reset(token)
+
+
+def capture_slow_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper recording queries slower than
+    `SLOW_QUERY_THRESHOLD` seconds.
+    """
+    threshold = settings.SLOW_QUERY_THRESHOLD
+    if not threshold or many or _capturing.get():
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - started
+    if duration >= threshold:
+        token = _capturing.set(True)
+        try:
+            record_slow_query(context["connection"], sql, params, duration)
+        finally:
+            _capturing.reset(token)
+    return result
+
+
+def install_slow_query_capture(sender, connection, **kwargs):
+    """
+    `connection_created` receiver adding `capture_slow_query` to every
+    connection.
+    """
+    if capture_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(capture_slow_query)
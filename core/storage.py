@@ -0,0 +1,331 @@
+"""Content-addressed storage of attachments.
+
+`BlobStorage` stores the content of each file once, under its SHA-256
+digest, in the default storage. Saving content already stored returns the
+existing blob and deleting a file releases a reference to its blob.
+Unreferenced blobs are deleted by the `collect_blobs` command once their
+grace period is over, so a file released and saved again meanwhile is
+never lost. Their row stays locked until their object is deleted, and new
+blobs are written while their row is locked, so collecting a blob never
+races with storing it again.
+
+Names that are not blobs, e.g. of files stored before deduplication, are
+handed to the default storage as they are.
+"""
+
+import hashlib
+import io
+import os
+import posixpath
+import tempfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F, FileField
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+from minio_storage.storage import MinioStorage
+
+from core.models import Blob
+
+# Content larger than this is spooled to disk while it is hashed
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+# How long unreferenced blobs are kept before `collect_garbage`
+GRACE_PERIOD = timedelta(hours=24)
+
+
+def hash_file(content, hasher=None):
+    """
+    Returns the SHA-256 digest and the size of the file `content`, read in
+    chunks from its current position.
+    """
+    hasher = hasher or hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: content.read(File.DEFAULT_CHUNK_SIZE), b""):
+        hasher.update(chunk)
+        size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def get_blob_name(digest, name):
+    # The extension is kept for the content type guessed from names
+    extension = os.path.splitext(name)[1].lower()
+    return f"blobs/{digest[:2]}/{digest}{extension}"
+
+
+class BlobStorage(Storage):
+    def __init__(self, backend=None):
+        self.backend = backend or default_storage
+
+    def add_reference(self, digest):
+        """
+        Returns the blob of `digest` with one more reference, if it exists.
+        """
+        updated = Blob.objects.filter(digest=digest).update(
+            ref_count=F("ref_count") + 1, updated_date=timezone.now()
+        )
+        return Blob.objects.filter(digest=digest).first() if updated else None
+
+    def register(self, digest, name, size, content=None):
+        """
+        Records the object `name` as the blob of `digest`, or returns the
+        name of the blob recorded meanwhile.
+
+        `content` is written as the object while the new row is locked, as
+        `collect_garbage` locks the row of the blob it deletes.
+        """
+        try:
+            with transaction.atomic():
+                Blob.objects.create(digest=digest, name=name, size=size, ref_count=1)
+                if content is not None:
+                    # Possibly left by a rolled back transaction, never trusted
+                    self.backend.delete(name)
+                    self.backend.save(name, content)
+            return name
+        except IntegrityError:
+            blob = self.add_reference(digest)
+            if blob is None:
+                raise
+            return blob.name
+
+    def _save(self, name, content):
+        try:
+            content.seek(0)
+            seekable = content.seekable()
+        except (AttributeError, io.UnsupportedOperation):
+            seekable = False
+
+        if seekable:
+            digest, size = hash_file(content)
+            content.seek(0)
+            return self.store(name, content, digest, size)
+
+        # Hashed while spooled, to be read again when uploaded
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spooled:
+            hasher = hashlib.sha256()
+            size = 0
+            for chunk in content.chunks():
+                hasher.update(chunk)
+                spooled.write(chunk)
+                size += len(chunk)
+            spooled.seek(0)
+            return self.store(name, File(spooled, name), hasher.hexdigest(), size)
+
+    def store(self, name, content, digest, size):
+        blob = self.add_reference(digest)
+        if blob is not None:
+            return blob.name
+
+        return self.register(digest, get_blob_name(digest, name), size, content)
+
+    def adopt(self, name, digest=None):
+        """
+        Makes the stored object `name` a blob and returns the name to refer
+        to it by, that of an existing blob of the same content if any, whose
+        duplicate is then deleted.
+
+        `digest` spares reading the object when already known.
+        """
+        blob = Blob.objects.filter(name=name).first()
+        if blob is not None:
+            self.add_reference(blob.digest)
+            return name
+
+        if digest is None:
+            with self.backend.open(name) as file:
+                digest, _ = hash_file(file)
+
+        blob = self.add_reference(digest)
+        if blob is not None:
+            self.backend.delete(name)
+            return blob.name
+
+        blob_name = self.register(digest, name, self.backend.size(name))
+        if blob_name != name:
+            self.backend.delete(name)
+        return blob_name
+
+    def delete(self, name):
+        """
+        Releases a reference to the blob `name`, or deletes other objects.
+        """
+        if not name:
+            return
+        released = Blob.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1, updated_date=timezone.now()
+        )
+        if not released and not Blob.objects.filter(name=name).exists():
+            self.backend.delete(name)
+
+    def get_derived_names(self, name):
+        """
+        Returns the names of the objects derived from `name`, e.g. the
+        thumbnails of a picture, named after it with a `_` suffix.
+        """
+        prefix = f"{os.path.splitext(name)[0]}_"
+        if isinstance(self.backend, MinioStorage):
+            # Listed by prefix, rather than the whole directory
+            objects = self.backend.client.list_objects(
+                self.backend.bucket_name, prefix=prefix
+            )
+            return [obj.object_name for obj in objects if not obj.is_dir]
+
+        directory = posixpath.dirname(name)
+        try:
+            _, files = self.backend.listdir(directory)
+        except FileNotFoundError:
+            return []
+        names = [posixpath.join(directory, file) for file in files]
+        return [name for name in names if name.startswith(prefix)]
+
+    def collect_garbage(self, grace_period=GRACE_PERIOD):
+        """
+        Deletes the blobs unreferenced for longer than `grace_period`, and
+        the objects derived from them, and returns how many blobs.
+        """
+        unreferenced = Blob.objects.filter(
+            ref_count=0, updated_date__lt=timezone.now() - grace_period
+        )
+        deleted = 0
+        for pk in list(unreferenced.values_list("pk", flat=True)):
+            with transaction.atomic():
+                # Locked until the object is deleted, so storing the same
+                # content waits for the row to be gone. A blob referenced
+                # again meanwhile is kept.
+                blob = (
+                    unreferenced.select_for_update(skip_locked=True)
+                    .filter(pk=pk)
+                    .first()
+                )
+                if blob is None:
+                    continue
+                for name in self.get_derived_names(blob.name):
+                    self.backend.delete(name)
+                self.backend.delete(blob.name)
+                blob.delete()
+            deleted += 1
+        return deleted
+
+    def recount_references(self):
+        """
+        Sets the reference count of each blob to the number of file fields
+        referring to it, e.g. after files were changed with `update()`.
+        """
+        from django.apps import apps
+
+        counts = {}
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, FileField) and field.storage is self:
+                    names = model._default_manager.filter(
+                        **{f"{field.attname}__in": Blob.objects.values("name")}
+                    ).values_list(field.attname, flat=True)
+                    for name in names.iterator():
+                        counts[name] = counts.get(name, 0) + 1
+
+        changed = 0
+        for blob in Blob.objects.only("name", "ref_count").iterator():
+            ref_count = counts.get(blob.name, 0)
+            if blob.ref_count != ref_count:
+                Blob.objects.filter(pk=blob.pk).update(
+                    ref_count=ref_count, updated_date=timezone.now()
+                )
+                changed += 1
+        return changed
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def open(self, name, mode="rb"):
+        return self.backend.open(name, mode)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def get_accessed_time(self, name):
+        return self.backend.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.backend.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+    def get_valid_name(self, name):
+        return self.backend.get_valid_name(name)
+
+    def get_available_name(self, name, max_length=None):
+        # Blob names are chosen by content when saving
+        return name
+
+    def generate_filename(self, filename):
+        return self.backend.generate_filename(filename)
+
+
+blob_storage = BlobStorage()
+
+
+def get_blob_storage():
+    return blob_storage
+
+
+def get_blob_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and field.storage is blob_storage
+    ]
+
+
+def _remember_files(sender, instance, **kwargs):
+    # Deferred fields are left out, they can't have been changed
+    instance._loaded_files = {
+        field.attname: getattr(value, "name", value)
+        for field in get_blob_fields(sender)
+        if (value := instance.__dict__.get(field.attname)) is not None
+    }
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    loaded = getattr(instance, "_loaded_files", {})
+    released = []
+    for field in get_blob_fields(sender):
+        name = getattr(instance, field.attname).name
+        previous = loaded.get(field.attname)
+        if previous and previous != name:
+            released.append(previous)
+    _remember_files(sender, instance)
+    if released and not raw:
+        transaction.on_commit(lambda: [blob_storage.delete(name) for name in released])
+
+
+def _on_delete(sender, instance, **kwargs):
+    released = [
+        getattr(instance, field.attname).name for field in get_blob_fields(sender)
+    ]
+    released = [name for name in released if name]
+    if released:
+        transaction.on_commit(lambda: [blob_storage.delete(name) for name in released])
+
+
+def track_blob_references(*models):
+    """
+    Release the blobs of files replaced or deleted with their instance.
+    Call from `AppConfig.ready()`.
+    """
+    for model in models:
+        dispatch_uid = f"track_blob_references:{model._meta.label_lower}"
+        post_init.connect(_remember_files, sender=model, dispatch_uid=dispatch_uid)
+        post_save.connect(_on_save, sender=model, dispatch_uid=dispatch_uid)
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=dispatch_uid)
@@ -0,0 +1,27 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from PIL import Image
+
+
+def make_image(image_format="JPEG", mode="RGB", size=(64, 64), color="red"):
+    content = io.BytesIO()
+    Image.new(mode, size, color=color).save(content, format=image_format)
+    return ContentFile(content.getvalue())
+
+
+class TemporaryMediaMixin:
+    """
+    Stores the media files of each test in a temporary `MEDIA_ROOT`.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
@@ -0,0 +1,130 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from benchmarks.runner import find_regressions, get_baseline, run_benchmarks
+from tasks.models import KSI, Task
+from tasks.views import KSIViewSet
+from users.models import Role
+
+User = get_user_model()
+
+
+class FindRegressionsTestCase(TestCase):
+    def setUp(self):
+        self.baseline = {
+            "Leads/task-list": {"status": 200, "queries": 10, "median_ms": 100.0}
+        }
+
+    def find(self, status=200, queries=10, median_ms=100.0):
+        results = {
+            "Leads/task-list": {
+                "status": status,
+                "queries": queries,
+                "median_ms": median_ms,
+            },
+            "Leads/task-create": {"status": 201, "queries": 50, "median_ms": 900.0},
+        }
+        return find_regressions(
+            results,
+            self.baseline,
+            latency_tolerance=0.25,
+            latency_floor_ms=5.0,
+            query_tolerance=0,
+        )
+
+    def test_within_tolerances(self):
+        """
+        Ensure results within the tolerances and new scenarios do not regress.
+        """
+        self.assertEqual(self.find(queries=9, median_ms=130.0), [])
+
+    def test_regressions(self):
+        """
+        Ensure more queries, slower responses and status changes regress.
+        """
+        self.assertEqual(len(self.find(queries=11)), 1)
+        self.assertEqual(len(self.find(median_ms=130.1)), 1)
+        self.assertEqual(len(self.find(status=403)), 1)
+
+    def test_baseline_is_last_passing_run_on_dataset(self):
+        """
+        Ensure the baseline skips runs with regressions or on other datasets.
+        """
+        dataset = {"vendor": "sqlite", "users": 1, "ksis": 1, "tasks": 1}
+        runs = [
+            {"dataset": dataset, "regressions": [], "results": {"n": 1}},
+            {"dataset": dataset, "regressions": ["x"], "results": {"n": 2}},
+            {"dataset": {**dataset, "tasks": 2}, "regressions": [], "results": {}},
+        ]
+
+        self.assertEqual(get_baseline(runs, dataset)["results"], {"n": 1})
+        self.assertIsNone(get_baseline(runs, {**dataset, "users": 2}))
+
+
+class RunBenchmarksTestCase(TestCase):
+    def setUp(self):
+        for name in ["Super-Admin", "Not-Assigned", "Leads", "Experts", "HR"]:
+            Role.objects.create(name=name)
+        call_command(
+            "generate_load_data",
+            "--departments=1",
+            "--positions-per-department=3",
+            "--users=6",
+            "--ksis-per-department=1",
+            "--milestones-per-ksi=1",
+            "--kpis-per-milestone=1",
+            "--major-activities-per-kpi=1",
+            "--tasks-per-major-activity=2",
+            "--sub-tasks=1",
+            "--sub-task-depth=1",
+            "--seed=1",
+            stdout=StringIO(),
+        )
+        User.objects.create_superuser("Admin", "User", "admin@email.com", "1234abcd!A")
+
+    def test_scenarios_run(self):
+        """
+        Ensure every scenario runs for every role without server errors and
+        leaves the data untouched.
+        """
+        tasks = Task.objects.count()
+
+        results = run_benchmarks(repeat=1, warmup=0, write=lambda line: None)
+
+        self.assertIn("Super-Admin/task-list", results)
+        self.assertIn("Leads/user-assign_role", results)
+        self.assertEqual(results["Super-Admin/task-list"]["status"], 200)
+        self.assertEqual(results["Super-Admin/user-create"]["status"], 201)
+        for key, result in results.items():
+            self.assertLess(result["status"], 500, key)
+            self.assertGreater(result["queries"], 0, key)
+        self.assertEqual(Task.objects.count(), tasks)
+
+    def test_streamed_content_is_measured(self):
+        """
+        Ensure the queries a streamed response runs while its content is
+        produced are counted.
+        """
+        ksi = KSI.objects.get()
+        ksi.pk = None
+        ksi._state.adding = True
+        ksi.save()
+
+        def count_queries():
+            results = run_benchmarks(
+                repeat=1,
+                warmup=0,
+                roles=["Super-Admin"],
+                only="ksi-structure",
+                write=lambda line: None,
+            )
+            return results["Super-Admin/ksi-structure"]["queries"]
+
+        queries = count_queries()
+        # The second KSI is then fetched in its own chunk, once streaming
+        with mock.patch.object(KSIViewSet, "structure_chunk_size", 1):
+            self.assertGreater(count_queries(), queries)
@@ -0,0 +1,183 @@
+import hashlib
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Blob
+from core.storage import blob_storage
+from core.tests.helpers import TemporaryMediaMixin, make_image
+from users.models import Role, User
+
+
+class UnseekableStream(io.RawIOBase):
+    def __init__(self, content):
+        self.content = io.BytesIO(content)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.content.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class BlobStorageTestCase(TemporaryMediaMixin, TestCase):
+    def test_same_content_is_stored_once(self):
+        """
+        Ensure saving the same content twice stores it once under its digest.
+        """
+        first = blob_storage.save("a/first.TXT", ContentFile(b"content"))
+        second = blob_storage.save("b/second.txt", ContentFile(b"content"))
+
+        digest = hashlib.sha256(b"content").hexdigest()
+        self.assertEqual(first, f"blobs/{digest[:2]}/{digest}.txt")
+        self.assertEqual(second, first)
+        self.assertEqual(Blob.objects.get(digest=digest).ref_count, 2)
+        with default_storage.open(first) as file:
+            self.assertEqual(file.read(), b"content")
+
+    def test_unseekable_content(self):
+        """
+        Ensure content that can only be read once is stored whole.
+        """
+        name = blob_storage.save("stream.bin", File(UnseekableStream(b"x" * 100000)))
+        self.assertEqual(default_storage.size(name), 100000)
+        self.assertEqual(Blob.objects.get(name=name).size, 100000)
+
+    def test_garbage_collection(self):
+        """
+        Ensure blobs are deleted once unreferenced for the grace period, and
+        not when referenced again meanwhile.
+        """
+        name = blob_storage.save("file.txt", ContentFile(b"content"))
+        blob_storage.save("file.txt", ContentFile(b"content"))
+        blob_storage.delete(name)
+        self.assertEqual(blob_storage.collect_garbage(timedelta(0)), 0)
+
+        blob_storage.delete(name)
+        self.assertEqual(blob_storage.collect_garbage(timedelta(hours=1)), 0)
+        # Saved again within the grace period
+        blob_storage.save("again.txt", ContentFile(b"content"))
+        self.assertEqual(blob_storage.collect_garbage(timedelta(0)), 0)
+        self.assertTrue(default_storage.exists(name))
+
+        blob_storage.delete(name)
+        Blob.objects.update(updated_date=timezone.now() - timedelta(hours=2))
+        self.assertEqual(blob_storage.collect_garbage(timedelta(hours=1)), 1)
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_blob_row_outlives_its_object(self):
+        """
+        Ensure a collected blob's row is deleted only after its object, so
+        storing the content again meanwhile waits for the row lock.
+        """
+        name = blob_storage.save("file.txt", ContentFile(b"content"))
+        blob_storage.delete(name)
+
+        def delete(deleted_name):
+            self.assertTrue(Blob.objects.filter(name=name).exists())
+            default_storage.__class__.delete(default_storage, deleted_name)
+
+        with mock.patch.object(default_storage, "delete", side_effect=delete):
+            self.assertEqual(blob_storage.collect_garbage(timedelta(0)), 1)
+        self.assertFalse(Blob.objects.exists())
+
+    def test_leftover_objects_are_replaced(self):
+        """
+        Ensure an object left at a blob name without its row is written
+        again rather than trusted.
+        """
+        digest = hashlib.sha256(b"content").hexdigest()
+        default_storage.save(f"blobs/{digest[:2]}/{digest}.txt", ContentFile(b"cont"))
+
+        name = blob_storage.save("file.txt", ContentFile(b"content"))
+        with default_storage.open(name) as file:
+            self.assertEqual(file.read(), b"content")
+
+    def test_derived_objects_are_collected(self):
+        """
+        Ensure objects derived from a collected blob, e.g. its thumbnails,
+        are deleted along with it, and those of other blobs are kept.
+        """
+        name = blob_storage.save("picture.png", make_image("PNG"))
+        other = blob_storage.save("other.png", make_image("PNG", color="blue"))
+        root = name.rsplit(".", 1)[0]
+        other_root = other.rsplit(".", 1)[0]
+        for thumbnail in [
+            f"{root}_32.webp",
+            f"{root}_32.jpeg",
+            f"{other_root}_32.webp",
+        ]:
+            default_storage.save(thumbnail, ContentFile(b"thumbnail"))
+
+        blob_storage.delete(name)
+        self.assertEqual(blob_storage.collect_garbage(timedelta(0)), 1)
+        self.assertFalse(default_storage.exists(f"{root}_32.webp"))
+        self.assertFalse(default_storage.exists(f"{root}_32.jpeg"))
+        self.assertTrue(default_storage.exists(other))
+        self.assertTrue(default_storage.exists(f"{other_root}_32.webp"))
+
+    def test_adopt(self):
+        """
+        Ensure objects stored directly become blobs, and duplicates of an
+        existing blob are replaced by it.
+        """
+        name = default_storage.save("direct/first.txt", ContentFile(b"content"))
+        self.assertEqual(blob_storage.adopt(name), name)
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 1)
+
+        duplicate = default_storage.save("direct/second.txt", ContentFile(b"content"))
+        self.assertEqual(blob_storage.adopt(duplicate), name)
+        self.assertFalse(default_storage.exists(duplicate))
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 2)
+
+    def test_other_objects_are_deleted(self):
+        """
+        Ensure deleting an object that is not a blob deletes it.
+        """
+        name = default_storage.save("legacy/file.txt", ContentFile(b"content"))
+        blob_storage.delete(name)
+        self.assertFalse(default_storage.exists(name))
+
+    def test_file_fields_reference_blobs(self):
+        """
+        Ensure replaced and deleted files of models release their blob, and
+        recounting matches the files referring to blobs.
+        """
+        Role.objects.create(name="Not-Assigned")
+        users = [
+            User.objects.create_user(
+                email=f"user{index}@email.com",
+                password="1234abcd!A",
+                first_name="Test",
+                last_name="User",
+            )
+            for index in range(2)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in users:
+                user.profile_picture.save("picture.png", make_image("PNG", color="red"))
+        name = users[0].profile_picture.name
+        self.assertEqual(users[1].profile_picture.name, name)
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            users[0].profile_picture.save("other.png", make_image("PNG", color="blue"))
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.get(pk=users[1].pk).delete()
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 0)
+
+        # Changed without signals
+        User.objects.filter(pk=users[0].pk).update(profile_picture=name)
+        self.assertEqual(blob_storage.recount_references(), 2)
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 1)
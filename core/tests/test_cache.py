@@ -0,0 +1,176 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from basedata.models import Department
+from core.cache import (
+    CacheEntry,
+    get_or_compute,
+    get_tag_versions,
+    invalidate_tags,
+    local_cache,
+    make_key,
+    stats,
+    tag_for_model,
+)
+from users.models import Role, User
+
+
+class CacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_make_key_is_stable_until_tag_invalidated(self):
+        """
+        Ensure keys only change when one of their tags is invalidated.
+        """
+        key = make_key("departments", "list", tags=["a", "b"])
+        self.assertEqual(key, make_key("departments", "list", tags=["b", "a"]))
+        self.assertNotEqual(key, make_key("departments", "retrieve", tags=["a", "b"]))
+
+        invalidate_tags("c")
+        self.assertEqual(key, make_key("departments", "list", tags=["a", "b"]))
+
+        invalidate_tags("b")
+        self.assertNotEqual(key, make_key("departments", "list", tags=["a", "b"]))
+
+    def test_evicted_tag_gets_new_version(self):
+        """
+        Ensure a tag evicted from the cache does not resurrect old entries.
+        """
+        version = get_tag_versions(["a"])["a"]
+        cache.clear()
+        self.assertNotEqual(version, get_tag_versions(["a"])["a"])
+
+    def test_model_changes_invalidate_model_tag(self):
+        """
+        Ensure saving, updating and deleting a registered model
+        invalidates its tag.
+        """
+        Role.objects.create(name="Super-Admin")
+        admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        tag = tag_for_model(Department)
+
+        version = get_tag_versions([tag])[tag]
+        department = Department.objects.create(
+            department_name="Engineering",
+            created_by=admin_user,
+            updated_by=admin_user,
+        )
+        self.assertNotEqual(version, get_tag_versions([tag])[tag])
+
+        version = get_tag_versions([tag])[tag]
+        department.delete()
+        self.assertNotEqual(version, get_tag_versions([tag])[tag])
+
+    def test_m2m_changes_invalidate_owner_tag(self):
+        """
+        Ensure many-to-many changes invalidate the model declaring the field.
+        """
+        role = Role.objects.create(name="HR")
+        tag = tag_for_model(Role)
+
+        version = get_tag_versions([tag])[tag]
+        role.permissions.clear()
+        self.assertNotEqual(version, get_tag_versions([tag])[tag])
+
+
+class TwoTierCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        stats.reset()
+
+    def test_hits_local_then_shared_tier(self):
+        """
+        Ensure values are computed once, then served from the local tier,
+        and from the shared tier once the local tier lost them.
+        """
+        compute = mock.Mock(return_value=["Engineering"])
+
+        for _ in range(3):
+            self.assertEqual(get_or_compute("key", compute), ["Engineering"])
+        local_cache.clear()
+        self.assertEqual(get_or_compute("key", compute), ["Engineering"])
+
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(
+            stats.as_dict(),
+            {"miss": 1, "recompute": 1, "local_hit": 2, "shared_hit": 1},
+        )
+
+    def test_local_tier_is_bounded(self):
+        """
+        Ensure the local tier evicts its least recently used entries.
+        """
+        with mock.patch.object(local_cache, "max_entries", 2):
+            for key in ["a", "b", "c"]:
+                get_or_compute(key, mock.Mock(return_value=key))
+
+            self.assertIsNone(local_cache.get("a"))
+            self.assertIsNotNone(local_cache.get("c"))
+
+    def test_concurrent_misses_compute_once(self):
+        """
+        Ensure only one of many concurrent misses recomputes the value.
+        """
+        compute_calls = []
+        results = []
+
+        def compute():
+            compute_calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute("key", compute))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(compute_calls), 1)
+        self.assertEqual(results, ["value"] * 5)
+
+    def test_entry_near_expiry_is_refreshed_early(self):
+        """
+        Ensure an entry close to expiry is refreshed by a single request.
+        """
+        entry = CacheEntry("stale", time.time() + 0.01, delta=10)
+        cache.set("key", entry)
+
+        self.assertEqual(get_or_compute("key", lambda: "fresh"), "fresh")
+        self.assertEqual(stats.as_dict()["early_refresh"], 1)
+
+    def test_stale_value_served_while_another_worker_refreshes(self):
+        """
+        Ensure requests do not pile up while the lock holder refreshes.
+        """
+        cache.set("key", CacheEntry("stale", time.time() + 0.01, delta=10))
+        cache.add("key:lock", 1)
+
+        compute = mock.Mock(return_value="fresh")
+        self.assertEqual(get_or_compute("key", compute), "stale")
+        compute.assert_not_called()
+
+    def test_fresh_entry_is_not_refreshed_early(self):
+        """
+        Ensure entries far from expiry are served as is.
+        """
+        cache.set("key", CacheEntry("cached", time.time() + 3600, delta=0.01))
+
+        compute = mock.Mock(return_value="fresh")
+        self.assertEqual(get_or_compute("key", compute), "cached")
+        compute.assert_not_called()
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_default_cache
+
+LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+REDIS = {
+    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+    "LOCATION": "redis://localhost:6379/0",
+}
+
+
+class CacheChecksTestCase(SimpleTestCase):
+    def test_process_local_default_cache_with_several_workers(self):
+        """
+        Ensure a process-local default cache is reported when serving with
+        several workers.
+        """
+        with override_settings(SERVER_WORKERS=4, CACHES={"default": LOCMEM}):
+            self.assertEqual(
+                [error.id for error in check_default_cache(None)], ["core.W001"]
+            )
+
+    def test_shared_or_single_worker_cache(self):
+        """
+        Ensure a shared cache, a single worker, or running outside gunicorn is
+        not reported.
+        """
+        with override_settings(SERVER_WORKERS=4, CACHES={"default": REDIS}):
+            self.assertEqual(check_default_cache(None), [])
+        for workers in [None, 1]:
+            with override_settings(SERVER_WORKERS=workers, CACHES={"default": LOCMEM}):
+                self.assertEqual(check_default_cache(None), [])
@@ -0,0 +1,195 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from config import db_routers
+from core.cache import local_cache
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+from users.models import Role
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTestCase(APITestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        db_routers.reset_replica_health()
+
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.admin_user2 = User.objects.create_superuser(
+            email="admin2@email.com",
+            password="1234abcd!A",
+            first_name="Admin2",
+            last_name="User",
+        )
+
+        # Create the task hierarchy
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.ksi = KSI.objects.create(
+            ksi_name="Strategic Initiative 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=self.department,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.milestone = Milestone.objects.create(
+            milestone_name="Milestone 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            ksi=self.ksi,
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.kpi = KPI.objects.create(
+            kpi_name="KPI 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            milestone=self.milestone,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.major_activity = MajorActivity.objects.create(
+            major_activity_name="Major Activity 1",
+            start_date="2024-01-01",
+            end_date="2024-01-31",
+            kpi=self.kpi,
+            department=self.department,
+            weight=70,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.task = Task.objects.create(
+            task_name="Task 1",
+            start_date="2024-01-01",
+            end_date="2024-01-15",
+            major_activity=self.major_activity,
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Copy everything to the replica
+        for instance in [
+            self.admin_user,
+            self.admin_user2,
+            self.department,
+            self.ksi,
+            self.milestone,
+            self.kpi,
+            self.major_activity,
+            self.task,
+        ]:
+            instance.save(using="replica", force_insert=True)
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.admin2_token = str(RefreshToken.for_user(self.admin_user2).access_token)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.task_detail_url = reverse(
+            "task-detail", kwargs={"version": "v1", "pk": self.task.id}
+        )
+        self.department_list_url = reverse("department-list", kwargs={"version": "v1"})
+
+    def _rename_task_on_replica(self, name):
+        Task.objects.using("replica").filter(pk=self.task.pk).update(task_name=name)
+
+    def test_safe_requests_read_from_replica(self):
+        """
+        Ensure reads of safe requests are served by the replica.
+        """
+        self._rename_task_on_replica("Task 1 on replica")
+
+        response = self.client.get(self.task_detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["name"], "Task 1 on replica")
+
+    def test_writes_go_to_primary_and_pin_user(self):
+        """
+        Ensure writes go to the primary and the writer reads their own writes.
+        """
+        response = self.client.patch(
+            self.task_detail_url, {"name": "Task 1 renamed"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Task.objects.using("replica").get(pk=self.task.pk).task_name, "Task 1"
+        )
+
+        response = self.client.get(self.task_detail_url)
+        self.assertEqual(response.json()["data"]["name"], "Task 1 renamed")
+
+    def test_other_users_are_not_pinned(self):
+        """
+        Ensure only the writing user is pinned to the primary.
+        """
+        self.client.patch(
+            self.task_detail_url, {"name": "Task 1 renamed"}, format="json"
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin2_token}")
+        response = self.client.get(self.task_detail_url)
+        self.assertEqual(response.json()["data"]["name"], "Task 1")
+
+    @override_settings(DATABASE_REPLICA_PIN_TIMEOUT=0)
+    def test_pin_expires(self):
+        """
+        Ensure the writer goes back to the replica once the pin expires.
+        """
+        self.client.patch(
+            self.task_detail_url, {"name": "Task 1 renamed"}, format="json"
+        )
+
+        response = self.client.get(self.task_detail_url)
+        self.assertEqual(response.json()["data"]["name"], "Task 1")
+
+    def test_lagging_replica_is_skipped(self):
+        """
+        Ensure reads fall back to the primary while the replica lags.
+        """
+        self._rename_task_on_replica("Task 1 on replica")
+
+        with mock.patch.object(db_routers, "get_replica_lag", return_value=60.0):
+            response = self.client.get(self.task_detail_url)
+        self.assertEqual(response.json()["data"]["name"], "Task 1")
+
+    def test_cached_responses_are_filled_from_primary(self):
+        """
+        Ensure cached responses never capture the replica's state.
+        """
+        Department.objects.using("replica").filter(pk=self.department.pk).update(
+            department_name="Engineering on replica"
+        )
+
+        response = self.client.get(self.department_list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["results"][0]["name"], "Engineering")
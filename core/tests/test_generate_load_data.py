@@ -0,0 +1,165 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F, Q, Sum
+from django.test import TestCase
+
+from basedata.models import ChallengeGroup, Department, Position
+from core.cache import get_tag_versions, tag_for_model
+from core.versions import get_model_versions
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+from users.models import Role
+
+User = get_user_model()
+
+
+class GenerateLoadDataTestCase(TestCase):
+    def setUp(self):
+        # Create roles
+        for name in ["Super-Admin", "Not-Assigned", "Leads", "Experts"]:
+            Role.objects.create(name=name)
+
+    def generate(self):
+        call_command(
+            "generate_load_data",
+            "--departments=2",
+            "--positions-per-department=3",
+            "--users=8",
+            "--challenge-types=2",
+            "--challenge-groups=3",
+            "--ksis-per-department=2",
+            "--milestones-per-ksi=3",
+            "--kpis-per-milestone=2",
+            "--major-activities-per-kpi=2",
+            "--tasks-per-major-activity=3",
+            "--sub-tasks=2",
+            "--sub-task-depth=2",
+            "--seed=1",
+            "--batch-size=50",
+            stdout=StringIO(),
+        )
+
+    def assertWeightsSumTo100(self, queryset, group_by):
+        totals = queryset.values(group_by).annotate(total=Sum("weight"))
+        self.assertTrue(totals)
+        for total in totals:
+            self.assertEqual(total["total"], Decimal("100.00"))
+
+    def test_org_is_generated(self):
+        """
+        Ensure departments, positions, users with roles and challenge groups
+        are generated.
+        """
+        self.generate()
+
+        self.assertEqual(Department.objects.count(), 2)
+        self.assertEqual(Position.objects.count(), 6)
+        self.assertEqual(ChallengeGroup.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 8)
+        self.assertFalse(User.objects.filter(groups=None).exists())
+        self.assertEqual(User.objects.exclude(position=None).count(), 6)
+        self.assertTrue(
+            User.objects.get(pk=User.objects.first().pk).check_password("1234abcd!A")
+        )
+
+    def test_hierarchy_is_generated(self):
+        """
+        Ensure the task hierarchy has the requested size, with nested sub-tasks.
+        """
+        self.generate()
+
+        self.assertEqual(KSI.objects.count(), 4)
+        self.assertEqual(Milestone.objects.count(), 12)
+        self.assertEqual(KPI.objects.count(), 24)
+        self.assertEqual(MajorActivity.objects.count(), 48)
+        # 3 tasks with 2 sub-tasks each having 2 sub-tasks
+        self.assertEqual(Task.objects.count(), 48 * (3 + 6 + 12))
+        self.assertEqual(
+            Task.objects.filter(parent_task__parent_task__isnull=False).count(),
+            48 * 12,
+        )
+        self.assertFalse(Task.objects.filter(positions=None).exists())
+
+    def test_invariants_hold(self):
+        """
+        Ensure weights sum to 100 and dates stay within their parent's.
+        """
+        self.generate()
+
+        self.assertWeightsSumTo100(Milestone.objects.all(), "ksi")
+        self.assertWeightsSumTo100(MajorActivity.objects.all(), "kpi")
+        self.assertWeightsSumTo100(
+            Task.objects.filter(parent_task=None), "major_activity"
+        )
+        self.assertWeightsSumTo100(
+            Task.objects.exclude(parent_task=None), "parent_task"
+        )
+
+        outside = Q(start_date__gt=F("end_date"))
+        self.assertFalse(
+            Milestone.objects.filter(
+                outside
+                | Q(start_date__lt=F("ksi__start_date"))
+                | Q(end_date__gt=F("ksi__end_date"))
+            ).exists()
+        )
+        self.assertFalse(
+            MajorActivity.objects.filter(
+                outside
+                | Q(start_date__lt=F("kpi__start_date"))
+                | Q(end_date__gt=F("kpi__end_date"))
+                | Q(end_date__gt=F("start_date") + MajorActivity.MAX_DAYS_SPAN)
+            ).exists()
+        )
+        self.assertFalse(
+            Task.objects.filter(
+                outside
+                | Q(start_date__lt=F("major_activity__start_date"))
+                | Q(end_date__gt=F("major_activity__end_date"))
+                | Q(start_date__lt=F("parent_task__start_date"))
+                | Q(end_date__gt=F("parent_task__end_date"))
+                | Q(end_date__gt=F("start_date") + Task.MAX_DAYS_SPAN)
+            ).exists()
+        )
+
+    def test_runs_can_be_repeated(self):
+        """
+        Ensure a second run adds a new organisation despite unique names.
+        """
+        self.generate()
+        self.generate()
+        self.assertEqual(Department.objects.count(), 4)
+        self.assertEqual(
+            Department.objects.annotate(ksi_count=Count("ksis"))
+            .filter(ksi_count=2)
+            .count(),
+            4,
+        )
+
+    def test_caches_see_the_generated_data(self):
+        """
+        Ensure the versions and cache tags of the generated models change,
+        as bulk inserts send no signals.
+        """
+        models = [Department, Task, User]
+        tags = [tag_for_model(model) for model in models]
+        versions = get_model_versions(models)
+        tag_versions = get_tag_versions(tags)
+
+        self.generate()
+
+        self.assertNotEqual(get_model_versions(models), versions)
+        new_tag_versions = get_tag_versions(tags)
+        for tag in tags:
+            self.assertNotEqual(new_tag_versions[tag], tag_versions[tag], tag)
+
+    def test_roles_are_required(self):
+        """
+        Ensure the command asks for seeded roles.
+        """
+        Role.objects.filter(name__in=["Leads", "Experts", "Not-Assigned"]).delete()
+        with self.assertRaisesMessage(CommandError, "seed_roles"):
+            self.generate()
@@ -0,0 +1,190 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from core.instrumentation import RequestProfile, fingerprint_sql
+from tasks.models import KSI
+from tasks.views import KSIViewSet
+from users.models import Role
+
+User = get_user_model()
+
+
+class FingerprintSQLTestCase(SimpleTestCase):
+    def test_values_are_normalized(self):
+        """
+        Ensure queries differing only in values share a fingerprint.
+        """
+        self.assertEqual(
+            fingerprint_sql("SELECT * FROM t WHERE a = 1 AND b = 'x' LIMIT 21"),
+            fingerprint_sql("SELECT * FROM t WHERE a = 25 AND b = 'y' LIMIT 21"),
+        )
+
+    def test_in_lists_are_collapsed(self):
+        """
+        Ensure IN lists of any length share a fingerprint.
+        """
+        self.assertEqual(
+            fingerprint_sql("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (...)",
+        )
+        self.assertEqual(
+            fingerprint_sql("SELECT * FROM t WHERE id IN (%s, %s)"),
+            fingerprint_sql("SELECT * FROM t WHERE id IN (%s,%s,%s,%s)"),
+        )
+
+
+class RequestProfileTestCase(SimpleTestCase):
+    def test_duplicate_queries_are_counted(self):
+        """
+        Ensure repeated fingerprints are reported as duplicates.
+        """
+        profile = RequestProfile()
+        for sql in [
+            "SELECT * FROM users_user WHERE id = 1",
+            "SELECT * FROM users_user WHERE id = 2",
+            "SELECT * FROM users_user WHERE id = 3",
+        ]:
+            profile.record_query(sql, 0.001)
+        profile.record_query("SELECT * FROM basedata_department", 0.002)
+
+        self.assertEqual(profile.query_count, 4)
+        self.assertAlmostEqual(profile.db_time, 0.005)
+        self.assertEqual(
+            profile.duplicate_queries, {"SELECT * FROM users_user WHERE id = ?": 3}
+        )
+
+
+class RequestInstrumentationTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        viewer_role = Role.objects.create(name="Viewer")
+        viewer_role.permissions.add(
+            *Permission.objects.filter(codename="view_department")
+        )
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.viewer_user = User.objects.create_user(
+            email="viewer@email.com",
+            password="1234abcd!A",
+            first_name="Viewer",
+            last_name="User",
+        )
+        self.viewer_user.groups.add(viewer_role)
+
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.viewer_token = str(RefreshToken.for_user(self.viewer_user).access_token)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.list_url = reverse("department-list", kwargs={"version": "v1"})
+
+    def test_disabled_by_default(self):
+        """
+        Ensure responses carry no timings unless instrumentation is requested.
+        """
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_superuser_can_request_timings(self):
+        """
+        Ensure superusers get Server-Timing headers and a log line on request.
+        """
+        with self.assertLogs("core.middleware", level="INFO") as logs:
+            response = self.client.get(self.list_url, HTTP_X_PROFILE_REQUEST="1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        server_timing = response["Server-Timing"]
+        for metric in ["db;dur=", "serializer;dur=", "render;dur=", "total;dur="]:
+            self.assertIn(metric, server_timing)
+
+        log_line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(log_line["event"], "request_profile")
+        self.assertEqual(log_line["status"], 200)
+        self.assertEqual(log_line["user"], str(self.admin_user.pk))
+        self.assertGreater(log_line["queries"], 0)
+        self.assertIn(f'desc="{log_line["queries"]} queries', server_timing)
+
+    def test_streamed_response_is_logged_once_exhausted(self):
+        """
+        Ensure a streamed response is logged with the queries and render time
+        of its content, once the content is exhausted.
+        """
+        for number in range(6):
+            KSI.objects.create(
+                ksi_name=f"KSI {number}",
+                start_date="2024-01-01",
+                end_date="2024-12-31",
+                department=self.department,
+                created_by=self.admin_user,
+                updated_by=self.admin_user,
+            )
+        url = reverse("ksi-structure", kwargs={"version": "v1"})
+
+        patch_chunk_size = mock.patch.object(KSIViewSet, "structure_chunk_size", 2)
+        with patch_chunk_size, self.assertLogs("core.middleware", "INFO") as logs:
+            response = self.client.get(url, HTTP_X_PROFILE_REQUEST="1")
+            self.assertEqual(logs.records, [])
+            b"".join(response.streaming_content)
+
+        self.assertNotIn("Server-Timing", response)
+        log_line = json.loads(logs.records[0].getMessage())
+        self.assertGreater(log_line["render_ms"], 0)
+        # The milestones of each chunk of 2 KSIs are prefetched apart
+        self.assertIn(
+            3,
+            [
+                query["count"]
+                for query in log_line["duplicate_queries"]
+                if "tasks_milestone" in query["sql"]
+            ],
+        )
+
+    def test_other_users_cannot_request_timings(self):
+        """
+        Ensure the profiling header is ignored for users other than superusers.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.viewer_token}")
+        response = self.client.get(self.list_url, HTTP_X_PROFILE_REQUEST="1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_INSTRUMENTATION=True)
+    def test_enabled_for_every_request(self):
+        """
+        Ensure REQUEST_INSTRUMENTATION reports every user's requests.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.viewer_token}")
+        with self.assertLogs("core.middleware", level="INFO") as logs:
+            response = self.client.get(self.list_url)
+
+        self.assertIn("Server-Timing", response)
+        log_line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(log_line["user"], str(self.viewer_user.pk))
+        self.assertEqual(log_line["duplicate_queries"], [])
@@ -0,0 +1,215 @@
+import io
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import mail as outbox
+from core.models import OutboundEmail
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+
+def send_queued_email(**options):
+    output = io.StringIO()
+    call_command("send_queued_email", stdout=output, **options)
+    return output.getvalue()
+
+
+@override_settings(
+    EMAIL_BACKEND="core.mail.OutboxEmailBackend",
+    EMAIL_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class OutboxTestCase(TestCase):
+    def queue(self, count=1, **kwargs):
+        for index in range(count):
+            message = EmailMultiAlternatives(
+                subject=f"Subject {index}",
+                body="Body",
+                to=[f"user{index}@icog.et"],
+                **kwargs,
+            )
+            message.attach_alternative("<p>Body</p>", "text/html")
+            message.send()
+
+    def test_messages_are_queued_then_sent(self):
+        """
+        Ensure sending mail only queues it, and the command sends it whole.
+        """
+        self.queue(reply_to=["support@icog.et"], headers={"X-Tag": "test"})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().status, "queued")
+
+        self.assertIn("Sent 1 emails, 0 failed", send_queued_email())
+        (message,) = mail.outbox
+        self.assertEqual(message.subject, "Subject 0")
+        self.assertEqual(message.to, ["user0@icog.et"])
+        self.assertEqual(message.reply_to, ["support@icog.et"])
+        self.assertEqual(message.extra_headers, {"X-Tag": "test"})
+        self.assertEqual(message.alternatives[0][0], "<p>Body</p>")
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, "sent")
+        # The content may hold live links
+        self.assertEqual((email.body, email.alternatives), ("", []))
+        self.assertEqual(email.to, ["user0@icog.et"])
+
+        send_queued_email()
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_batch_is_sent_over_one_connection(self):
+        """
+        Ensure a batch of emails is sent over one connection, and emails
+        beyond the batch size are left for the next one.
+        """
+        self.queue(count=5)
+        with mock.patch.object(
+            outbox, "get_connection", wraps=outbox.get_connection
+        ) as get_connection:
+            self.assertEqual(outbox.send_queued_emails(batch_size=3), (3, 0))
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(outbox.send_queued_emails(batch_size=3), (2, 0))
+
+    def test_claimed_emails_are_not_sent_twice(self):
+        """
+        Ensure emails claimed by a worker are only sent again by another
+        once the claim expired.
+        """
+        self.queue()
+        self.assertEqual(len(outbox.claim_emails(10)), 1)
+        self.assertEqual(outbox.claim_emails(10), [])
+
+        OutboundEmail.objects.update(next_attempt_date=timezone.now())
+        self.assertEqual(outbox.send_queued_emails(), (1, 0))
+        self.assertEqual(OutboundEmail.objects.get().attempts, 2)
+
+    def test_emails_claimed_by_another_worker_are_skipped(self):
+        """
+        Ensure the claim on each email is renewed before it is sent, and an
+        email another worker claimed since its claim expired is skipped.
+        """
+        self.queue(count=2)
+        emails = outbox.claim_emails(10)
+        # A batch so slow that the claim on its last email expired
+        OutboundEmail.objects.filter(pk=emails[1].pk).update(
+            next_attempt_date=timezone.now()
+        )
+        self.assertEqual(len(outbox.claim_emails(10)), 1)
+
+        claim_emails = mock.patch.object(outbox, "claim_emails", return_value=emails)
+        with claim_emails, self.assertLogs("core.mail", "WARNING"):
+            self.assertEqual(outbox.send_queued_emails(), (1, 0))
+        self.assertEqual([message.to for message in mail.outbox], [emails[0].to])
+        self.assertEqual(OutboundEmail.objects.get(pk=emails[0].pk).status, "sent")
+        self.assertEqual(OutboundEmail.objects.get(pk=emails[1].pk).status, "queued")
+
+    @override_settings(
+        EMAIL_DELIVERY_BACKEND="core.tests.test_mail.FailingEmailBackend",
+        EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+        EMAIL_OUTBOX_RETRY_DELAY=60,
+    )
+    def test_failed_emails_are_retried_with_backoff(self):
+        """
+        Ensure failed emails are retried after a doubling delay until the
+        last attempt.
+        """
+        self.queue()
+        email = OutboundEmail.objects.get()
+        for attempt, delay in [(1, 60), (2, 120)]:
+            with self.assertLogs("core.mail", "WARNING"):
+                self.assertEqual(outbox.send_queued_emails(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, attempt)
+            self.assertEqual(email.status, "queued")
+            self.assertIn("SMTPServerDisconnected", email.last_error)
+            remaining = email.next_attempt_date - timezone.now()
+            self.assertAlmostEqual(remaining.total_seconds(), delay, delta=5)
+            # Not due yet
+            self.assertEqual(outbox.send_queued_emails(), (0, 0))
+            OutboundEmail.objects.update(next_attempt_date=timezone.now())
+
+        with self.assertLogs("core.mail", "ERROR"):
+            outbox.send_queued_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertEqual((email.body, email.alternatives), ("", []))
+        self.assertEqual(outbox.send_queued_emails(), (0, 0))
+
+    def test_loop_refreshes_database_connections(self):
+        """
+        Ensure each round of the loop closes the connections that broke or
+        aged meanwhile.
+        """
+        with mock.patch.multiple(
+            "core.management.commands.send_queued_email",
+            close_old_connections=mock.DEFAULT,
+            time=mock.DEFAULT,
+        ) as mocks:
+            mocks["time"].sleep.side_effect = [None, KeyboardInterrupt]
+            with self.assertRaises(KeyboardInterrupt):
+                send_queued_email(every=5)
+        self.assertEqual(mocks["close_old_connections"].call_count, 2)
+
+    def test_sent_and_failed_emails_are_pruned(self):
+        """
+        Ensure sent and failed emails are deleted after the retention period
+        only, and queued ones never.
+        """
+        self.queue(count=4)
+        send_queued_email()
+        week_ago = timezone.now() - timedelta(days=8)
+        OutboundEmail.objects.filter(subject="Subject 0").update(sent_date=week_ago)
+        OutboundEmail.objects.filter(subject="Subject 1").update(
+            status="failed", created_date=week_ago
+        )
+        OutboundEmail.objects.filter(subject="Subject 2").update(
+            status="queued",
+            created_date=week_ago,
+            next_attempt_date=timezone.now() + timedelta(hours=1),
+        )
+
+        output = send_queued_email(retention_days=7)
+        self.assertIn("Deleted 2 sent or failed emails", output)
+        self.assertEqual(
+            set(OutboundEmail.objects.values_list("subject", flat=True)),
+            {"Subject 2", "Subject 3"},
+        )
+
+
+@override_settings(
+    ALLOWED_EMAIL_DOMAINS=["icog.et"],
+    EMAIL_BACKEND="core.mail.OutboxEmailBackend",
+    EMAIL_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+class SignupEmailTestCase(APITestCase):
+    def test_activation_email_is_queued(self):
+        """
+        Ensure signing up queues the activation email instead of sending it.
+        """
+        Group.objects.create(name="Not-Assigned")
+        response = self.client.post(
+            reverse("user-signup", kwargs={"version": "v1"}),
+            {"email": "new.user@icog.et", "password": "newpassword123"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().to, ["new.user@icog.et"])
+
+        send_queued_email()
+        (message,) = mail.outbox
+        self.assertEqual(message.to, ["new.user@icog.et"])
+        self.assertIn("activate/", message.body)
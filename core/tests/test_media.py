@@ -0,0 +1,97 @@
+import time
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from minio import Minio
+from minio_storage.storage import MinioStorage
+
+from core import media
+from core.media import get_download_url, get_media_url, get_media_urls, local_urls
+
+
+class MediaURLTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_urls.clear()
+
+    def make_storage(self):
+        client = Minio(
+            "minio.example.com",
+            access_key="access",
+            secret_key="secret",  # noqa: S106
+            region="us-east-1",
+        )
+        return MinioStorage(
+            client, "media", presign_urls=True, assume_bucket_exists=True
+        )
+
+    def test_urls_are_generated_once(self):
+        """
+        Ensure URLs are generated for the names not cached only, and are
+        found in the shared cache by other processes.
+        """
+        with mock.patch.object(
+            media, "generate_url", wraps=media.generate_url
+        ) as generate_url:
+            urls = get_media_urls(["a.png", "b.png", ""])
+            self.assertEqual(urls, {"a.png": "/media/a.png", "b.png": "/media/b.png"})
+            self.assertEqual(generate_url.call_count, 2)
+
+            get_media_urls(["a.png", "b.png", "c.png"])
+            self.assertEqual(generate_url.call_count, 3)
+
+            local_urls.clear()
+            self.assertEqual(get_media_url("a.png"), "/media/a.png")
+            self.assertEqual(generate_url.call_count, 3)
+
+    def test_urls_depend_on_storage(self):
+        """
+        Ensure URLs cached for another media location are not used.
+        """
+        self.assertEqual(get_media_url("a.png"), "/media/a.png")
+        with override_settings(MEDIA_URL="/files/"):
+            self.assertEqual(get_media_url("a.png", default_storage), "/files/a.png")
+
+    @override_settings(MEDIA_URL_EXPIRY=600)
+    def test_presigned_urls_expire_before_their_signature(self):
+        """
+        Ensure presigned URLs are signed for the configured lifetime and
+        cached for half of it.
+        """
+        storage = self.make_storage()
+        with mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            url = get_media_url("profile-pictures/a.png", storage)
+        self.assertEqual(set_many.call_args.kwargs["timeout"], 300)
+
+        query = parse_qs(urlsplit(url).query)
+        self.assertEqual(query["X-Amz-Expires"], ["600"])
+        self.assertEqual(get_media_url("profile-pictures/a.png", storage), url)
+
+        (entry,) = local_urls._entries.values()
+        self.assertAlmostEqual(entry.expires_at, time.time() + 300, delta=5)
+
+    def test_download_urls_name_the_attachment(self):
+        """
+        Ensure presigned download URLs make the storage serve the object as
+        an attachment of the given name and type.
+        """
+        url = get_download_url(
+            "blobs/ab/abc.txt", "report.txt", "text/plain", self.make_storage()
+        )
+        parts = urlsplit(url)
+        self.assertEqual(parts.path, "/media/blobs/ab/abc.txt")
+        query = parse_qs(parts.query)
+        self.assertEqual(
+            query["response-content-disposition"], ['attachment; filename="report.txt"']
+        )
+        self.assertEqual(query["response-content-type"], ["text/plain"])
+
+        # Public URLs can't name the attachment
+        storage = self.make_storage()
+        storage.presign_urls = False
+        self.assertIsNone(
+            get_download_url("blobs/ab/abc.txt", "report.txt", "text/plain", storage)
+        )
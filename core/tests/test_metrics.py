@@ -0,0 +1,155 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from tasks.models import KSI
+from tasks.views import KSIViewSet
+from users.models import Role
+
+User = get_user_model()
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+
+        # Define URLs
+        self.metrics_url = reverse("metrics")
+        self.list_url = reverse("department-list", kwargs={"version": "v1"})
+
+    def scrape(self):
+        response = self.client.get(
+            self.metrics_url, HTTP_AUTHORIZATION="Bearer test-metrics-token"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content.decode()
+
+    @override_settings(METRICS_TOKEN="")
+    def test_hidden_without_token_configured(self):
+        """
+        Ensure the endpoint does not exist unless a token is configured.
+        """
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_token_required(self):
+        """
+        Ensure scrapes without the configured token are rejected.
+        """
+        response = self.client.get(self.metrics_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(
+            self.metrics_url, HTTP_AUTHORIZATION=f"Bearer {self.admin_token}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_requests_are_labelled_by_view_and_action(self):
+        """
+        Ensure requests are counted per viewset and action.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.credentials()
+        content = self.scrape()
+        self.assertIn(
+            'api_requests_total{action="list",method="GET",status="200",'
+            'view="DepartmentViewSet"}',
+            content,
+        )
+        self.assertIn(
+            'api_request_db_queries_count{action="list",view="DepartmentViewSet"}',
+            content,
+        )
+
+    def test_streamed_response_is_observed_once_exhausted(self):
+        """
+        Ensure a streamed response is counted with the queries of its content,
+        once the content is exhausted.
+        """
+        for number in range(2):
+            KSI.objects.create(
+                ksi_name=f"KSI {number}",
+                start_date="2024-01-01",
+                end_date="2024-12-31",
+                department=self.department,
+                created_by=self.admin_user,
+                updated_by=self.admin_user,
+            )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        labels = {"view": "KSIViewSet", "action": "structure"}
+
+        def get_sample(name, **extra_labels):
+            return REGISTRY.get_sample_value(name, {**labels, **extra_labels}) or 0
+
+        requests = get_sample("api_requests_total", method="GET", status="200")
+        queries = get_sample("api_request_db_queries_sum")
+
+        # The second KSI is only fetched while the content is streamed
+        with mock.patch.object(KSIViewSet, "structure_chunk_size", 1):
+            response = self.client.get(
+                reverse("ksi-structure", kwargs={"version": "v1"})
+            )
+        self.assertEqual(
+            get_sample("api_requests_total", method="GET", status="200"), requests
+        )
+        with CaptureQueriesContext(connection) as streamed_queries:
+            b"".join(response.streaming_content)
+
+        self.assertEqual(
+            get_sample("api_requests_total", method="GET", status="200"),
+            requests + 1,
+        )
+        self.assertGreaterEqual(
+            get_sample("api_request_db_queries_sum") - queries, len(streamed_queries)
+        )
+        self.assertGreater(len(streamed_queries), 0)
+
+    def test_cache_and_rollup_metrics_are_exported(self):
+        """
+        Ensure cache outcomes and completion rollup timings are exported.
+        """
+        ksi = KSI.objects.create(
+            ksi_name="Strategic Initiative 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=self.department,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        ksi.completion_percentage  # noqa: B018
+
+        content = self.scrape()
+        self.assertIn("api_cache_events_total{", content)
+        self.assertIn(
+            'api_completion_rollup_duration_seconds_count{model="ksi"}', content
+        )
@@ -0,0 +1,199 @@
+import io
+import json
+import threading
+import time
+import zipfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from core.profiling import SamplingProfiler
+from tasks.models import KSI
+from tasks.views import KSIViewSet
+from users.models import Role
+
+User = get_user_model()
+
+
+def busy_wait(seconds):
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        pass
+
+
+class SamplingProfilerTestCase(SimpleTestCase):
+    def test_stacks_are_collapsed(self):
+        """
+        Ensure the stacks of the profiled thread are sampled and counted.
+        """
+        profiler = SamplingProfiler(0.001, thread_ids={threading.get_ident()})
+        profiler.enable()
+        busy_wait(0.1)
+        profiler.disable()
+
+        lines = profiler.collapsed().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("MainThread;"))
+            self.assertGreater(int(count), 0)
+        self.assertTrue(any("busy_wait (test_profiler.py" in line for line in lines))
+
+
+@override_settings(REQUEST_PROFILER=True, REQUEST_PROFILER_INTERVAL=0.0001)
+class ProfilerTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        viewer_role = Role.objects.create(name="Viewer")
+        viewer_role.permissions.add(
+            *Permission.objects.filter(codename="view_department")
+        )
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.viewer_user = User.objects.create_user(
+            email="viewer@email.com",
+            password="1234abcd!A",
+            first_name="Viewer",
+            last_name="User",
+            is_staff=True,
+        )
+        self.viewer_user.groups.add(viewer_role)
+
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.viewer_token = str(RefreshToken.for_user(self.viewer_user).access_token)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.list_url = reverse("department-list", kwargs={"version": "v1"})
+
+    def get_archive(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(response["X-Profiled-Status"], "200")
+        return zipfile.ZipFile(io.BytesIO(response.content))
+
+    @override_settings(REQUEST_PROFILER=False)
+    def test_disabled_by_default(self):
+        """
+        Ensure the profiler is ignored unless REQUEST_PROFILER is set.
+        """
+        response = self.client.get(self.list_url, {"_profile": "cprofile"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_cprofile_call_tree(self):
+        """
+        Ensure superusers get a cProfile call tree and the SQL queries.
+        """
+        response = self.client.get(self.list_url, {"_profile": "cprofile"})
+        self.assertIn("profile-cprofile.zip", response["Content-Disposition"])
+
+        archive = self.get_archive(response)
+        self.assertEqual(
+            sorted(archive.namelist()),
+            ["call_tree.txt", "profile.pstats", "queries.json"],
+        )
+        self.assertIn("function calls", archive.read("call_tree.txt").decode())
+
+        summary = json.loads(archive.read("queries.json"))
+        self.assertEqual(summary["status"], 200)
+        self.assertGreater(summary["query_count"], 0)
+        self.assertEqual(len(summary["queries"]), summary["query_count"])
+        self.assertTrue(
+            any("basedata_department" in query["sql"] for query in summary["queries"])
+        )
+
+    def test_flamegraph_from_header(self):
+        """
+        Ensure the profiler can be requested by header for sampled stacks.
+        """
+        response = self.client.get(self.list_url, HTTP_X_PROFILER="flamegraph")
+
+        archive = self.get_archive(response)
+        self.assertEqual(
+            sorted(archive.namelist()), ["flamegraph.folded", "queries.json"]
+        )
+
+    async def test_flamegraph_on_async_view(self):
+        """
+        Ensure requests served asynchronously can be profiled.
+        """
+        response = await self.async_client.get(
+            self.list_url,
+            headers={
+                "Authorization": f"Bearer {self.admin_token}",
+                "X-Profiler": "flamegraph",
+            },
+        )
+        archive = self.get_archive(response)
+        self.assertIn("flamegraph.folded", archive.namelist())
+
+    def test_streamed_response_is_profiled_to_the_end(self):
+        """
+        Ensure the queries a streamed response runs while its content is
+        produced are profiled.
+        """
+        for number in range(5):
+            KSI.objects.create(
+                ksi_name=f"KSI {number}",
+                start_date="2024-01-01",
+                end_date="2024-12-31",
+                department=self.department,
+                created_by=self.admin_user,
+                updated_by=self.admin_user,
+            )
+        url = reverse("ksi-structure", kwargs={"version": "v1"})
+
+        with mock.patch.object(KSIViewSet, "structure_chunk_size", 2):
+            response = self.client.get(url, {"_profile": "cprofile"})
+
+        summary = json.loads(self.get_archive(response).read("queries.json"))
+        # The milestones of each chunk of 2 KSIs are prefetched apart
+        milestone_queries = [
+            query for query in summary["queries"] if "tasks_milestone" in query["sql"]
+        ]
+        self.assertEqual(len(milestone_queries), 3)
+
+    def test_unknown_profiler(self):
+        """
+        Ensure unknown profilers are rejected.
+        """
+        response = self.client.get(self.list_url, {"_profile": "perf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_not_available_to_other_users(self):
+        """
+        Ensure users other than superusers get their normal response.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.viewer_token}")
+        response = self.client.get(self.list_url, {"_profile": "cprofile"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertNotIn("X-Profiled-Status", response)
+
+        self.client.credentials()
+        response = self.client.get(self.list_url, {"_profile": "cprofile"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
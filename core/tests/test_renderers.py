@@ -0,0 +1,83 @@
+import json
+import warnings
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from core.renderers import StreamingJSONResponse
+
+
+class StreamingJSONResponseTestCase(SimpleTestCase):
+    def test_items_are_wrapped_in_envelope(self):
+        """
+        Ensure the streamed items form the response envelope.
+        """
+        response = StreamingJSONResponse({"id": index} for index in range(3))
+        self.assertEqual(
+            json.loads(b"".join(response)),
+            {
+                "message": "",
+                "data": [{"id": 0}, {"id": 1}, {"id": 2}],
+                "status_code": 200,
+            },
+        )
+
+    def test_first_item_fails_before_headers(self):
+        """
+        Ensure an error computing the first item is raised before the
+        response exists, so it gets an error response.
+        """
+
+        def items():
+            raise ValueError("query failed")
+            yield
+
+        with self.assertRaises(ValueError):
+            StreamingJSONResponse(items())
+
+    def test_later_item_aborts_response(self):
+        """
+        Ensure an error computing a later item aborts the response, leaving
+        a body that is not valid JSON rather than a complete one.
+        """
+
+        def items():
+            yield {"id": 0}
+            raise ValueError("serializer failed")
+
+        response = StreamingJSONResponse(items())
+        chunks = []
+        with self.assertRaises(ValueError):
+            for chunk in response:
+                chunks.append(chunk)
+        with self.assertRaises(json.JSONDecodeError):
+            json.loads(b"".join(chunks))
+
+    def test_async_iteration_is_incremental(self):
+        """
+        Ensure ASGI servers get the items as they are computed, rather than
+        once all of them are.
+        """
+        computed = []
+
+        def items():
+            for index in range(100):
+                computed.append(index)
+                yield {"id": index}
+
+        response = StreamingJSONResponse(items())
+
+        async def read_start():
+            chunks = []
+            async for chunk in response:
+                chunks.append(chunk)
+                if len(chunks) == 4:
+                    break
+            return chunks
+
+        with warnings.catch_warnings():
+            # Django warns when it consumes a sync iterator whole
+            warnings.simplefilter("error")
+            chunks = async_to_sync(read_start)()
+        self.assertEqual(chunks[0], b'{"message":"","data":[')
+        self.assertLess(len(computed), 5)
@@ -0,0 +1,77 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import schema
+from core.cache import local_cache
+
+
+class SchemaViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+
+        self.schema_url = reverse("schema", kwargs={"version": "v1"})
+
+    def test_schema_is_generated_once(self):
+        """
+        Ensure the schema is generated on the first request and then served
+        from the cache.
+        """
+        with mock.patch.object(
+            schema, "build_schema_artifact", wraps=schema.build_schema_artifact
+        ) as build_schema_artifact:
+            first_response = self.client.get(self.schema_url)
+            second_response = self.client.get(self.schema_url)
+
+        self.assertEqual(first_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(first_response.content, second_response.content)
+        self.assertIn(b"openapi", first_response.content)
+        build_schema_artifact.assert_called_once()
+
+    def test_unchanged_schema_is_not_modified(self):
+        """
+        Ensure a client holding the current schema receives 304.
+        """
+        etag = self.client.get(self.schema_url)["ETag"]
+
+        response = self.client.get(self.schema_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_schema_is_compressed_when_accepted(self):
+        """
+        Ensure gzip is served with its own ETag when the client accepts it.
+        """
+        response = self.client.get(self.schema_url)
+        compressed_response = self.client.get(
+            self.schema_url, HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+        self.assertEqual(compressed_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(compressed_response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed_response.content), response.content)
+        self.assertNotEqual(compressed_response["ETag"], response["ETag"])
+        self.assertIn("Accept-Encoding", compressed_response["Vary"])
+
+    def test_schema_is_regenerated_for_new_code_version(self):
+        """
+        Ensure a new code version does not serve the previous schema.
+        """
+        self.client.get(self.schema_url)
+
+        build_schema_artifact = mock.Mock(wraps=schema.build_schema_artifact)
+        patch_code_version = mock.patch.object(
+            schema, "get_code_version", return_value="next"
+        )
+        patch_build = mock.patch.object(
+            schema, "build_schema_artifact", build_schema_artifact
+        )
+        with patch_code_version, patch_build:
+            self.client.get(self.schema_url)
+
+        build_schema_artifact.assert_called_once()
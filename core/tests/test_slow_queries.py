@@ -0,0 +1,135 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from core.models import SlowQuery
+from users.models import Role
+
+User = get_user_model()
+
+
+class SlowQueryCaptureTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.list_url = reverse("department-list", kwargs={"version": "v1"})
+
+    def test_disabled_without_threshold(self):
+        """
+        Ensure nothing is captured when the threshold is 0.
+        """
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_slow_queries_are_captured_with_plan(self):
+        """
+        Ensure slow queries are logged with their plan and originating view.
+        """
+        capture = override_settings(SLOW_QUERY_THRESHOLD=1e-9)
+        logs = self.assertLogs("core.slow_queries", level="WARNING")
+        with capture, logs, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self.list_url)
+            # Saved once committed, outside the request's transaction
+            self.assertFalse(SlowQuery.objects.exists())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        slow_queries = SlowQuery.objects.filter(
+            view="DepartmentViewSet.list",
+            fingerprint__startswith='SELECT "basedata_department"',
+        )
+        self.assertEqual(len(slow_queries), 1)
+        self.assertEqual(slow_queries[0].count, 1)
+        self.assertNotEqual(slow_queries[0].plan, "")
+        self.assertNotIn("EXPLAIN failed", slow_queries[0].plan)
+        self.assertGreater(slow_queries[0].max_time, 0)
+
+    def test_repeated_queries_are_aggregated(self):
+        """
+        Ensure the same query from the same view is counted on one record.
+        """
+        capture = override_settings(SLOW_QUERY_THRESHOLD=1e-9)
+        logs = self.assertLogs("core.slow_queries", level="WARNING")
+        with capture, logs, self.captureOnCommitCallbacks(execute=True):
+            self.client.get(self.list_url)
+            # Bypasses the cached response of the first request
+            self.client.get(self.list_url, {"page": 1})
+
+        slow_query = SlowQuery.objects.get(
+            view="DepartmentViewSet.list",
+            fingerprint__startswith='SELECT "basedata_department"',
+        )
+        self.assertEqual(slow_query.count, 2)
+
+
+class SlowQueriesCommandTestCase(TestCase):
+    def setUp(self):
+        SlowQuery.objects.create(
+            digest="a" * 40,
+            view="TaskViewSet.list",
+            fingerprint="SELECT * FROM tasks_task WHERE weight > ?",
+            sql="SELECT * FROM tasks_task WHERE weight > 10",
+            plan="Seq Scan on tasks_task",
+            count=10,
+            total_time=5.0,
+            max_time=0.9,
+        )
+        SlowQuery.objects.create(
+            digest="b" * 40,
+            view="KPIViewSet.list",
+            fingerprint="SELECT * FROM tasks_kpi",
+            sql="SELECT * FROM tasks_kpi",
+            count=1,
+            total_time=2.0,
+            max_time=2.0,
+        )
+
+    def test_top_offenders_are_reported(self):
+        """
+        Ensure the report ranks queries by the requested ordering.
+        """
+        output = StringIO()
+        call_command("slow_queries", "--plans", stdout=output)
+        report = output.getvalue()
+        self.assertLess(report.index("TaskViewSet.list"), report.index("KPIViewSet"))
+        self.assertIn("count=10 mean=500.0ms max=900.0ms", report)
+        self.assertIn("    Seq Scan on tasks_task", report)
+
+        output = StringIO()
+        call_command("slow_queries", "--order-by", "max", "--limit", "1", stdout=output)
+        self.assertIn("KPIViewSet.list", output.getvalue())
+        self.assertNotIn("TaskViewSet.list", output.getvalue())
+
+    def test_clear(self):
+        """
+        Ensure --clear deletes the captured queries.
+        """
+        call_command("slow_queries", "--clear", stdout=StringIO())
+        self.assertFalse(SlowQuery.objects.exists())
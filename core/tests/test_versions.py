@@ -0,0 +1,32 @@
+from django.contrib.auth.models import update_last_login
+from django.test import TestCase
+
+from core.models import ModelVersion
+from users.models import Role, User
+
+
+class ModelVersionTestCase(TestCase):
+    def get_version(self):
+        version = ModelVersion.objects.filter(model_label="users.user").first()
+        return version.version if version else 0
+
+    def test_ignored_fields_leave_version(self):
+        """
+        Ensure logins, which only update ignored fields, leave the version
+        of users unchanged while other changes bump it.
+        """
+        Role.objects.create(name="Not-Assigned")
+        user = User.objects.create_user(
+            email="user@email.com",
+            password="1234abcd!A",
+            first_name="Test",
+            last_name="User",
+        )
+        version = self.get_version()
+
+        update_last_login(None, user)
+        self.assertEqual(self.get_version(), version)
+
+        user.bio = "Changed"
+        user.save(update_fields=["bio", "last_login"])
+        self.assertEqual(self.get_version(), version + 1)
@@ -0,0 +1,161 @@
+"""Uploads sent by clients straight to the media storage.
+
+Rather than streaming files through a worker, the API hands out a URL and
+form fields to POST one object to, then the client confirms the upload and
+the API checks the stored object before copying it to a model's storage.
+On MinIO the form is a presigned POST policy of the bucket, which refuses
+other content types and bodies over the size limit; other storages, as in
+tests and local development, receive the form through `upload_view`.
+
+Uploaded objects are kept under `UPLOAD_PREFIX` until `prune_uploads`
+deletes them, once they can no longer be confirmed.
+"""
+
+import posixpath
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+from minio.datatypes import PostPolicy
+from minio_storage.storage import MinioStorage
+from rest_framework.exceptions import ValidationError
+
+UPLOAD_SALT = "core.uploads"
+# Uploaded objects are stored under this prefix until pruned
+UPLOAD_PREFIX = "uploads/"
+
+# `upload_id` identifies the upload when it is confirmed, `fields` are sent
+# along with the file, last, in a multipart form
+UploadTicket = namedtuple(
+    "UploadTicket", ["upload_id", "name", "url", "method", "fields", "expires_at"]
+)
+
+
+def create_upload(request, name, content_type, max_size, **data):
+    """
+    Returns an `UploadTicket` to POST an object of `content_type`, up to
+    `max_size` bytes, as `name` under `UPLOAD_PREFIX` in the default
+    storage.
+
+    `data` is signed into the upload id, e.g. to bind it to a user.
+    """
+    name = f"{UPLOAD_PREFIX}{name}"
+    expires_at = timezone.now() + timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRY)
+    upload_id = signing.dumps(
+        {"name": name, "content_type": content_type, "max_size": max_size, **data},
+        salt=UPLOAD_SALT,
+    )
+    fields = {"key": name, "Content-Type": content_type}
+
+    if isinstance(default_storage, MinioStorage):
+        storage = default_storage
+        # Signed for the public host when it differs from the API's endpoint
+        if storage.presign_urls and storage.base_url:
+            client = storage.base_url_client
+            url = storage.base_url
+        else:
+            client = storage.client
+            url = f"{storage.endpoint_url.rstrip('/')}/{storage.bucket_name}/"
+        policy = PostPolicy(storage.bucket_name, expires_at)
+        policy.add_equals_condition("key", name)
+        policy.add_equals_condition("Content-Type", content_type)
+        policy.add_content_length_range_condition(1, max_size)
+        fields.update(client.presigned_post_policy(policy))
+    else:
+        url = request.build_absolute_uri(
+            reverse("direct-upload", kwargs={"upload_id": upload_id})
+        )
+
+    return UploadTicket(
+        upload_id=upload_id,
+        name=name,
+        url=url,
+        method="POST",
+        fields=fields,
+        expires_at=expires_at,
+    )
+
+
+def load_upload(upload_id, max_age=None):
+    """
+    Returns the data signed into `upload_id`.
+
+    By default an upload may be confirmed until twice the URL's expiry, so
+    clients finishing an upload at the last moment still get to confirm it.
+    """
+    if max_age is None:
+        max_age = settings.DIRECT_UPLOAD_EXPIRY * 2
+    try:
+        return signing.loads(upload_id, salt=UPLOAD_SALT, max_age=max_age)
+    except signing.SignatureExpired as error:
+        raise ValidationError("The upload has expired.") from error
+    except signing.BadSignature as error:
+        raise ValidationError("Invalid upload.") from error
+
+
+def check_upload(upload):
+    """
+    Ensures the object of `upload` was stored within its size limit, which
+    the upload form enforces already.
+
+    Deletes objects over the limit, so they can be uploaded again.
+    """
+    name = upload["name"]
+    if not default_storage.exists(name):
+        raise ValidationError("The file has not been uploaded.")
+
+    if default_storage.size(name) > upload["max_size"]:
+        default_storage.delete(name)
+        raise ValidationError(
+            f"The file must not be larger than {upload['max_size']} bytes."
+        )
+
+
+def list_uploads(storage):
+    """
+    Yields the name and modification time of each object under
+    `UPLOAD_PREFIX`.
+    """
+    if isinstance(storage, MinioStorage):
+        # Listed along with their time, rather than with a request each
+        objects = storage.client.list_objects(
+            storage.bucket_name, prefix=UPLOAD_PREFIX, recursive=True
+        )
+        for obj in objects:
+            yield obj.object_name, obj.last_modified
+        return
+
+    directories = [UPLOAD_PREFIX.rstrip("/")]
+    while directories:
+        directory = directories.pop()
+        try:
+            subdirectories, files = storage.listdir(directory)
+        except FileNotFoundError:
+            continue
+        directories.extend(posixpath.join(directory, name) for name in subdirectories)
+        for name in files:
+            name = posixpath.join(directory, name)
+            yield name, storage.get_modified_time(name)
+
+
+def prune_uploads(max_age=None):
+    """
+    Deletes the uploaded objects older than `max_age`, by default as long as
+    uploads can be confirmed, and returns how many.
+
+    Confirmed uploads were copied to their model's storage, the others are
+    abandoned.
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRY * 2)
+    expired_before = timezone.now() - max_age
+    deleted = 0
+    for name, modified_time in list(list_uploads(default_storage)):
+        if modified_time < expired_before:
+            default_storage.delete(name)
+            deleted += 1
+    return deleted
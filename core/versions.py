@@ -0,0 +1,58 @@
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import ModelVersion
+from core.signals import connect_model_changes
+
+
+def bump_model_version(model):
+    """
+    Increment the change counter of `model`, creating it on first change.
+    """
+    model_label = model._meta.label_lower
+    updated = ModelVersion.objects.filter(model_label=model_label).update(
+        version=F("version") + 1, updated_date=timezone.now()
+    )
+    if not updated:
+        ModelVersion.objects.get_or_create(
+            model_label=model_label, defaults={"version": 1}
+        )
+
+
+def _get_model_versions_queryset(models):
+    return (
+        ModelVersion.objects.filter(
+            model_label__in=[model._meta.label_lower for model in models]
+        )
+        .order_by("model_label")
+        .values_list("model_label", "version", "updated_date")
+    )
+
+
+def get_model_versions(models):
+    """
+    Returns `(model_label, version, updated_date)` rows for the given models,
+    ordered by label, in a single query.
+    """
+    return list(_get_model_versions_queryset(models))
+
+
+async def aget_model_versions(models):
+    """
+    Async variant of `get_model_versions`.
+    """
+    return [row async for row in _get_model_versions_queryset(models)]
+
+
+def track_model_versions(*models, ignore_fields=()):
+    """
+    Keep a change counter for each model, bumped on save, delete and
+    many-to-many changes. Saves of `ignore_fields` only, e.g. the
+    `last_login` of users, leave it unchanged. Call from `AppConfig.ready()`.
+    """
+    connect_model_changes(
+        bump_model_version,
+        models,
+        dispatch_uid="track_model_versions",
+        ignore_fields=ignore_fields,
+    )
@@ -0,0 +1,119 @@
+import hmac
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView
+
+from core.metrics import render_metrics
+from core.schema import get_schema_artifact
+from core.uploads import UPLOAD_SALT
+
+ACCEPTS_GZIP_RE = re.compile(r"\bgzip\b")
+# Bytes of an upload form besides its file, i.e. its fields and boundaries
+UPLOAD_FORM_OVERHEAD = 16 * 1024
+
+
+class SchemaView(SpectacularAPIView):
+    """
+    Serves the OpenAPI schema from the precomputed artifact of the requested
+    API version, with an ETag and gzip compression.
+    """
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        # Translated schemas are rare, generate them on demand
+        if settings.USE_I18N and request.GET.get("lang"):
+            return super().get(request, *args, **kwargs)
+
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+        artifact = get_schema_artifact(version, type(request.accepted_renderer))
+
+        accepts_gzip = ACCEPTS_GZIP_RE.search(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        # Each encoding is a distinct representation with its own ETag
+        etag = f'{artifact.etag[:-1]}-gzip"' if accepts_gzip else artifact.etag
+
+        content_type = request.accepted_media_type
+        if request.accepted_renderer.charset:
+            content_type += f"; charset={request.accepted_renderer.charset}"
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                artifact.compressed_content if accepts_gzip else artifact.content,
+                content_type=content_type,
+                headers={
+                    "Content-Disposition": (
+                        f'inline; filename="{self._get_filename(request, version)}"'
+                    )
+                },
+            )
+            if accepts_gzip:
+                response.headers["Content-Encoding"] = "gzip"
+
+        response.headers["ETag"] = etag
+        patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+        return response
+
+
+def metrics_view(request):
+    """
+    Serves Prometheus metrics to scrapers presenting `METRICS_TOKEN`, and is
+    hidden when no token is configured.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+        return HttpResponse(status=401)
+
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def upload_view(request, upload_id):
+    """
+    Stores the file of a direct upload form in storages that cannot presign
+    POST policies, with the conditions such a policy would have.
+    """
+    try:
+        upload = signing.loads(
+            upload_id, salt=UPLOAD_SALT, max_age=settings.DIRECT_UPLOAD_EXPIRY
+        )
+    except signing.BadSignature:
+        return HttpResponse(status=403)
+
+    # Refused before the form is parsed, leaving room for the other fields
+    try:
+        size = int(request.META.get("CONTENT_LENGTH") or "")
+    except ValueError:
+        return HttpResponse(status=411)
+    if size > upload["max_size"] + UPLOAD_FORM_OVERHEAD:
+        return HttpResponse(status=413)
+
+    file = request.FILES.get("file")
+    if file is None:
+        return HttpResponse(status=400)
+    if request.POST.get("Content-Type") != upload["content_type"]:
+        return HttpResponse(status=415)
+    if not 0 < file.size <= upload["max_size"]:
+        return HttpResponse(status=413)
+
+    # Uploading again replaces the object, as a POST to a bucket does
+    name = upload["name"]
+    default_storage.delete(name)
+    if default_storage.save(name, file) != name:
+        return HttpResponse(status=409)
+    return HttpResponse(status=204)
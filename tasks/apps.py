@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tasks"
+
+    def ready(self):
+        from core.storage import track_blob_references
+        from core.versions import track_model_versions
+        from tasks.models import KPI, KSI, MajorActivity, Milestone, Task, TaskFile
+
+        track_model_versions(KSI, Milestone, KPI, MajorActivity, Task)
+        track_blob_references(TaskFile)
@@ -0,0 +1,190 @@
+"""Chunked, resumable uploads of task files.
+
+A client declares the file, PUTs its chunks of `TaskFile.chunk_size` bytes
+in any order, retrying any that failed, then completes the upload. The
+chunks are then streamed into the final object while hashing it, so no
+worker holds a whole file, and deleted.
+
+Assembling a large file outlasts a request, so completing an upload only
+marks it `assembling`, and each process assembles files on
+`TASK_FILE_ASSEMBLY_WORKERS` threads once committed, or in the request
+with 0 workers. Rows are locked only to change their status.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.executors import ProcessExecutor
+from core.files import ConcatenatedFile
+from tasks.models import TaskFile, TaskFileChunk
+
+logger = logging.getLogger(__name__)
+
+
+def save_chunk(task_file, index, content, size):
+    """
+    Stores chunk `index` of `task_file` from the file-like `content` of
+    `size` bytes, replacing any previous upload of it.
+    """
+    if index >= task_file.chunk_count:
+        raise ValidationError(
+            {"index": f"The file has {task_file.chunk_count} chunks."}
+        )
+    expected_size = task_file.get_chunk_size(index)
+    if size != expected_size:
+        raise ValidationError({"size": f"Chunk {index} must be {expected_size} bytes."})
+
+    chunk = TaskFileChunk(task_file=task_file, index=index)
+    name = chunk.file.field.generate_filename(chunk, str(index))
+    default_storage.delete(name)
+    name = default_storage.save(name, File(content))
+    # The client may have disconnected midway
+    if default_storage.size(name) != expected_size:
+        default_storage.delete(name)
+        raise ValidationError({"size": f"Chunk {index} is incomplete."})
+
+    TaskFileChunk.objects.update_or_create(
+        task_file=task_file, index=index, defaults={"file": name}
+    )
+
+
+def delete_files(names):
+    """
+    Deletes the stored objects `names` once the transaction commits.
+    """
+    names = [name for name in names if name]
+    transaction.on_commit(lambda: [default_storage.delete(name) for name in names])
+
+
+def complete_upload(task_file, sha256=None):
+    """
+    Marks `task_file` for assembly once all its chunks are uploaded, with
+    the digest `sha256` to check when given, and returns it.
+
+    Files already assembling are left to it, unless it was lost.
+    """
+    with transaction.atomic():
+        # Completing twice at once would assemble the file twice
+        task_file = TaskFile.objects.select_for_update().get(pk=task_file.pk)
+        if task_file.status == "completed":
+            return task_file
+        lost_before = timezone.now() - timedelta(
+            seconds=settings.TASK_FILE_ASSEMBLY_TIMEOUT
+        )
+        if task_file.status == "assembling" and task_file.updated_date > lost_before:
+            return task_file
+
+        received = set(task_file.chunks.values_list("index", flat=True))
+        missing = [
+            index for index in range(task_file.chunk_count) if index not in received
+        ]
+        if missing:
+            raise ValidationError({"chunks": f"Missing chunks {missing}."})
+
+        # The expected digest until assembled
+        task_file.sha256 = (sha256 or "").lower()
+        task_file.status = "assembling"
+        task_file.assembly_error = ""
+        task_file.save(
+            update_fields=["sha256", "status", "assembly_error", "updated_date"]
+        )
+        pk = task_file.pk
+        transaction.on_commit(lambda: executor.submit(pk))
+    return task_file
+
+
+def assemble(pk):
+    """
+    Streams the chunks of the task file `pk` marked for assembly into its
+    file, then completes it, or reopens it for upload when the digest
+    differs.
+    """
+    task_file = TaskFile.objects.filter(pk=pk, status="assembling").first()
+    if task_file is None:
+        return
+    chunks = dict(task_file.chunks.values_list("index", "file"))
+
+    hasher = hashlib.sha256()
+    content = ConcatenatedFile(
+        default_storage,
+        [chunks[index] for index in range(task_file.chunk_count)],
+        task_file.size,
+        name=task_file.file_name,
+        hasher=hasher,
+    )
+    name = task_file.file.field.generate_filename(task_file, task_file.file_name)
+    try:
+        name = default_storage.save(name, content)
+    finally:
+        content.close()
+    digest = hasher.hexdigest()
+
+    with transaction.atomic():
+        task_file = (
+            TaskFile.objects.select_for_update()
+            .filter(pk=pk, status="assembling")
+            .first()
+        )
+        # Deleted meanwhile
+        if task_file is None:
+            default_storage.delete(name)
+            return
+        if task_file.sha256 and digest != task_file.sha256:
+            default_storage.delete(name)
+            reopen(task_file, "The file does not match the digest.")
+            return
+
+        # The content may already be stored for another file
+        task_file.file.name = task_file.file.storage.adopt(name, digest)
+        task_file.sha256 = digest
+        task_file.status = "completed"
+        task_file.save(update_fields=["file", "sha256", "status", "updated_date"])
+
+        delete_files(chunks.values())
+        task_file.chunks.all().delete()
+
+
+def reopen(task_file, error):
+    task_file.status = "uploading"
+    task_file.sha256 = ""
+    task_file.assembly_error = error
+    task_file.save(update_fields=["status", "sha256", "assembly_error", "updated_date"])
+
+
+class AssemblyExecutor(ProcessExecutor):
+    def __init__(self):
+        super().__init__("TASK_FILE_ASSEMBLY_WORKERS", "task-file-assembly")
+
+    def submit(self, pk):
+        if not settings.TASK_FILE_ASSEMBLY_WORKERS:
+            self.run(pk)
+            return
+        self.get_executor().submit(self.run, pk, close_connection=True)
+
+    def run(self, pk, close_connection=False):
+        try:
+            assemble(pk)
+        except Exception:
+            logger.exception("Could not assemble task file %s", pk)
+            with transaction.atomic():
+                task_file = (
+                    TaskFile.objects.select_for_update()
+                    .filter(pk=pk, status="assembling")
+                    .first()
+                )
+                if task_file is not None:
+                    reopen(task_file, "The file could not be assembled.")
+        finally:
+            if close_connection:
+                connection.close()
+
+
+executor = AssemblyExecutor()
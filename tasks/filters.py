@@ -9,6 +9,7 @@ from tasks.models import (
     MajorActivity,
     Milestone,
     Task,
+    TaskFile,
 )
 
 User = get_user_model()
@@ -185,3 +186,22 @@ class TaskFilter(filters.FilterSet):
     class Meta:
         model = Task
         fields = []
+
+
+class TaskFileFilter(filters.FilterSet):
+    task = filters.ModelMultipleChoiceFilter(
+        field_name="task__id",
+        help_text="Filter by the ID of tasks.",
+        to_field_name="id",
+        queryset=Task.objects.all(),
+    )
+    status = filters.MultipleChoiceFilter(
+        field_name="status",
+        help_text="Filter by upload status",
+        choices=TaskFile.STATUS_CHOICES,
+        lookup_expr="in",
+    )
+
+    class Meta:
+        model = TaskFile
+        fields = []
@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from tasks.files import delete_files
+from tasks.models import TaskFile, TaskFileChunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the task file uploads left unfinished for more than"
+        " TASK_FILE_UPLOAD_EXPIRY hours, and their chunks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep pruning every this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            deleted = self.prune()
+            self.stdout.write(
+                self.style.SUCCESS(f"Deleted {deleted} unfinished uploads")
+            )
+
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
+
+    def prune(self):
+        expired_before = timezone.now() - timedelta(
+            hours=settings.TASK_FILE_UPLOAD_EXPIRY
+        )
+        expired = TaskFile.objects.filter(
+            status__in=["uploading", "assembling"], created_date__lt=expired_before
+        )
+        deleted = 0
+        for pk in list(expired.values_list("pk", flat=True)):
+            with transaction.atomic():
+                chunks = TaskFileChunk.objects.filter(task_file=pk)
+                delete_files(chunks.values_list("file", flat=True))
+                _, counts = (
+                    TaskFile.objects.filter(pk=pk).exclude(status="completed").delete()
+                )
+            deleted += counts.get("tasks.TaskFile", 0)
+        return deleted
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:13
+
+import django.db.models.deletion
+import tasks.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskFile",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        max_length=255,
+                        upload_to=tasks.models.upload_file_to,
+                    ),
+                ),
+                ("file_name", models.CharField(max_length=255)),
+                ("content_type", models.CharField(max_length=255)),
+                ("size", models.PositiveBigIntegerField()),
+                ("chunk_size", models.PositiveIntegerField()),
+                ("sha256", models.CharField(blank=True, max_length=64)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("uploading", "Uploading"),
+                            ("completed", "Completed"),
+                        ],
+                        default="uploading",
+                        max_length=20,
+                    ),
+                ),
+                ("created_date", models.DateTimeField(auto_now_add=True)),
+                ("updated_date", models.DateTimeField(auto_now=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="task_files_created_by",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="files",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task File",
+                "verbose_name_plural": "Task Files",
+                "db_table": "tasks_task_file",
+            },
+        ),
+        migrations.CreateModel(
+            name="TaskFileChunk",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("index", models.PositiveIntegerField()),
+                (
+                    "file",
+                    models.FileField(
+                        max_length=255, upload_to=tasks.models.upload_chunk_to
+                    ),
+                ),
+                ("created_date", models.DateTimeField(auto_now_add=True)),
+                (
+                    "task_file",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunks",
+                        to="tasks.taskfile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Task File Chunk",
+                "verbose_name_plural": "Task File Chunks",
+                "db_table": "tasks_task_file_chunk",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("task_file", "index"), name="unique_task_file_chunk"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:23
+
+import core.storage
+import tasks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0003_task_file"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="taskfile",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                storage=core.storage.get_blob_storage,
+                upload_to=tasks.models.upload_file_to,
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0004_task_file_blob_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskfile",
+            name="assembly_error",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="taskfile",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("uploading", "Uploading"),
+                    ("assembling", "Assembling"),
+                    ("completed", "Completed"),
+                ],
+                default="uploading",
+                max_length=20,
+            ),
+        ),
+    ]
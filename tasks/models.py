@@ -4,7 +4,9 @@ from decimal import ROUND_HALF_UP, Decimal
 
 from django.db import models
 
+from core.metrics import timed_rollup
 from core.models import BaseModel
+from core.storage import get_blob_storage
 
 STATUS_CHOICES = (
     ("not_started", "Not Started"),
@@ -51,6 +53,7 @@ class KSI(BaseModel):
         return self.ksi_name
 
     @property
+    @timed_rollup
     def completion_percentage(self) -> Decimal:
         milestones = self.milestones.all()
         if not milestones:
@@ -69,7 +72,9 @@ class KSI(BaseModel):
             self.status = "completed"
             self.save(update_fields=["status"])
 
-        if self.end_date > datetime.now().date() and self.status != "completed":
+        # Skip the write when the status is already settled
+        is_settled = self.status in ("completed", "overdue")
+        if self.end_date > datetime.now().date() and not is_settled:
             self.status = "overdue"
             self.save(update_fields=["status"])
 
@@ -104,6 +109,7 @@ class Milestone(BaseModel):
         return self.milestone_name
 
     @property
+    @timed_rollup
     def completion_percentage(self) -> Decimal:
         kpis = self.kpis.all()
         if not kpis:
@@ -126,7 +132,9 @@ class Milestone(BaseModel):
             self.status = "completed"
             self.save(update_fields=["status"])
 
-        if self.end_date > datetime.now().date() and self.status != "completed":
+        # Skip the write when the status is already settled
+        is_settled = self.status in ("completed", "overdue")
+        if self.end_date > datetime.now().date() and not is_settled:
             self.status = "overdue"
             self.save(update_fields=["status"])
 
@@ -149,7 +157,7 @@ class KPI(BaseModel):
     start_date = models.DateField(null=True, blank=True)
     end_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
-    planed_kpi= models.IntegerField(default=1)
+    planed_kpi = models.IntegerField(default=1)
 
     created_by = models.ForeignKey(
         "users.User", on_delete=models.PROTECT, related_name="kpis_created_by"
@@ -212,6 +220,7 @@ class MajorActivity(BaseModel):
         return self.major_activity_name
 
     @property
+    @timed_rollup
     def completion_percentage(self) -> Decimal:
         tasks = self.tasks.filter(parent_task=None)
         if not tasks:
@@ -229,7 +238,9 @@ class MajorActivity(BaseModel):
             self.status = "completed"
             self.save(update_fields=["status"])
 
-        if self.end_date > datetime.now().date() and self.status != "completed":
+        # Skip the write when the status is already settled
+        is_settled = self.status in ("completed", "overdue")
+        if self.end_date > datetime.now().date() and not is_settled:
             self.status = "overdue"
             self.save(update_fields=["status"])
 
@@ -296,6 +307,7 @@ class Task(BaseModel):
         return self.task_name
 
     @property
+    @timed_rollup
     def completion_percentage(self) -> Decimal:
         sub_tasks = self.sub_tasks.all()
         if not sub_tasks:
@@ -314,10 +326,98 @@ class Task(BaseModel):
             self.status = "completed"
             self.save(update_fields=["status"])
 
-        if self.end_date > datetime.now().date() and self.status != "completed":
+        # Skip the write when the status is already settled
+        is_settled = self.status in ("completed", "overdue")
+        if self.end_date > datetime.now().date() and not is_settled:
             self.status = "overdue"
             self.save(update_fields=["status"])
 
         return Decimal(weighted_completion_percentage).quantize(
             Decimal("0.00"), rounding=ROUND_HALF_UP
         )
+
+
+def upload_chunk_to(instance, filename):
+    return f"task-files/chunks/{instance.task_file_id}/{instance.index}"
+
+
+class TaskFile(BaseModel):
+    """
+    A file attached to a task, uploaded in chunks of `chunk_size` bytes.
+    """
+
+    STATUS_CHOICES = (
+        ("uploading", "Uploading"),
+        ("assembling", "Assembling"),
+        ("completed", "Completed"),
+    )
+
+    task = models.ForeignKey(
+        "tasks.Task", on_delete=models.CASCADE, related_name="files"
+    )
+    file = models.FileField(
+        upload_to=upload_file_to,
+        storage=get_blob_storage,
+        max_length=255,
+        blank=True,
+    )
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="uploading"
+    )
+    # Why the last assembly failed, the chunks can then be uploaded again
+    assembly_error = models.CharField(max_length=255, blank=True)
+
+    created_by = models.ForeignKey(
+        "users.User",
+        on_delete=models.PROTECT,
+        related_name="task_files_created_by",
+    )
+    created_date = models.DateTimeField(auto_now_add=True)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Task File"
+        verbose_name_plural = "Task Files"
+        db_table = "tasks_task_file"
+
+    def __str__(self):
+        return self.file_name
+
+    @property
+    def chunk_count(self):
+        return max(1, -(-self.size // self.chunk_size))
+
+    def get_chunk_size(self, index):
+        """
+        Returns the size chunk `index` must have, the last being shorter.
+        """
+        if index < self.chunk_count - 1:
+            return self.chunk_size
+        return self.size - self.chunk_size * (self.chunk_count - 1)
+
+
+class TaskFileChunk(BaseModel):
+    task_file = models.ForeignKey(
+        "tasks.TaskFile", on_delete=models.CASCADE, related_name="chunks"
+    )
+    index = models.PositiveIntegerField()
+    file = models.FileField(upload_to=upload_chunk_to, max_length=255)
+    created_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Task File Chunk"
+        verbose_name_plural = "Task File Chunks"
+        db_table = "tasks_task_file_chunk"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task_file", "index"], name="unique_task_file_chunk"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.task_file} ({self.index})"
@@ -1,12 +1,15 @@
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Sum
 from drf_spectacular.utils import (
     OpenApiExample,
+    extend_schema_field,
     extend_schema_serializer,
 )
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
 from basedata.models import ChallengeGroup, Department, Position
 from basedata.serializers import (
@@ -19,6 +22,7 @@ from tasks.models import (
     MajorActivity,
     Milestone,
     Task,
+    TaskFile,
 )
 
 
@@ -940,3 +944,72 @@ class KSINestedSerializer(serializers.ModelSerializer):
     class Meta:
         model = KSI
         fields = ["id", "name", "milestones"]
+
+
+class TaskFileSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="file_name", max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    received_chunks = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TaskFile
+        fields = [
+            "id",
+            "task",
+            "name",
+            "content_type",
+            "size",
+            "chunk_size",
+            "chunk_count",
+            "received_chunks",
+            "sha256",
+            "status",
+            "assembly_error",
+            "download_url",
+            "created_by",
+            "created_date",
+            "updated_date",
+        ]
+        read_only_fields = [
+            "chunk_size",
+            "chunk_count",
+            "sha256",
+            "status",
+            "assembly_error",
+            "created_by",
+            "created_date",
+            "updated_date",
+        ]
+
+    def validate_size(self, value):
+        if value > settings.TASK_FILE_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Files must not be larger than {settings.TASK_FILE_MAX_SIZE} bytes."
+            )
+        return value
+
+    def get_received_chunks(self, task_file) -> list[int]:
+        """
+        The chunks uploaded so far, to resume an interrupted upload.
+        """
+        # Chunks are prefetched by the views
+        return sorted(chunk.index for chunk in task_file.chunks.all())
+
+    @extend_schema_field(serializers.URLField(allow_null=True))
+    def get_download_url(self, task_file):
+        if task_file.status != "completed":
+            return None
+        return reverse(
+            "task_file-download",
+            kwargs={"pk": task_file.pk},
+            request=self.context["request"],
+        )
+
+
+class TaskFileCompleteSerializer(serializers.Serializer):
+    sha256 = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$",
+        required=False,
+        help_text="The SHA-256 digest the assembled file must have.",
+    )
@@ -0,0 +1,203 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department, Position
+from tasks.models import KPI, KSI, MajorActivity, Milestone
+from users.models import Role
+
+User = get_user_model()
+
+
+class KSIStructureActionTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        leads_role = Role.objects.create(name="Leads")
+        leads_role.permissions.add(*Permission.objects.filter(codename="view_ksi"))
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.lead_user = User.objects.create_user(
+            email="lead@email.com",
+            password="1234abcd!A",
+            first_name="Lead",
+            last_name="User",
+        )
+        self.lead_user.groups.add(leads_role)
+
+        # Create departments and positions
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.department2 = Department.objects.create(
+            department_name="HR",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.position = Position.objects.create(
+            department=self.department,
+            position_name="Engineering Lead",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.lead_user.position = self.position
+        self.lead_user.save()
+
+        # Create a KSI hierarchy per department
+        self.ksi = KSI.objects.create(
+            ksi_name="Strategic Initiative 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=self.department,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.milestone = Milestone.objects.create(
+            ksi=self.ksi,
+            milestone_name="Milestone 1",
+            start_date="2024-01-01",
+            end_date="2024-06-30",
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.kpi = KPI.objects.create(
+            milestone=self.milestone,
+            kpi_name="KPI 1",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.major_activity = MajorActivity.objects.create(
+            kpi=self.kpi,
+            major_activity_name="Major Activity 1",
+            start_date="2024-01-01",
+            end_date="2024-01-31",
+            weight=100,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.ksi2 = KSI.objects.create(
+            ksi_name="Strategic Initiative 2",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=self.department2,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.lead_token = str(RefreshToken.for_user(self.lead_user).access_token)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.structure_url = reverse("ksi-structure", kwargs={"version": "v1"})
+
+    def _get_streamed_json(self, response):
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_structure_is_streamed_in_response_envelope(self):
+        """
+        Ensure the structure is streamed and wrapped in the response envelope.
+        """
+        response = self.client.get(self.structure_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming, "Structure should be streamed")
+        self.assertEqual(response["Content-Type"], "application/json")
+
+        response_data = self._get_streamed_json(response)
+        self.assertEqual(response_data["message"], "")
+        self.assertEqual(response_data["status_code"], status.HTTP_200_OK)
+        self.assertEqual(len(response_data["data"]), 2, "Both KSIs should be listed")
+
+        ksi = next(
+            item for item in response_data["data"] if item["id"] == str(self.ksi.id)
+        )
+        self.assertEqual(
+            ksi,
+            {
+                "id": str(self.ksi.id),
+                "name": "Strategic Initiative 1",
+                "milestones": [
+                    {
+                        "id": str(self.milestone.id),
+                        "name": "Milestone 1",
+                        "kpis": [
+                            {
+                                "id": str(self.kpi.id),
+                                "name": "KPI 1",
+                                "major_activities": [
+                                    {
+                                        "id": str(self.major_activity.id),
+                                        "name": "Major Activity 1",
+                                    }
+                                ],
+                            }
+                        ],
+                    }
+                ],
+            },
+        )
+
+    def test_structure_is_empty_list_when_no_ksis(self):
+        """
+        Ensure an empty structure is still a valid response envelope.
+        """
+        MajorActivity.objects.all().delete()
+        KPI.objects.all().delete()
+        Milestone.objects.all().delete()
+        KSI.objects.all().delete()
+
+        response = self.client.get(self.structure_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self._get_streamed_json(response),
+            {"message": "", "data": [], "status_code": 200},
+        )
+
+    def test_lead_structure_is_scoped_to_department(self):
+        """
+        Ensure leads only receive the structure of their own department.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.lead_token}")
+        response = self.client.get(self.structure_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response_data = self._get_streamed_json(response)
+        self.assertEqual(
+            [item["id"] for item in response_data["data"]],
+            [str(self.ksi.id)],
+            "Leads should only see KSIs of their department",
+        )
+
+    def test_unchanged_structure_is_not_modified(self):
+        """
+        Ensure polling an unchanged structure returns 304 without streaming it.
+        """
+        etag = self.client.get(self.structure_url)["ETag"]
+
+        response = self.client.get(self.structure_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(response.streaming)
+
+        self.major_activity.major_activity_name = "Major Activity 1 renamed"
+        self.major_activity.save()
+
+        response = self.client.get(self.structure_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
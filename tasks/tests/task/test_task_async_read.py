@@ -0,0 +1,173 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+from users.authentication import JWTAuthentication
+from users.models import Role
+
+User = get_user_model()
+
+
+class TaskAsyncReadTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.normal_user = User.objects.create_user(
+            email="user@email.com",
+            password="1234abcd!A",
+            first_name="Normal",
+            last_name="User",
+        )
+
+        # Create the task hierarchy
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.ksi = KSI.objects.create(
+            ksi_name="Strategic Initiative 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=self.department,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.milestone = Milestone.objects.create(
+            milestone_name="Milestone 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            ksi=self.ksi,
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.kpi = KPI.objects.create(
+            kpi_name="KPI 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            milestone=self.milestone,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.major_activity = MajorActivity.objects.create(
+            major_activity_name="Major Activity 1",
+            start_date="2024-01-01",
+            end_date="2024-01-31",
+            kpi=self.kpi,
+            department=self.department,
+            weight=70,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.task = Task.objects.create(
+            task_name="Task 1",
+            start_date="2024-01-01",
+            end_date="2024-01-15",
+            major_activity=self.major_activity,
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_headers = {
+            "Authorization": (
+                f"Bearer {RefreshToken.for_user(self.admin_user).access_token}"
+            )
+        }
+        self.user_headers = {
+            "Authorization": (
+                f"Bearer {RefreshToken.for_user(self.normal_user).access_token}"
+            )
+        }
+
+        # Define URLs
+        self.list_url = reverse("task-list", kwargs={"version": "v1"})
+        self.detail_url = reverse(
+            "task-detail", kwargs={"version": "v1", "pk": self.task.id}
+        )
+
+    def test_view_is_served_as_coroutine(self):
+        """
+        Ensure the task views are async views when ASYNC_VIEWS is enabled.
+        """
+        self.assertTrue(iscoroutinefunction(resolve(self.list_url).func))
+        self.assertTrue(iscoroutinefunction(resolve(self.detail_url).func))
+
+    async def test_list_is_read_asynchronously(self):
+        """
+        Ensure the list authenticates without the sync authenticator.
+        """
+        with mock.patch.object(
+            JWTAuthentication, "authenticate", side_effect=AssertionError
+        ):
+            response = await self.async_client.get(
+                self.list_url, headers=self.admin_headers
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["results"][0]["name"], "Task 1")
+
+    async def test_unchanged_detail_is_not_modified(self):
+        """
+        Ensure the async retrieve answers matching validators with 304.
+        """
+        response = await self.async_client.get(
+            self.detail_url, headers=self.admin_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = await self.async_client.get(
+            self.detail_url,
+            headers={**self.admin_headers, "If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_unauthenticated_read_is_rejected(self):
+        """
+        Ensure the async read path requires authentication.
+        """
+        response = await self.async_client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.async_client.get(
+            self.list_url, headers={"Authorization": "Bearer invalid"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_read_without_permission_is_forbidden(self):
+        """
+        Ensure the async read path checks model permissions.
+        """
+        response = await self.async_client.get(self.list_url, headers=self.user_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_write_keeps_sync_dispatch(self):
+        """
+        Ensure non-read actions still work on an async view.
+        """
+        response = await self.async_client.patch(
+            self.detail_url,
+            {"name": "Task 1 renamed"},
+            content_type="application/json",
+            headers=self.admin_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["name"], "Task 1 renamed")
@@ -0,0 +1,193 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from basedata.models import Department, Position
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+from users.models import Role
+
+User = get_user_model()
+
+
+class TaskConditionalRequestsTestCase(APITestCase):
+    def setUp(self):
+        # Create roles
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+
+        # Create users
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.admin_user2 = User.objects.create_superuser(
+            email="admin2@email.com",
+            password="1234abcd!A",
+            first_name="Admin2",
+            last_name="User",
+        )
+
+        # Create the task hierarchy
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.position = Position.objects.create(
+            department=self.department,
+            position_name="SWE 1",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.ksi = KSI.objects.create(
+            ksi_name="Strategic Initiative 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=self.department,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.milestone = Milestone.objects.create(
+            milestone_name="Milestone 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            ksi=self.ksi,
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.kpi = KPI.objects.create(
+            kpi_name="KPI 1",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            milestone=self.milestone,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.major_activity = MajorActivity.objects.create(
+            major_activity_name="Major Activity 1",
+            start_date="2024-01-01",
+            end_date="2024-01-31",
+            kpi=self.kpi,
+            department=self.department,
+            weight=70,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.task = Task.objects.create(
+            task_name="Task 1",
+            start_date="2024-01-01",
+            end_date="2024-01-15",
+            major_activity=self.major_activity,
+            weight=50,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+
+        # Generate JWT tokens
+        self.admin_token = str(RefreshToken.for_user(self.admin_user).access_token)
+        self.admin2_token = str(RefreshToken.for_user(self.admin_user2).access_token)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+
+        # Define URLs
+        self.list_url = reverse("task-list", kwargs={"version": "v1"})
+        self.detail_url = reverse(
+            "task-detail", kwargs={"version": "v1", "pk": self.task.id}
+        )
+        self.add_positions_url = reverse(
+            "task-add-positions", kwargs={"version": "v1", "pk": self.task.id}
+        )
+
+    def test_list_returns_validators(self):
+        """
+        Ensure the task list returns ETag and Last-Modified headers.
+        """
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("Authorization", response["Vary"])
+
+    def test_unchanged_list_is_not_modified(self):
+        """
+        Ensure polling an unchanged task list returns 304 without a body.
+        """
+        etag = self.client.get(self.list_url)["ETag"]
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_unchanged_list_is_not_modified_since(self):
+        """
+        Ensure If-Modified-Since is honoured when no ETag is sent.
+        """
+        last_modified = self.client.get(self.list_url)["Last-Modified"]
+
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unchanged_detail_is_not_modified(self):
+        """
+        Ensure polling an unchanged task returns 304.
+        """
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_invalidates_etag(self):
+        """
+        Ensure updating a task changes the ETag of the list.
+        """
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.client.patch(self.detail_url, {"name": "Task 1 renamed"}, format="json")
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            response.json()["data"]["results"][0]["name"], "Task 1 renamed"
+        )
+
+    def test_position_assignment_invalidates_etag(self):
+        """
+        Ensure many-to-many changes, which leave updated_date untouched,
+        change the ETag of the task.
+        """
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.client.patch(
+            self.add_positions_url, {"positions": [self.position.id]}, format="json"
+        )
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["data"]["positions"]), 1)
+
+    def test_etag_is_not_shared_between_users(self):
+        """
+        Ensure a user's ETag does not validate another user's representation.
+        """
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin2_token}")
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unauthorized_user_does_not_get_not_modified(self):
+        """
+        Ensure validators are only checked after authentication.
+        """
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.client.credentials()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,397 @@
+import hashlib
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from basedata.models import Department, Position
+from core.models import Blob
+from core.tests.helpers import TemporaryMediaMixin
+from tasks import files
+from tasks.models import KPI, KSI, MajorActivity, Milestone, Task, TaskFile
+from users.models import Role
+from users.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+CONTENT = b"0123456789" * 2 + b"abcde"
+
+
+@override_settings(TASK_FILE_CHUNK_SIZE=10)
+class TaskFileUploadTestCase(TemporaryMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        leads_role = Role.objects.create(name="Leads")
+        leads_role.permissions.add(
+            *Permission.objects.filter(
+                codename__in=[
+                    "view_task",
+                    "view_taskfile",
+                    "add_taskfile",
+                    "change_taskfile",
+                    "delete_taskfile",
+                ]
+            )
+        )
+
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.lead_user = self.create_lead("lead@email.com", leads_role)
+        self.other_lead_user = self.create_lead("lead2@email.com", leads_role)
+
+        self.task = self.create_task(self.lead_user)
+        self.other_task = self.create_task(self.other_lead_user)
+        self.authenticate(self.lead_user)
+
+    def create_lead(self, email, role):
+        department = Department.objects.create(
+            department_name=email,
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        position = Position.objects.create(
+            department=department,
+            position_name=f"Lead of {email}",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        user = User.objects.create_user(
+            email=email,
+            password="1234abcd!A",
+            first_name="Lead",
+            last_name="User",
+        )
+        user.groups.add(role)
+        user.position = position
+        user.save()
+        return user
+
+    def create_task(self, user):
+        department = user.position.department
+        ksi = KSI.objects.create(
+            ksi_name="KSI",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            department=department,
+            created_by=user,
+            updated_by=user,
+        )
+        milestone = Milestone.objects.create(
+            milestone_name="Milestone",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            ksi=ksi,
+            weight=50,
+            created_by=user,
+            updated_by=user,
+        )
+        kpi = KPI.objects.create(
+            kpi_name="KPI",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            milestone=milestone,
+            created_by=user,
+            updated_by=user,
+        )
+        major_activity = MajorActivity.objects.create(
+            major_activity_name="Major Activity",
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+            kpi=kpi,
+            department=department,
+            weight=70,
+            created_by=user,
+            updated_by=user,
+        )
+        return Task.objects.create(
+            task_name="Task",
+            start_date="2024-01-01",
+            end_date="2024-01-20",
+            major_activity=major_activity,
+            weight=50,
+            created_by=user,
+            updated_by=user,
+        )
+
+    def authenticate(self, user):
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def create_file(self, task=None, size=None):
+        return self.client.post(
+            reverse("task_file-list", kwargs={"version": "v1"}),
+            {
+                "task": str((task or self.task).pk),
+                "name": "report.txt",
+                "content_type": "text/plain",
+                "size": size or len(CONTENT),
+            },
+        )
+
+    def put_chunk(self, task_file_id, index, content):
+        url = reverse(
+            "task_file-upload-chunk",
+            kwargs={"version": "v1", "pk": task_file_id, "index": index},
+        )
+        return self.client.generic(
+            "PUT", url, content, content_type="application/octet-stream"
+        )
+
+    def complete(self, task_file_id, sha256=None):
+        url = reverse(
+            "task_file-complete", kwargs={"version": "v1", "pk": task_file_id}
+        )
+        # Assembled once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, {"sha256": sha256} if sha256 else {})
+
+    def get_file(self, task_file_id):
+        url = reverse("task_file-detail", kwargs={"version": "v1", "pk": task_file_id})
+        return self.client.get(url).data
+
+    def upload(self, content=CONTENT, task=None):
+        task_file_id = self.create_file(task, size=len(content)).data["id"]
+        for index in range(0, len(content), 10):
+            self.put_chunk(task_file_id, index // 10, content[index : index + 10])
+        return task_file_id
+
+    def test_chunked_upload_and_download(self):
+        """
+        Ensure chunks uploaded in any order, one of them again, are
+        assembled into the file, which downloads as uploaded.
+        """
+        response = self.create_file()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["chunk_size"], 10)
+        self.assertEqual(response.data["chunk_count"], 3)
+        self.assertEqual(response.data["status"], "uploading")
+        task_file_id = response.data["id"]
+
+        self.put_chunk(task_file_id, 2, CONTENT[20:])
+        self.put_chunk(task_file_id, 0, b"x" * 10)
+        response = self.put_chunk(task_file_id, 0, CONTENT[:10])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["received_chunks"], [0, 2])
+
+        # An interrupted upload resumes from the chunks received
+        url = reverse("task_file-detail", kwargs={"version": "v1", "pk": task_file_id})
+        self.assertEqual(self.client.get(url).data["received_chunks"], [0, 2])
+        self.put_chunk(task_file_id, 1, CONTENT[10:20])
+
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        response = self.complete(task_file_id, sha256=digest)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "assembling")
+
+        data = self.get_file(task_file_id)
+        self.assertEqual(data["status"], "completed")
+        self.assertEqual(data["sha256"], digest)
+        self.assertEqual(data["received_chunks"], [])
+
+        task_file = TaskFile.objects.get(pk=task_file_id)
+        self.assertTrue(task_file.file.name.startswith("task-files/report-"))
+        self.assertFalse(default_storage.exists(f"task-files/chunks/{task_file_id}/0"))
+
+        response = self.client.get(data["download_url"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response["ETag"], f'"{digest}"')
+        self.assertIn('filename="report.txt"', response["Content-Disposition"])
+
+        # Served by the storage where it presigns its URLs
+        presigned_url = "https://media.example.com/blobs/ab/abc?X-Amz-Signature=x"
+        with mock.patch(
+            "tasks.views.get_download_url", return_value=presigned_url
+        ) as get_download_url:
+            response = self.client.get(data["download_url"])
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(response["Location"], presigned_url)
+        get_download_url.assert_called_once_with(
+            task_file.file.name, "report.txt", "text/plain"
+        )
+
+        # Completing again is harmless
+        response = self.complete(task_file_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_chunks_are_checked(self):
+        """
+        Ensure chunks out of range or of the wrong size are refused, and an
+        upload missing chunks cannot be completed.
+        """
+        task_file_id = self.create_file().data["id"]
+
+        response = self.put_chunk(task_file_id, 3, CONTENT[:5])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.put_chunk(task_file_id, 0, CONTENT[:5])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.put_chunk(task_file_id, 2, CONTENT[20:])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.complete(task_file_id)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("[0, 1]", str(response.data))
+
+    def test_digest_mismatch(self):
+        """
+        Ensure an upload whose digest differs is not completed, so chunks can
+        be uploaded again.
+        """
+        task_file_id = self.upload()
+        response = self.complete(task_file_id, sha256="0" * 64)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        data = self.get_file(task_file_id)
+        self.assertEqual(data["status"], "uploading")
+        self.assertEqual(data["assembly_error"], "The file does not match the digest.")
+        self.assertEqual(data["received_chunks"], [0, 1, 2])
+        self.assertEqual(Blob.objects.count(), 0)
+        self.assertEqual(default_storage.listdir("task-files")[1], [])
+
+        response = self.complete(task_file_id)
+        self.assertEqual(self.get_file(task_file_id)["status"], "completed")
+
+    def test_assembly_in_progress(self):
+        """
+        Ensure a file being assembled takes no chunks and is not assembled
+        twice, unless the assembly was lost.
+        """
+        task_file_id = self.upload()
+        with mock.patch.object(files.executor, "submit") as submit:
+            self.complete(task_file_id)
+            self.complete(task_file_id)
+        submit.assert_called_once()
+        self.assertEqual(str(submit.call_args.args[0]), task_file_id)
+
+        response = self.put_chunk(task_file_id, 0, CONTENT[:10])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        TaskFile.objects.filter(pk=task_file_id).update(
+            updated_date=timezone.now() - timedelta(hours=2)
+        )
+        response = self.complete(task_file_id)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.get_file(task_file_id)["status"], "completed")
+
+    def test_failed_assembly(self):
+        """
+        Ensure a file that could not be assembled can be completed again.
+        """
+        task_file_id = self.upload()
+        assemble = mock.patch.object(files, "assemble", side_effect=OSError)
+        with assemble, self.assertLogs("tasks.files", "ERROR"):
+            self.complete(task_file_id)
+
+        data = self.get_file(task_file_id)
+        self.assertEqual(data["status"], "uploading")
+        self.assertEqual(data["assembly_error"], "The file could not be assembled.")
+
+    def test_size_limit(self):
+        """
+        Ensure files over TASK_FILE_MAX_SIZE are refused.
+        """
+        with override_settings(TASK_FILE_MAX_SIZE=20):
+            response = self.create_file()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_files_of_invisible_tasks(self):
+        """
+        Ensure files of tasks the user does not see are neither listed nor
+        accepted.
+        """
+        response = self.create_file(task=self.other_task)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.authenticate(self.other_lead_user)
+        task_file_id = self.upload(task=self.other_task)
+        self.authenticate(self.lead_user)
+
+        url = reverse("task_file-detail", kwargs={"version": "v1", "pk": task_file_id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.put_chunk(task_file_id, 0, CONTENT[:10])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_files_of_task(self):
+        """
+        Ensure the files of a task are listed by filtering on it.
+        """
+        self.upload()
+        self.authenticate(self.admin_user)
+        self.create_file(task=self.other_task)
+
+        response = self.client.get(
+            reverse("task_file-list", kwargs={"version": "v1"}),
+            {"task": str(self.task.pk)},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["name"], "report.txt")
+
+    def test_delete_file(self):
+        """
+        Ensure deleting a file releases its blob, deleted once collected.
+        """
+        task_file_id = self.upload()
+        self.complete(task_file_id)
+        name = TaskFile.objects.get(pk=task_file_id).file.name
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 1)
+
+        url = reverse("task_file-detail", kwargs={"version": "v1", "pk": task_file_id})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Blob.objects.get(name=name).ref_count, 0)
+        self.assertTrue(default_storage.exists(name))
+
+        call_command("collect_blobs", "--grace-hours", "0", stdout=io.StringIO())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_identical_files_are_stored_once(self):
+        """
+        Ensure a file with the content of another refers to the same object.
+        """
+        first_id = self.upload()
+        self.complete(first_id)
+        second_id = self.upload()
+        self.complete(second_id)
+
+        first = TaskFile.objects.get(pk=first_id)
+        second = TaskFile.objects.get(pk=second_id)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(Blob.objects.get(name=first.file.name).ref_count, 2)
+        self.assertEqual(len(default_storage.listdir("task-files")[1]), 1)
+
+    def test_prune_unfinished_uploads(self):
+        """
+        Ensure uploads left unfinished past TASK_FILE_UPLOAD_EXPIRY are deleted
+        with their chunks.
+        """
+        task_file_id = self.upload()
+        recent_id = self.upload()
+        TaskFile.objects.filter(pk=task_file_id).update(
+            created_date=timezone.now() - timedelta(hours=49)
+        )
+
+        output = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("prune_task_file_uploads", stdout=output)
+        self.assertIn("Deleted 1 unfinished uploads", output.getvalue())
+        self.assertFalse(TaskFile.objects.filter(pk=task_file_id).exists())
+        self.assertTrue(TaskFile.objects.filter(pk=recent_id).exists())
+        self.assertFalse(default_storage.exists(f"task-files/chunks/{task_file_id}/0"))
@@ -6,6 +6,7 @@ from tasks.views import (
     KSIViewSet,
     MajorActivityViewSet,
     MilestoneViewSet,
+    TaskFileViewSet,
     TaskViewSet,
 )
 
@@ -16,6 +17,7 @@ router.register("ksis", KSIViewSet, "ksi")
 router.register("major_activities", MajorActivityViewSet, "major_activity")
 router.register("milestones", MilestoneViewSet, "milestone")
 router.register("tasks", TaskViewSet, "task")
+router.register("task_files", TaskFileViewSet, "task_file")
 
 urlpatterns = [
     path("", include(router.urls)),
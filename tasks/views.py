@@ -1,35 +1,62 @@
-from django.db.models import Q
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch, Q
+from django.http import FileResponse, HttpResponseRedirect
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import (
+    NotFound,
+    PermissionDenied,
+    ValidationError,
+)
 from rest_framework.response import Response
 
+from basedata.models import ChallengeGroup, ChallengeType, Department, Position
+from core.media import get_download_url
+from core.mixins import AsyncReadMixin, ConditionalGetMixin
 from core.permissions import HasRole
+from core.renderers import StreamingJSONResponse
+from tasks.files import complete_upload, delete_files, save_chunk
 from tasks.filters import (
     KPIFilter,
     KSIFilter,
     MajorActivityFilter,
     MilestoneFilter,
+    TaskFileFilter,
     TaskFilter,
 )
-from tasks.models import KPI, KSI, MajorActivity, Milestone, Task
+from tasks.models import (
+    KPI,
+    KSI,
+    MajorActivity,
+    Milestone,
+    Task,
+    TaskFile,
+    TaskFileChunk,
+)
 from tasks.serializers import (
     KPISerializer,
     KSINestedSerializer,
     KSISerializer,
     MajorActivitySerializer,
     MilestoneSerializer,
+    TaskFileCompleteSerializer,
+    TaskFileSerializer,
     TaskPositionSerializer,
     TaskSerializer,
 )
+from users.claims import get_role_claims, has_role
+from users.models import User
 
 
-class KSIViewSet(viewsets.ModelViewSet):
+class KSIViewSet(AsyncReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = KSI.objects.all()
     serializer_class = KSISerializer
     search_fields = ["ksi_name"]
     filterset_class = KSIFilter
+    structure_chunk_size = 100
     ordering_fields = [
         "ksi_name",
         "start_date",
@@ -37,17 +64,17 @@ class KSIViewSet(viewsets.ModelViewSet):
         "created_date",
         "updated_date",
     ]
+    conditional_models = [Department, Milestone, KPI, MajorActivity, Task, User]
+    conditional_actions = ["list", "retrieve", "structure"]
 
     def get_queryset(self):
-        user = self.request.user
+        claims = get_role_claims(self.request)
         queryset = super().get_queryset()
 
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
+        user_is_lead = has_role(self.request, "Leads")
 
-        if user.position and user.position.department and user_is_lead:
-            queryset = queryset.filter(department=user.position.department)
+        if claims.department_id and user_is_lead:
+            queryset = queryset.filter(department=claims.department_id)
         return queryset
 
     @extend_schema(
@@ -93,21 +120,27 @@ class KSIViewSet(viewsets.ModelViewSet):
     @extend_schema(responses=KSINestedSerializer(many=True))
     @action(detail=False, methods=["get"], pagination_class=None)
     def structure(self, request, *args, **kwargs):
-        user = self.request.user
+        response = self.get_not_modified_response(request)
+        if response is not None:
+            return response
+
+        claims = get_role_claims(self.request)
         queryset = self.get_queryset()
 
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
+        user_is_lead = has_role(self.request, "Leads")
 
-        if user.position and user.position.department and user_is_lead:
-            queryset = queryset.filter(department=user.position.department)
+        if claims.department_id and user_is_lead:
+            queryset = queryset.filter(department=claims.department_id)
 
-        serializer = KSINestedSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        queryset = queryset.prefetch_related("milestones__kpis__major_activities")
+        ksis = (
+            KSINestedSerializer(ksi).data
+            for ksi in queryset.iterator(chunk_size=self.structure_chunk_size)
+        )
+        return StreamingJSONResponse(ksis, status=status.HTTP_200_OK)
 
 
-class MilestoneViewSet(viewsets.ModelViewSet):
+class MilestoneViewSet(AsyncReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Milestone.objects.all()
     serializer_class = MilestoneSerializer
     search_fields = ["milestone_name"]
@@ -120,17 +153,16 @@ class MilestoneViewSet(viewsets.ModelViewSet):
         "created_date",
         "updated_date",
     ]
+    conditional_models = [KSI, KPI, MajorActivity, Task, User]
 
     def get_queryset(self):
-        user = self.request.user
+        claims = get_role_claims(self.request)
         queryset = super().get_queryset()
 
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
+        user_is_lead = has_role(self.request, "Leads")
 
-        if user.position and user.position.department and user_is_lead:
-            queryset = queryset.filter(ksi__department=user.position.department)
+        if claims.department_id and user_is_lead:
+            queryset = queryset.filter(ksi__department=claims.department_id)
 
         return queryset
 
@@ -162,7 +194,7 @@ class MilestoneViewSet(viewsets.ModelViewSet):
         return super().perform_update(serializer)
 
 
-class KPIViewSet(viewsets.ModelViewSet):
+class KPIViewSet(AsyncReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = KPI.objects.all()
     serializer_class = KPISerializer
     search_fields = ["kpi_name"]
@@ -174,19 +206,16 @@ class KPIViewSet(viewsets.ModelViewSet):
         "created_date",
         "updated_date",
     ]
+    conditional_models = [Milestone, User]
 
     def get_queryset(self):
-        user = self.request.user
+        claims = get_role_claims(self.request)
         queryset = super().get_queryset()
 
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
+        user_is_lead = has_role(self.request, "Leads")
 
-        if user.position and user.position.department and user_is_lead:
-            queryset = queryset.filter(
-                milestone__ksi__department=user.position.department
-            )
+        if claims.department_id and user_is_lead:
+            queryset = queryset.filter(milestone__ksi__department=claims.department_id)
 
         return queryset
 
@@ -218,7 +247,7 @@ class KPIViewSet(viewsets.ModelViewSet):
         return super().perform_update(serializer)
 
 
-class MajorActivityViewSet(viewsets.ModelViewSet):
+class MajorActivityViewSet(AsyncReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = MajorActivity.objects.all()
     serializer_class = MajorActivitySerializer
     search_fields = ["major_activity_name"]
@@ -231,19 +260,18 @@ class MajorActivityViewSet(viewsets.ModelViewSet):
         "created_date",
         "updated_date",
     ]
+    conditional_models = [KPI, Department, Task, User]
 
     def get_queryset(self):
-        user = self.request.user
+        claims = get_role_claims(self.request)
         queryset = super().get_queryset()
 
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
+        user_is_lead = has_role(self.request, "Leads")
 
-        if user.position and user.position.department and user_is_lead:
+        if claims.department_id and user_is_lead:
             queryset = queryset.filter(
-                Q(department=user.position.department)
-                | Q(kpi__milestone__ksi__department=user.position.department)
+                Q(department=claims.department_id)
+                | Q(kpi__milestone__ksi__department=claims.department_id)
             )
 
         return queryset
@@ -283,14 +311,14 @@ class MajorActivityViewSet(viewsets.ModelViewSet):
     @extend_schema(responses=MajorActivitySerializer(many=True))
     @action(methods=["get"], detail=False)
     def assigned(self, request, *args, **kwargs):
-        user = request.user
+        claims = get_role_claims(request)
         major_activities = self.queryset
 
-        if not (user and user.position and user.position.department):
+        if not claims.department_id:
             assigned_major_activities = major_activities.none()
         else:
             assigned_major_activities = major_activities.filter(
-                department=request.user.position.department
+                department=claims.department_id
             )
 
         page = self.paginate_queryset(assigned_major_activities)
@@ -298,7 +326,31 @@ class MajorActivityViewSet(viewsets.ModelViewSet):
         return self.get_paginated_response(serializer.data)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+def filter_visible_tasks(request, queryset):
+    """
+    Returns the tasks of `queryset` the user of `request` may see.
+    """
+    claims = get_role_claims(request)
+    user_is_lead = has_role(request, "Leads")
+    user_is_expert = has_role(request, "Experts")
+
+    department = claims.department_id
+    if department and user_is_lead:
+        queryset = queryset.filter(
+            Q(major_activity__department=department)
+            | Q(major_activity__kpi__milestone__ksi__department=department)
+        )
+
+    if claims.position_id and user_is_expert:
+        expert_tasks = queryset.filter(positions=claims.position_id)
+        expert_sub_tasks = queryset.filter(parent_task__in=expert_tasks)
+        queryset = expert_tasks | expert_sub_tasks
+        queryset = queryset.distinct()
+
+    return queryset
+
+
+class TaskViewSet(AsyncReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     search_fields = ["task_name"]
@@ -313,31 +365,10 @@ class TaskViewSet(viewsets.ModelViewSet):
         "created_date",
         "updated_date",
     ]
+    conditional_models = [MajorActivity, Position, ChallengeGroup, ChallengeType, User]
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = super().get_queryset()
-
-        user_is_lead = (
-            user.is_authenticated and user.groups.filter(name="Leads").exists()
-        )
-        user_is_expert = (
-            user.is_authenticated and user.groups.filter(name="Experts").exists()
-        )
-
-        if user.position and user.position.department and user_is_lead:
-            queryset = queryset.filter(
-                Q(major_activity__department=user.position.department)
-                | Q(
-                    major_activity__kpi__milestone__ksi__department=user.position.department
-                )
-            )
-
-        if user.position and user_is_expert:
-            expert_tasks = queryset.filter(positions=user.position)
-            expert_sub_tasks = queryset.filter(parent_task__in=expert_tasks)
-            queryset = expert_tasks | expert_sub_tasks
-            queryset = queryset.distinct()
+        queryset = filter_visible_tasks(self.request, super().get_queryset())
 
         # get only parent tasks on list to embed subtasks
         if self.action == "list":
@@ -378,10 +409,9 @@ class TaskViewSet(viewsets.ModelViewSet):
         old_approval_status = instance.approval_status
         new_status = request.data.get("status")
         new_approval_status = request.data.get("approval_status")
-        user = self.request.user
 
-        user_is_lead = user.groups.filter(name="Leads").exists()
-        user_is_operation_team = user.groups.filter(name="Operation-Team").exists()
+        user_is_lead = has_role(request, "Leads")
+        user_is_operation_team = has_role(request, "Operation-Team")
 
         is_status_being_updated = old_status != new_status
         is_approval_status_being_updated = old_approval_status != new_approval_status
@@ -441,3 +471,130 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         task_serializer = TaskSerializer(task, context={"request": request})
         return Response(task_serializer.data, status=status.HTTP_200_OK)
+
+
+class TaskFileViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Files of tasks, uploaded in chunks: create the file, PUT its chunks, then
+    complete the upload.
+    """
+
+    queryset = TaskFile.objects.all()
+    serializer_class = TaskFileSerializer
+    filterset_class = TaskFileFilter
+    search_fields = ["file_name"]
+    ordering_fields = ["file_name", "size", "created_date"]
+
+    def get_queryset(self):
+        visible_tasks = filter_visible_tasks(self.request, Task.objects.all())
+        return (
+            super()
+            .get_queryset()
+            .filter(task__in=visible_tasks.values("pk"))
+            .prefetch_related(
+                Prefetch("chunks", queryset=TaskFileChunk.objects.only("index"))
+            )
+        )
+
+    def perform_create(self, serializer):
+        task = serializer.validated_data["task"]
+        visible_tasks = filter_visible_tasks(self.request, Task.objects.all())
+        if not visible_tasks.filter(pk=task.pk).exists():
+            raise PermissionDenied(
+                {"detail": "You do not have permission to perform this action."}
+            )
+        serializer.save(
+            created_by=self.request.user, chunk_size=settings.TASK_FILE_CHUNK_SIZE
+        )
+
+    def perform_destroy(self, instance):
+        # The file itself is released with the instance, see core.storage
+        delete_files(instance.chunks.values_list("file", flat=True))
+        instance.delete()
+
+    @extend_schema(
+        description=(
+            "Uploads the chunk `index` of the file as the raw request body, "
+            "replacing any previous upload of it."
+        ),
+        request={"application/octet-stream": {"type": "string", "format": "binary"}},
+        responses=TaskFileSerializer,
+    )
+    @action(detail=True, methods=["put"], url_path=r"chunks/(?P<index>[0-9]+)")
+    def upload_chunk(self, request, index, *args, **kwargs):
+        task_file = self.get_object()
+        if task_file.status != "uploading":
+            raise ValidationError({"detail": "The upload is already completed."})
+        try:
+            size = int(request.META.get("CONTENT_LENGTH") or "")
+        except ValueError as error:
+            raise ValidationError({"size": "A Content-Length is required."}) from error
+
+        # The body is streamed to the storage rather than parsed
+        save_chunk(task_file, int(index), request.stream, size)
+
+        task_file = self.get_object()
+        serializer = self.get_serializer(task_file)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        description=(
+            "Assembles the uploaded chunks into the file, in the background. "
+            "The file is `assembling` until `completed`, or `uploading` again "
+            "with an `assembly_error`."
+        ),
+        request=TaskFileCompleteSerializer,
+        responses={200: TaskFileSerializer, 202: TaskFileSerializer},
+    )
+    @action(detail=True, methods=["post"])
+    def complete(self, request, *args, **kwargs):
+        task_file = self.get_object()
+        serializer = TaskFileCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        complete_upload(task_file, serializer.validated_data.get("sha256"))
+
+        task_file = self.get_object()
+        serializer = self.get_serializer(task_file)
+        if task_file.status == "completed":
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        description=(
+            "Redirects to a presigned URL of the file, served by the storage, "
+            "where the storage presigns its URLs. Streams the file otherwise."
+        ),
+        responses={
+            (200, "application/octet-stream"): OpenApiTypes.BINARY,
+            302: None,
+        },
+    )
+    @action(detail=True, methods=["get"])
+    def download(self, request, *args, **kwargs):
+        task_file = self.get_object()
+        if task_file.status != "completed":
+            raise NotFound({"detail": "The upload is not completed."})
+
+        url = get_download_url(
+            task_file.file.name, task_file.file_name, task_file.content_type
+        )
+        if url:
+            return HttpResponseRedirect(url)
+
+        # Sent in blocks as it is read from the storage
+        response = FileResponse(
+            default_storage.open(task_file.file.name),
+            as_attachment=True,
+            filename=task_file.file_name,
+            content_type=task_file.content_type,
+        )
+        response["Content-Length"] = task_file.size
+        response["ETag"] = f'"{task_file.sha256}"'
+        return response
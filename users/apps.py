@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from basedata.models import Position
+        from core.storage import track_blob_references
+        from core.versions import track_model_versions
+
+        # Registers the system checks
+        from users import checks  # noqa: F401
+        from users.claims import track_role_changes
+        from users.models import User
+        from users.revocation import track_revocations
+        from users.thumbnails import generate_thumbnails_on_change
+
+        # Logins update these, which the API never represents
+        track_model_versions(User, ignore_fields=["last_login", "password"])
+        track_role_changes(User, Position)
+        track_revocations()
+        generate_thumbnails_on_change(User)
+        track_blob_references(User)
@@ -3,6 +3,9 @@ from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import (
     JWTAuthentication as BaseJWTAuthentication,
 )
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
 
 class JWTAuthenticationScheme(OpenApiAuthenticationExtension):
@@ -18,13 +21,57 @@ class JWTAuthenticationScheme(OpenApiAuthenticationExtension):
 
 
 class JWTAuthentication(BaseJWTAuthentication):
-    def get_user(self, validated_token):
-        user = super().get_user(validated_token)
-
+    def check_user(self, user):
         if not user.is_not_deactivated:
             raise AuthenticationFailed(
                 "Your account has been deactivated, please contact support.",
                 code="user_inactive",
             )
 
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        self.check_user(user)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Async variant of `authenticate`, used by `core.mixins.AsyncReadMixin`.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            ) from e
+
+        try:
+            user = await self.user_model.objects.aget(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed("User not found", code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                "The user's password has been changed.", code="password_changed"
+            )
+
+        self.check_user(user)
         return user
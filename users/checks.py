@@ -0,0 +1,60 @@
+"""System checks of the caches authentication relies on, see core.checks."""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from core.checks import has_several_workers, is_process_local
+
+
+@register(Tags.caches, Tags.security)
+def check_lockout_cache(app_configs, **kwargs):
+    if (
+        settings.AXES_ENABLED
+        and has_several_workers()
+        and is_process_local(settings.AXES_CACHE)
+    ):
+        return [
+            Warning(
+                "The login lockout cache is process-local while serving with "
+                "several workers, so each worker counts failed logins apart "
+                "and forgets them when recycled.",
+                hint="Set LOCKOUT_CACHE_URL to a shared cache, e.g. redis://...",
+                id="users.W001",
+            )
+        ]
+    return []
+
+
+@register(Tags.caches, Tags.security)
+def check_revocation_cache(app_configs, **kwargs):
+    if has_several_workers() and is_process_local("default"):
+        return [
+            Warning(
+                "The default cache is process-local while serving with several "
+                "workers, so tokens blacklisted through one worker are still "
+                "accepted by the others.",
+                hint="Set CACHE_URL to a shared cache, e.g. redis://...",
+                id="users.W002",
+            )
+        ]
+    return []
+
+
+@register(Tags.caches, Tags.security)
+def check_role_claims_cache(app_configs, **kwargs):
+    if (
+        settings.TOKEN_ROLE_CLAIMS
+        and has_several_workers()
+        and is_process_local("default")
+    ):
+        return [
+            Warning(
+                "TOKEN_ROLE_CLAIMS needs a shared default cache while serving "
+                "with several workers, otherwise the role changes made through "
+                "one worker leave the claims of the others trusted until the "
+                "tokens expire.",
+                hint="Set CACHE_URL to a shared cache, e.g. redis://...",
+                id="users.W003",
+            )
+        ]
+    return []
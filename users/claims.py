@@ -0,0 +1,160 @@
+"""Role claims of the access tokens.
+
+With `TOKEN_ROLE_CLAIMS` enabled, access tokens carry the user's roles,
+department and position, so role scoping reads them instead of querying
+the user's groups and position on every request. Claims are trusted while
+their `role_version` matches the user's current version in the cache,
+which changes as soon as the user's roles or position, or any role, change.
+Otherwise, and with the setting disabled, they are loaded from the database.
+The versions must be in a cache every process shares, see users.checks.
+"""
+
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group as Role
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from core.cache import get_tag_versions, invalidate_tags
+
+ROLES_TAG = "users.claims.roles"
+USER_TAG_PREFIX = "users.claims.user"
+
+RoleClaims = namedtuple("RoleClaims", ["roles", "department_id", "position_id"])
+
+
+def get_version_tags(user_id):
+    return [ROLES_TAG, f"{USER_TAG_PREFIX}:{user_id}"]
+
+
+def get_role_version(user_id):
+    tags = get_version_tags(user_id)
+    versions = get_tag_versions(tags)
+    fingerprint = "|".join(versions[tag] for tag in tags)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+
+def load_role_claims(user):
+    position = user.position
+    return RoleClaims(
+        # In the order of `groups.first()`, the role of `user_role`
+        roles=list(user.groups.order_by("pk").values_list("name", flat=True)),
+        department_id=position.department_id if position else None,
+        position_id=user.position_id,
+    )
+
+
+def to_claim(pk):
+    return str(pk) if pk else None
+
+
+def add_role_claims(token, user):
+    """
+    Signs the user's role into `token`, along with its department, position
+    and role version when `TOKEN_ROLE_CLAIMS` is enabled.
+    """
+    # Read before the claims, so a concurrent change leaves them untrusted
+    role_version = get_role_version(user.pk) if settings.TOKEN_ROLE_CLAIMS else None
+    claims = load_role_claims(user)
+
+    token["user_role"] = claims.roles[0] if claims.roles else None
+    if settings.TOKEN_ROLE_CLAIMS:
+        token["roles"] = claims.roles
+        token["department_id"] = to_claim(claims.department_id)
+        token["position_id"] = to_claim(claims.position_id)
+        token["role_version"] = role_version
+
+
+def get_token_role_claims(token, user_id):
+    if not (
+        settings.TOKEN_ROLE_CLAIMS
+        and token is not None
+        and "role_version" in token
+        and token["role_version"] == get_role_version(user_id)
+    ):
+        return None
+    return RoleClaims(token["roles"], token["department_id"], token["position_id"])
+
+
+def get_role_claims(request):
+    """
+    Returns the role claims of the request's user, from its access token
+    when they are trusted.
+    """
+    claims = getattr(request, "role_claims", None)
+    if claims is None:
+        user = request.user
+        if not user.is_authenticated:
+            claims = RoleClaims([], None, None)
+        else:
+            claims = get_token_role_claims(request.auth, user.pk)
+            claims = claims or load_role_claims(user)
+        request.role_claims = claims
+    return claims
+
+
+def has_role(request, role):
+    return role in get_role_claims(request).roles
+
+
+def invalidate_role_claims(*user_ids):
+    tags = [get_version_tags(user_id)[1] for user_id in user_ids]
+    if tags:
+        invalidate_tags(*tags)
+        # Again once committed, in case a token was issued in between
+        transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def invalidate_all_role_claims():
+    invalidate_tags(ROLES_TAG)
+    transaction.on_commit(lambda: invalidate_tags(ROLES_TAG))
+
+
+def _on_user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "position" not in update_fields):
+        return
+    invalidate_role_claims(instance.pk)
+
+
+def _on_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        invalidate_role_claims(instance.pk)
+    elif action == "post_clear":
+        invalidate_all_role_claims()
+    else:
+        invalidate_role_claims(*pk_set)
+
+
+def _on_position_changed(sender, instance, raw=False, **kwargs):
+    # Moves the department of its user, or leaves them without a position
+    if not raw:
+        user_ids = get_user_model().objects.filter(position=instance)
+        invalidate_role_claims(*user_ids.values_list("pk", flat=True))
+
+
+def _on_role_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_all_role_claims()
+
+
+def track_role_changes(user_model, position_model):
+    """
+    Distrusts the role claims of users whose roles or position change.
+    Call from `AppConfig.ready()`.
+    """
+    dispatch_uid = "track_role_changes"
+    post_save.connect(_on_user_saved, sender=user_model, dispatch_uid=dispatch_uid)
+    m2m_changed.connect(
+        _on_roles_changed, sender=user_model.groups.through, dispatch_uid=dispatch_uid
+    )
+    for signal in [post_save, pre_delete]:
+        signal.connect(
+            _on_position_changed, sender=position_model, dispatch_uid=dispatch_uid
+        )
+    for signal in [post_save, post_delete]:
+        signal.connect(_on_role_changed, sender=Role, dispatch_uid=dispatch_uid)
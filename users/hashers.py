@@ -0,0 +1,116 @@
+"""Password hashers running on a bounded pool of threads.
+
+Hashing a password is slow by design, so a burst of logins or signups
+would otherwise take every worker thread and CPU from the rest of the API.
+Each process hashes at most `PASSWORD_HASHING_CONCURRENCY` passwords at a
+time, and a hash waiting more than `PASSWORD_HASHING_QUEUE_TIMEOUT` seconds
+for a slot raises `PasswordHashingBusy`, which the API answers with a 503
+response.
+
+The pool bounds the CPU spent hashing, not the worker threads: the thread
+of the request still blocks until its hash is computed or rejected.
+"""
+
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from core.executors import ProcessExecutor
+from core.metrics import (
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_REJECTIONS,
+)
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when a password waited too long for a hashing slot.
+
+    A plain exception, as hashers are called outside of DRF too, e.g. by
+    the admin and `createsuperuser`. DRF views answer it with a 503
+    response, see `core.exceptions.exception_handler`.
+    """
+
+    def __init__(self, wait):
+        super().__init__("No password hashing slot freed up in time.")
+        # Seconds after which to retry
+        self.wait = wait
+
+
+class HashingExecutor(ProcessExecutor):
+    def __init__(self):
+        super().__init__("PASSWORD_HASHING_CONCURRENCY", "password-hashing")
+        self.local = threading.local()
+
+    def run(self, function, *args, **kwargs):
+        """
+        Returns `function(*args, **kwargs)` once computed on the pool.
+
+        The calling thread blocks on the result all along, so the pool only
+        caps how many hashes run at once and frees no request worker.
+        Raises `PasswordHashingBusy` when no slot frees up in time.
+        """
+        # Hashers verify by encoding, already on the pool
+        if getattr(self.local, "on_pool", False):
+            return function(*args, **kwargs)
+
+        queued_at = time.perf_counter()
+        started = threading.Event()
+
+        def task():
+            started.set()
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+            PASSWORD_HASH_QUEUE_WAIT.observe(time.perf_counter() - queued_at)
+            self.local.on_pool = True
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.local.on_pool = False
+
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+        future = self.get_executor().submit(task)
+
+        timeout = settings.PASSWORD_HASHING_QUEUE_TIMEOUT
+        # A task that started meanwhile can't be cancelled and is awaited
+        if not started.wait(timeout) and future.cancel():
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+            PASSWORD_HASH_REJECTIONS.inc()
+            raise PasswordHashingBusy(wait=math.ceil(timeout))
+        return future.result()
+
+
+executor = HashingExecutor()
+
+
+class OffloadedHasherMixin:
+    def encode(self, *args, **kwargs):
+        return executor.run(super().encode, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return executor.run(super().verify, password, encoded)
+
+
+class PBKDF2PasswordHasher(OffloadedHasherMixin, hashers.PBKDF2PasswordHasher):
+    pass
+
+
+class PBKDF2SHA1PasswordHasher(OffloadedHasherMixin, hashers.PBKDF2SHA1PasswordHasher):
+    pass
+
+
+class Argon2PasswordHasher(OffloadedHasherMixin, hashers.Argon2PasswordHasher):
+    pass
+
+
+class BCryptSHA256PasswordHasher(
+    OffloadedHasherMixin, hashers.BCryptSHA256PasswordHasher
+):
+    pass
+
+
+class ScryptPasswordHasher(OffloadedHasherMixin, hashers.ScryptPasswordHasher):
+    pass
@@ -0,0 +1,100 @@
+"""Login lockout tracking in the cache rather than the database.
+
+Failed logins are counted per client, under the keys of
+`AXES_LOCKOUT_PARAMETERS`, in the `AXES_CACHE` cache. Each counter expires
+`AXES_COOLOFF_TIME` after the client's last failure, so a credential
+stuffing burst never writes `AccessAttempt` rows.
+"""
+
+import logging
+
+from axes.conf import settings
+from axes.handlers.cache import AxesCacheHandler
+from axes.helpers import (
+    get_cache_timeout,
+    get_client_cache_keys,
+    get_client_str,
+    get_client_username,
+    get_failure_limit,
+    get_lockout_parameters,
+)
+from axes.signals import user_locked_out
+
+logger = logging.getLogger(__name__)
+
+
+def count_failure(cache, key, timeout):
+    """
+    Atomically increments the failure counter at `key` and restarts its
+    expiry, returning the new count.
+    """
+    if cache.add(key, 1, timeout=timeout):
+        return 1
+    try:
+        failures = cache.incr(key)
+    except ValueError:
+        # The counter expired between `add` and `incr`
+        return count_failure(cache, key, timeout)
+    cache.touch(key, timeout=timeout)
+    return failures
+
+
+class CacheLockoutHandler(AxesCacheHandler):
+    def get_failures(self, request, credentials=None):
+        counters = self.cache.get_many(get_client_cache_keys(request, credentials))
+        return max(counters.values(), default=0)
+
+    def user_login_failed(self, sender, credentials, request=None, **kwargs):
+        if request is None:
+            logger.error("Login failure without a request cannot be tracked")
+            return
+
+        username = get_client_username(request, credentials)
+        if get_lockout_parameters(request, credentials) == ["username"] and (
+            username is None
+        ):
+            return
+
+        if (
+            request.axes_locked_out
+            and not settings.AXES_RESET_COOL_OFF_ON_FAILURE_DURING_LOCKOUT
+        ):
+            # Counting it would extend the lockout
+            self.lock_out(request, credentials, username)
+            return
+
+        if self.is_whitelisted(request, credentials):
+            return
+
+        timeout = get_cache_timeout(request)
+        failures = max(
+            count_failure(self.cache, key, timeout)
+            for key in get_client_cache_keys(request, credentials)
+        )
+        request.axes_failures_since_start = failures
+
+        if settings.AXES_LOCK_OUT_AT_FAILURE and failures >= get_failure_limit(
+            request, credentials
+        ):
+            logger.warning(
+                "Locking out %s after %d failed logins",
+                get_client_str(
+                    username,
+                    request.axes_ip_address,
+                    request.axes_user_agent,
+                    request.axes_path_info,
+                    request,
+                ),
+                failures,
+            )
+            self.lock_out(request, credentials, username)
+
+    def lock_out(self, request, credentials, username):
+        request.axes_locked_out = True
+        request.axes_credentials = credentials
+        user_locked_out.send(
+            "axes",
+            request=request,
+            username=username,
+            ip_address=request.axes_ip_address,
+        )
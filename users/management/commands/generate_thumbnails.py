@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from users.thumbnails import generate_thumbnails
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the missing thumbnails of profile pictures, e.g. of pictures"
+        " uploaded before thumbnails or while the server restarted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Generate again the thumbnails of every picture, e.g. of new sizes",
+        )
+
+    def handle(self, *args, **options):
+        users = (
+            User.objects.exclude(profile_picture="")
+            .exclude(profile_picture=None)
+            .only("profile_picture", "profile_picture_thumbnails")
+            .order_by("pk")
+        )
+        # Users sharing a picture are updated together
+        done = set()
+        generated = failed = 0
+        for user in users.iterator(chunk_size=500):
+            name = user.profile_picture.name
+            if name in done or (
+                not options["all"]
+                and user.profile_picture_thumbnails.get("source") == name
+            ):
+                continue
+            done.add(name)
+
+            try:
+                generate_thumbnails(User, name)
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f"Skipped {name}: {error}")
+            else:
+                generated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated the thumbnails of {generated} pictures, {failed} failed"
+            )
+        )
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the expired outstanding tokens, and their blacklist entries,"
+        " in batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to wait between batches, sparing the database",
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep pruning every this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            deleted = self.prune(options["batch_size"], options["pause"])
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens"))
+
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
+
+    def prune(self, batch_size, pause):
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+        deleted = 0
+        while True:
+            # Short transactions, so logins inserting tokens never wait long
+            with transaction.atomic():
+                pks = list(expired.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    return deleted
+                # Nothing listens to blacklist deletions, so the cascade is
+                # one bulk delete rather than one per row
+                OutstandingToken.objects.filter(pk__in=pks).delete()
+            deleted += len(pks)
+            time.sleep(pause)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:22
+
+import core.storage
+import users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_profile_picture_thumbnails"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="profile_picture",
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=core.storage.get_blob_storage,
+                upload_to=users.models.upload_profile_picture_to,
+            ),
+        ),
+    ]
@@ -6,6 +6,7 @@ from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
 
 from core.models import BaseModel
+from core.storage import get_blob_storage
 
 
 def upload_profile_picture_to(instance, filename):
@@ -13,6 +14,11 @@ def upload_profile_picture_to(instance, filename):
     return f"profile-pictures/{uuid.uuid4()}.{ext}"
 
 
+def profile_picture_thumbnail_name(name, size, extension):
+    root = name.rsplit(".", 1)[0]
+    return f"{root}_{size}.{extension}"
+
+
 class UserManager(BaseUserManager):
     def create_user(
         self, email, first_name=None, last_name=None, password=None, **extra_fields
@@ -84,8 +90,13 @@ class User(AbstractUser, BaseModel):
     email = models.EmailField(unique=True)
     username = models.CharField(max_length=30, blank=True, null=True)
     profile_picture = models.ImageField(
-        upload_to=upload_profile_picture_to, blank=True, null=True
+        upload_to=upload_profile_picture_to,
+        storage=get_blob_storage,
+        blank=True,
+        null=True,
     )
+    # Set by users.thumbnails
+    profile_picture_thumbnails = models.JSONField(default=dict, blank=True)
     first_name = models.CharField(max_length=30, null=False)
     last_name = models.CharField(max_length=30, null=False)
     bio = models.TextField(blank=True, null=True)
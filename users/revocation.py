@@ -0,0 +1,213 @@
+"""Cache-resident set of the revoked refresh tokens.
+
+Refresh and verify calls look token ids up in a Bloom filter of the
+blacklisted, unexpired tokens, kept in the shared cache. Each worker keeps
+a copy while the version stored next to the filter is unchanged, so a
+lookup costs one cache read. The filter alone accepts almost every token.
+The few it reports as maybe revoked are checked against the exact set of
+revoked ids in the shared cache, or the database when evicted.
+
+Blacklisting a token adds its id to the filter and the exact set, under a
+lock so concurrent revocations are never lost. The filter is rebuilt from
+the database once it expires or fills up, which drops the expired tokens.
+Blacklist entries deleted otherwise than by expiry, e.g. in the admin,
+stay revoked until then.
+
+Every worker must see the same cache, see users.checks.
+"""
+
+import hashlib
+import logging
+import math
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+logger = logging.getLogger(__name__)
+
+FILTER_KEY = "users.revocation.filter"
+VERSION_KEY = "users.revocation.version"
+LOCK_KEY = "users.revocation.lock"
+EXACT_KEY_PREFIX = "users.revocation.jti"
+LOCK_POLL_INTERVAL = 0.05
+# Filters leave room for as many revocations as they were built with
+MIN_CAPACITY = 1024
+
+FilterEntry = namedtuple("FilterEntry", ["version", "revocations"])
+
+# This worker's copy of the filter
+_local_entry = None
+
+
+class BloomFilter:
+    """
+    Set membership with false positives at `error_rate`, and no false
+    negatives, in about 10 bits per item at 1%.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.count = 0
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def positions(self, item):
+        # Double hashing derives every position from two 64-bit hashes
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        self.count += 1
+        for position in self.positions(item):
+            self.bits[position // 8] |= 1 << position % 8
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position // 8] & 1 << position % 8
+            for position in self.positions(item)
+        )
+
+
+def get_exact_key(jti):
+    return f"{EXACT_KEY_PREFIX}:{jti}"
+
+
+@contextmanager
+def filter_lock():
+    """
+    Holds the lock of the shared filter, yielding whether it was acquired
+    within the lock timeout.
+    """
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    locked = cache.add(LOCK_KEY, 1, timeout=settings.CACHE_LOCK_TIMEOUT)
+    while not locked and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        locked = cache.add(LOCK_KEY, 1, timeout=settings.CACHE_LOCK_TIMEOUT)
+    try:
+        yield locked
+    finally:
+        if locked:
+            cache.delete(LOCK_KEY)
+
+
+def build_filter():
+    """
+    Returns the filter of the unexpired blacklisted tokens.
+    """
+    jtis = list(
+        BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list("token__jti", flat=True)
+    )
+    revocations = BloomFilter(
+        max(len(jtis) * 2, MIN_CAPACITY), settings.TOKEN_REVOCATION_ERROR_RATE
+    )
+    for jti in jtis:
+        revocations.add(jti)
+    return revocations
+
+
+def store_filter(revocations):
+    entry = FilterEntry(uuid.uuid4().hex, revocations)
+    cache.set_many(
+        {FILTER_KEY: entry, VERSION_KEY: entry.version},
+        timeout=settings.CACHE_RESPONSE_TIMEOUT,
+    )
+    return entry
+
+
+def get_shared_entry():
+    entries = cache.get_many([FILTER_KEY, VERSION_KEY])
+    entry = entries.get(FILTER_KEY)
+    if entry is None or entry.version != entries.get(VERSION_KEY):
+        return None
+    return entry
+
+
+def get_filter():
+    global _local_entry
+
+    version = cache.get(VERSION_KEY)
+    entry = _local_entry
+    if version is not None and entry is not None and entry.version == version:
+        return entry.revocations
+
+    entry = get_shared_entry()
+    if entry is None:
+        with filter_lock() as locked:
+            if not locked:
+                # Correct, only not shared
+                return build_filter()
+            # Another worker may have rebuilt it while this one waited
+            entry = get_shared_entry() or store_filter(build_filter())
+
+    _local_entry = entry
+    return entry.revocations
+
+
+def revoke(jti):
+    """
+    Adds `jti` to the exact set and the filter of the revoked tokens.
+    """
+    cache.set(get_exact_key(jti), True, timeout=settings.CACHE_RESPONSE_TIMEOUT)
+    with filter_lock() as locked:
+        if not locked:
+            logger.warning("Rebuilding the token revocation filter, it is locked")
+            cache.delete_many([FILTER_KEY, VERSION_KEY])
+            return
+
+        entry = get_shared_entry()
+        # Rebuilt from the database, which has the token, when next read
+        if entry is None:
+            return
+        revocations = entry.revocations
+        if revocations.count >= revocations.capacity:
+            cache.delete_many([FILTER_KEY, VERSION_KEY])
+            return
+        revocations.add(jti)
+        store_filter(revocations)
+
+
+def is_revoked(jti):
+    if jti not in get_filter():
+        return False
+
+    exact_key = get_exact_key(jti)
+    revoked = cache.get(exact_key)
+    if revoked is None:
+        # A false positive of the filter, or an evicted id
+        revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        cache.set(exact_key, revoked, timeout=settings.CACHE_RESPONSE_TIMEOUT)
+    return revoked
+
+
+def _on_blacklisted(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: revoke(jti))
+
+
+def track_revocations():
+    """
+    Add the tokens blacklisted from now on to the revocation set. Call
+    from `AppConfig.ready()`.
+    """
+    post_save.connect(
+        _on_blacklisted,
+        sender=BlacklistedToken,
+        dispatch_uid="track_revocations",
+    )
@@ -1,17 +1,30 @@
+import posixpath
 import re
 
 from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import models
 from djoser import serializers as djoser_serializers
 from djoser.social.serializers import (
     ProviderAuthSerializer as BaseProviderAuthSerializer,
 )
 from drf_spectacular.utils import extend_schema_field
 from phonenumber_field.serializerfields import PhoneNumberField
+from PIL import Image
 from rest_framework import serializers
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.serializers import (
     TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
 )
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+)
+from rest_framework_simplejwt.serializers import (
+    TokenVerifySerializer as BaseTokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 
 from basedata.models import Position
 from basedata.serializers import (
@@ -19,10 +32,29 @@ from basedata.serializers import (
     RoleSerializer,
 )
 from config import settings
-from users.models import Role
+from core.media import (
+    MediaImageField,
+    MediaURLListSerializer,
+    get_context_media_url,
+)
+from core.models import Blob
+from core.storage import hash_file
+from core.uploads import check_upload, create_upload, load_upload
+from users.claims import add_role_claims
+from users.models import Role, upload_profile_picture_to
+from users.revocation import is_revoked
+from users.tokens import RefreshToken
 
 User = get_user_model()
 
+# Pillow's format of each content type accepted for profile pictures
+PROFILE_PICTURE_FORMATS = {
+    "image/jpeg": "JPEG",
+    "image/png": "PNG",
+    "image/webp": "WEBP",
+    "image/gif": "GIF",
+}
+
 
 class ProviderAuthSerializer(BaseProviderAuthSerializer):
     def validate(self, attrs):
@@ -39,10 +71,12 @@ class ProviderAuthSerializer(BaseProviderAuthSerializer):
 
 
 class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    token_class = RefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token["user_role"] = user.groups.first().name if user.groups.exists() else None
+        add_role_claims(token, user)
         return token
 
     def validate(self, attrs):
@@ -56,6 +90,21 @@ class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
         return data
 
 
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+class TokenVerifySerializer(BaseTokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and is_revoked(jti):
+            raise serializers.ValidationError("Token is blacklisted")
+
+        return {}
+
+
 class UserCreateSerializer(djoser_serializers.UserCreateSerializer):
     class Meta(djoser_serializers.UserCreateSerializer.Meta):
         model = User
@@ -98,15 +147,24 @@ class UserSerializer(djoser_serializers.UserSerializer):
     phone_number = PhoneNumberField(required=False, allow_blank=True, allow_null=True)
     is_active = serializers.BooleanField(source="is_not_deactivated", required=False)
     position = PositionBasicSerializer(read_only=True)
+    profile_picture_thumbnails = serializers.SerializerMethodField()
+
+    serializer_field_mapping = {
+        **djoser_serializers.UserSerializer.serializer_field_mapping,
+        models.ImageField: MediaImageField,
+    }
 
     class Meta:
         model = User
+        # The URLs of a page of users are generated at once
+        list_serializer_class = MediaURLListSerializer
         fields = [
             "id",
             "first_name",
             "last_name",
             "email",
             "profile_picture",
+            "profile_picture_thumbnails",
             "bio",
             "phone_number",
             "position",
@@ -131,6 +189,47 @@ class UserSerializer(djoser_serializers.UserSerializer):
         user_role = user.groups.first()
         return RoleSerializer(user_role).data if user_role else None
 
+    @extend_schema_field(
+        {
+            "type": "object",
+            "description": (
+                "URLs of the square thumbnails by size then format, "
+                "empty until they are generated."
+            ),
+            "additionalProperties": {
+                "type": "object",
+                "properties": {
+                    "webp": {"type": "string", "format": "uri"},
+                    "jpeg": {"type": "string", "format": "uri"},
+                },
+            },
+        }
+    )
+    def get_profile_picture_thumbnails(self, user):
+        return {
+            size: {
+                extension: get_context_media_url(self.context, name)
+                for extension, name in names.items()
+            }
+            for size, names in self.get_current_thumbnails(user).items()
+        }
+
+    def get_current_thumbnails(self, user):
+        thumbnails = user.profile_picture_thumbnails
+        # Thumbnails of a previous picture are ignored
+        if not user.profile_picture or (
+            thumbnails.get("source") != user.profile_picture.name
+        ):
+            return {}
+        return thumbnails["sizes"]
+
+    def get_media_names(self, user):
+        thumbnails = self.get_current_thumbnails(user)
+        return [
+            user.profile_picture.name,
+            *(name for names in thumbnails.values() for name in names.values()),
+        ]
+
 
 class ProfilePictureSerializer(serializers.ModelSerializer):
     class Meta:
@@ -138,6 +237,87 @@ class ProfilePictureSerializer(serializers.ModelSerializer):
         fields = ["profile_picture"]
 
 
+class DirectUploadSerializer(serializers.Serializer):
+    upload_id = serializers.CharField()
+    name = serializers.CharField()
+    url = serializers.URLField()
+    method = serializers.CharField()
+    fields = serializers.DictField(child=serializers.CharField())
+    expires_at = serializers.DateTimeField()
+
+
+class ProfilePictureUploadSerializer(serializers.Serializer):
+    content_type = serializers.ChoiceField(choices=list(PROFILE_PICTURE_FORMATS))
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        if value > settings.PROFILE_PICTURE_MAX_SIZE:
+            raise serializers.ValidationError(
+                "Profile pictures must not be larger than "
+                f"{settings.PROFILE_PICTURE_MAX_SIZE} bytes."
+            )
+        return value
+
+    def save(self):
+        user = self.context["user"]
+        content_type = self.validated_data["content_type"]
+        extension = PROFILE_PICTURE_FORMATS[content_type].lower()
+        return create_upload(
+            self.context["request"],
+            upload_profile_picture_to(user, f"profile-picture.{extension}"),
+            content_type,
+            self.validated_data["size"],
+            user=str(user.pk),
+        )
+
+
+class ProfilePictureConfirmSerializer(serializers.Serializer):
+    upload_id = serializers.CharField()
+
+    def validate_upload_id(self, value):
+        upload = load_upload(value)
+        if upload.get("user") != str(self.context["user"].pk):
+            raise serializers.ValidationError("Invalid upload.")
+        return upload
+
+    def validate(self, attrs):
+        upload = attrs["upload_id"]
+        check_upload(upload)
+        try:
+            with default_storage.open(upload["name"]) as file:
+                image = Image.open(file)
+                image_format = image.format
+                image.verify()
+                file.seek(0)
+                attrs["digest"], _ = hash_file(file)
+        except (OSError, SyntaxError, Image.DecompressionBombError) as error:
+            default_storage.delete(upload["name"])
+            raise serializers.ValidationError(
+                {"upload_id": "The file is not a valid image."}
+            ) from error
+
+        if image_format != PROFILE_PICTURE_FORMATS[upload["content_type"]]:
+            default_storage.delete(upload["name"])
+            raise serializers.ValidationError(
+                {"upload_id": f"The file is not of type {upload['content_type']}."}
+            )
+        return attrs
+
+    def save(self):
+        user = self.context["user"]
+        name = self.validated_data["upload_id"]["name"]
+        # Confirming the same upload again leaves the picture as it is
+        if Blob.objects.filter(
+            digest=self.validated_data["digest"], name=user.profile_picture.name
+        ).exists():
+            return user
+        # Copied, the upload is left to `prune_uploads`
+        with default_storage.open(name) as file:
+            user.profile_picture.save(posixpath.basename(name), File(file), save=False)
+        user.save(update_fields=["profile_picture", "updated_date"])
+        return user
+
+
 class RolesAssignSerializer(serializers.Serializer):
     role = serializers.PrimaryKeyRelatedField(
         queryset=Role.objects.all(), required=False
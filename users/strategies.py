@@ -1,14 +1,12 @@
-from rest_framework_simplejwt.tokens import RefreshToken
+from users.claims import add_role_claims
+from users.tokens import RefreshToken
 
 
 class TokenStrategy:
     @classmethod
     def obtain(cls, user):
         refresh = RefreshToken.for_user(user)
-
-        refresh.payload["user_role"] = (
-            user.groups.first().name if user.groups.exists() else None
-        )
+        add_role_claims(refresh, user)
 
         return {
             "refresh": str(refresh),
@@ -0,0 +1,287 @@
+import base64
+import io
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from minio import Minio
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from core.models import Blob
+from core.tests.helpers import TemporaryMediaMixin, make_image
+from core.uploads import create_upload
+from users.models import Role
+from users.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+
+class DirectProfilePictureUploadTestCase(TemporaryMediaMixin, APITestCase):
+    """
+    Uploads through the filesystem stand-in of presigned URLs.
+    """
+
+    def setUp(self):
+        super().setUp()
+        Role.objects.create(name="Not-Assigned")
+        self.user = User.objects.create_user(
+            email="user@email.com",
+            password="1234abcd!A",
+            first_name="Test",
+            last_name="User",
+        )
+        self.other_user = User.objects.create_user(
+            email="other@email.com",
+            password="1234abcd!A",
+            first_name="Other",
+            last_name="User",
+        )
+        self.authenticate(self.user)
+        self.request_url = reverse(
+            "user-me-request-profile-picture-upload", kwargs={"version": "v1"}
+        )
+        self.confirm_url = reverse(
+            "user-me-confirm-profile-picture-upload", kwargs={"version": "v1"}
+        )
+
+    def authenticate(self, user):
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def request_upload(self, content_type="image/jpeg", size=1024):
+        response = self.client.post(
+            self.request_url, {"content_type": content_type, "size": size}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def upload(self, ticket, content, content_type=None):
+        fields = dict(ticket["fields"])
+        if content_type:
+            fields["Content-Type"] = content_type
+        return self.client.post(
+            urlsplit(ticket["url"]).path,
+            {**fields, "file": SimpleUploadedFile("picture", content)},
+            format="multipart",
+        )
+
+    def confirm(self, ticket):
+        return self.client.post(self.confirm_url, {"upload_id": ticket["upload_id"]})
+
+    def test_upload_and_confirm_profile_picture(self):
+        """
+        Ensure a picture posted to the upload URL is attached once confirmed.
+        """
+        ticket = self.request_upload()
+        self.assertEqual(ticket["method"], "POST")
+        self.assertTrue(ticket["name"].startswith("uploads/profile-pictures/"))
+
+        response = self.upload(ticket, make_image().read())
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.profile_picture.name.startswith("blobs/"))
+        self.assertTrue(self.user.profile_picture.name.endswith(".jpeg"))
+        self.assertIn(self.user.profile_picture.name, response.data["profile_picture"])
+        self.assertTrue(default_storage.exists(self.user.profile_picture.name))
+
+        # Confirming again is harmless
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        blob = Blob.objects.get()
+        self.assertEqual(blob.name, self.user.profile_picture.name)
+        self.assertEqual(blob.ref_count, 1)
+
+    def test_confirm_duplicate_again(self):
+        """
+        Ensure an upload of a picture already stored can be confirmed again,
+        without referring to the stored picture twice.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_user.profile_picture.save("picture.jpeg", make_image())
+        ticket = self.request_upload()
+        self.upload(ticket, make_image().read())
+
+        for _ in range(2):
+            response = self.confirm(ticket)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.other_user.refresh_from_db()
+        self.assertEqual(
+            self.user.profile_picture.name, self.other_user.profile_picture.name
+        )
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+
+    def test_request_upload_of_other_user(self):
+        """
+        Ensure an admin can request the upload of another user's picture.
+        """
+        Role.objects.create(name="Super-Admin")
+        admin = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.authenticate(admin)
+        url = reverse(
+            "user-request-profile-picture-upload",
+            kwargs={"version": "v1", "id": self.other_user.pk},
+        )
+        ticket = self.client.post(url, {"content_type": "image/png", "size": 1024}).data
+        self.upload(ticket, make_image("PNG").read())
+
+        url = reverse(
+            "user-confirm-profile-picture-upload",
+            kwargs={"version": "v1", "id": self.other_user.pk},
+        )
+        response = self.client.post(url, {"upload_id": ticket["upload_id"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.other_user.refresh_from_db()
+        self.assertTrue(self.other_user.profile_picture.name.endswith(".png"))
+
+    def test_request_upload_limits(self):
+        """
+        Ensure uploads of other types or over the size limit are refused.
+        """
+        response = self.client.post(
+            self.request_url, {"content_type": "text/plain", "size": 10}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            self.request_url, {"content_type": "image/png", "size": 10**9}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_url_enforces_limits(self):
+        """
+        Ensure the upload URL refuses other types, larger files and
+        tampered upload ids, as a POST policy would.
+        """
+        ticket = self.request_upload(size=100)
+        image = make_image().read()
+
+        response = self.upload(ticket, image[:50], content_type="image/png")
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        response = self.upload(ticket, image)
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        ticket["url"] = ticket["url"][:-2]
+        response = self.upload(ticket, image[:50])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_confirm_checks_the_uploaded_file(self):
+        """
+        Ensure missing files, non images and images of another type are not
+        attached, and invalid files are deleted.
+        """
+        ticket = self.request_upload()
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.upload(ticket, b"not an image")
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(default_storage.exists(ticket["name"]))
+
+        self.upload(ticket, make_image("PNG").read())
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(default_storage.exists(ticket["name"]))
+
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.profile_picture)
+
+    def test_confirm_upload_of_another_user(self):
+        """
+        Ensure an upload can only be confirmed for the user it was issued to.
+        """
+        ticket = self.request_upload()
+        self.upload(ticket, make_image().read())
+
+        self.authenticate(self.other_user)
+        response = self.confirm(ticket)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.other_user.refresh_from_db()
+        self.assertFalse(self.other_user.profile_picture)
+
+    def test_uploads_are_pruned(self):
+        """
+        Ensure uploads are deleted once they can no longer be confirmed,
+        and confirmed pictures are kept.
+        """
+        confirmed = self.request_upload()
+        self.upload(confirmed, make_image().read())
+        self.confirm(confirmed)
+        abandoned = self.request_upload()
+        self.upload(abandoned, make_image("PNG").read())
+        recent = self.request_upload()
+        self.upload(recent, make_image().read())
+
+        expired = time.time() - settings.DIRECT_UPLOAD_EXPIRY * 2 - 60
+        for ticket in [confirmed, abandoned]:
+            os.utime(default_storage.path(ticket["name"]), (expired, expired))
+        output = io.StringIO()
+        call_command("prune_uploads", stdout=output)
+
+        self.assertIn("Deleted 2 uploads", output.getvalue())
+        self.assertFalse(default_storage.exists(confirmed["name"]))
+        self.assertFalse(default_storage.exists(abandoned["name"]))
+        self.assertTrue(default_storage.exists(recent["name"]))
+        self.user.refresh_from_db()
+        self.assertTrue(default_storage.exists(self.user.profile_picture.name))
+
+
+class MinioUploadTestCase(APITestCase):
+    def test_presigned_post_policy(self):
+        """
+        Ensure MinIO storages hand out a POST policy of the bucket bounding
+        the object's name, type and size.
+        """
+        client = Minio(
+            "minio.example.com",
+            access_key="access",
+            secret_key="secret",  # noqa: S106
+            region="us-east-1",
+        )
+        storages = {
+            "default": {
+                "BACKEND": "minio_storage.storage.MinioStorage",
+                "OPTIONS": {
+                    "minio_client": client,
+                    "bucket_name": "media",
+                    "assume_bucket_exists": True,
+                },
+            },
+        }
+        with override_settings(STORAGES=storages):
+            request = APIRequestFactory().post("/")
+            ticket = create_upload(request, "profile-pictures/a.png", "image/png", 100)
+
+        self.assertEqual(ticket.url, "https://minio.example.com/media/")
+        self.assertEqual(ticket.method, "POST")
+        self.assertEqual(ticket.fields["key"], "uploads/profile-pictures/a.png")
+        self.assertEqual(ticket.fields["Content-Type"], "image/png")
+        self.assertIn("x-amz-signature", ticket.fields)
+
+        policy = json.loads(base64.b64decode(ticket.fields["policy"]))
+        conditions = policy["conditions"]
+        self.assertIn(["eq", "$key", "uploads/profile-pictures/a.png"], conditions)
+        self.assertIn(["eq", "$Content-Type", "image/png"], conditions)
+        self.assertIn(["content-length-range", 1, 100], conditions)
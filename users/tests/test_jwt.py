@@ -2,6 +2,7 @@ import logging
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.core.cache import caches
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
@@ -16,6 +17,8 @@ class JWTTestCase(APITestCase):
         logging.getLogger("axes").setLevel(logging.CRITICAL)
         logging.getLogger("axes.handlers").setLevel(logging.CRITICAL)
         logging.getLogger("axes.models").setLevel(logging.CRITICAL)
+        logging.getLogger("users.lockout").setLevel(logging.CRITICAL)
+        caches["lockout"].clear()
 
         # Create a test user
         Group.objects.create(name="Not-Assigned")
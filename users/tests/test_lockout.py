@@ -0,0 +1,146 @@
+import logging
+import time
+from unittest import mock
+
+from axes.handlers.proxy import AxesProxyHandler
+from axes.models import AccessAttempt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from users.checks import check_lockout_cache
+from users.lockout import count_failure
+
+User = get_user_model()
+
+
+class CacheLockoutTestCase(APITestCase):
+    def setUp(self):
+        logging.getLogger("axes").setLevel(logging.CRITICAL)
+        logging.getLogger("users.lockout").setLevel(logging.CRITICAL)
+        self.cache = caches[settings.AXES_CACHE]
+        self.cache.clear()
+
+        Group.objects.create(name="Not-Assigned")
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.user.is_active = True
+        self.user.save()
+
+        self.login_url = reverse("jwt-create", kwargs={"version": "v1"})
+        self.invalid_data = {
+            "email": "testuser@example.com",
+            "password": "wrongpassword",
+        }
+        self.valid_data = {
+            "email": "testuser@example.com",
+            "password": "testpassword123",
+        }
+
+    def login(self, data, ip_address="10.0.0.1"):
+        client = APIClient(REMOTE_ADDR=ip_address)
+        return client.post(self.login_url, data, format="json")
+
+    def test_failures_are_counted_in_cache(self):
+        """
+        Ensure failed logins are counted in the cache without AccessAttempt rows.
+        """
+        for _ in range(settings.AXES_FAILURE_LIMIT - 1):
+            response = self.login(self.invalid_data)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.assertFalse(AccessAttempt.objects.exists())
+        response = self.login(self.valid_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lockout_response(self):
+        """
+        Ensure a locked out client gets the lockout response.
+        """
+        for _ in range(settings.AXES_FAILURE_LIMIT):
+            self.login(self.invalid_data)
+
+        response = self.login(self.valid_data)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response.json()["status_code"], 429)
+        self.assertIn("temporarily locked", response.json()["errors"]["detail"])
+
+    def test_burst_of_failed_logins(self):
+        """
+        Ensure a burst of failed logins is rejected without database queries
+        or password hashing once locked out, at many times the throughput of
+        the logins checked, while other clients can still log in.
+        """
+        limit = settings.AXES_FAILURE_LIMIT
+        started = time.perf_counter()
+        responses = [self.login(self.invalid_data) for _ in range(limit)]
+        checked_rate = limit / (time.perf_counter() - started)
+        started = time.perf_counter()
+        responses += [self.login(self.invalid_data) for _ in range(50 - limit)]
+        rejected_rate = (50 - limit) / (time.perf_counter() - started)
+
+        self.assertEqual(
+            [response.status_code for response in responses[: limit - 1]],
+            [status.HTTP_401_UNAUTHORIZED] * (limit - 1),
+        )
+        self.assertEqual(
+            [response.status_code for response in responses[limit:]],
+            [status.HTTP_429_TOO_MANY_REQUESTS] * (50 - limit),
+        )
+        self.assertGreater(
+            rejected_rate,
+            checked_rate * 10,
+            f"{rejected_rate:.0f} rejected logins/s, "
+            f"{checked_rate:.1f} checked logins/s",
+        )
+        with self.assertNumQueries(0):
+            response = self.login(self.valid_data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertFalse(AccessAttempt.objects.exists())
+
+        response = self.login(self.valid_data, ip_address="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_count_failure(self):
+        """
+        Ensure failure counters start at 1 and increment.
+        """
+        self.assertEqual(count_failure(self.cache, "failures", 60), 1)
+        self.assertEqual(count_failure(self.cache, "failures", 60), 2)
+        self.cache.delete("failures")
+        self.assertEqual(count_failure(self.cache, "failures", 60), 1)
+
+    def test_lockout_is_seen_by_other_cache_clients(self):
+        """
+        Ensure a lockout recorded through one cache client is enforced by a
+        worker holding another client of the same cache.
+        """
+        for _ in range(settings.AXES_FAILURE_LIMIT):
+            self.login(self.invalid_data)
+
+        handler = AxesProxyHandler.get_implementation()
+        other_cache = caches.create_connection(settings.AXES_CACHE)
+        self.assertIsNot(other_cache, handler.cache)
+        with mock.patch.object(handler, "cache", other_cache):
+            response = self.login(self.valid_data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_process_local_cache_with_several_workers(self):
+        """
+        Ensure a process-local lockout cache is reported with several workers.
+        """
+        with override_settings(SERVER_WORKERS=4):
+            self.assertEqual(
+                [error.id for error in check_lockout_cache(None)], ["users.W001"]
+            )
+        self.assertEqual(check_lockout_cache(None), [])
@@ -0,0 +1,110 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.test import APITestCase
+
+from users.hashers import PasswordHashingBusy, executor
+
+User = get_user_model()
+
+
+@override_settings(
+    ALLOWED_EMAIL_DOMAINS=["icog.et"],
+    PASSWORD_HASHING_CONCURRENCY=1,
+    PASSWORD_HASHING_QUEUE_TIMEOUT=0.05,
+)
+class PasswordHashingTestCase(APITestCase):
+    def setUp(self):
+        caches["lockout"].clear()
+        Group.objects.create(name="Not-Assigned")
+        self.user = User.objects.create_user(
+            email="test.user@icog.et",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.user.is_active = True
+        self.user.save()
+
+        self.login_url = reverse("jwt-create", kwargs={"version": "v1"})
+        self.register_url = reverse("user-signup", kwargs={"version": "v1"})
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def occupy_pool(self):
+        """
+        Blocks the only hashing slot until the test ends.
+        """
+        executor.get_executor().submit(self.release.wait)
+
+    def get_metric(self, name):
+        return REGISTRY.get_sample_value(name) or 0
+
+    def test_hashes_are_compatible(self):
+        """
+        Ensure hashes made on the pool verify and keep Django's format.
+        """
+        encoded = make_password("testpassword123")
+
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$"))
+        self.assertTrue(check_password("testpassword123", encoded))
+        self.assertFalse(check_password("wrongpassword", encoded))
+
+    def test_queue_timeout(self):
+        """
+        Ensure a hash waiting too long for a slot is rejected and counted.
+        """
+        rejections = self.get_metric("api_password_hash_rejections_total")
+        self.occupy_pool()
+
+        with self.assertRaises(PasswordHashingBusy) as context:
+            make_password("testpassword123")
+        # Callers outside of DRF don't get an API exception
+        self.assertNotIsInstance(context.exception, APIException)
+        self.assertEqual(context.exception.wait, 1)
+
+        self.assertEqual(
+            self.get_metric("api_password_hash_rejections_total"), rejections + 1
+        )
+        self.assertEqual(self.get_metric("api_password_hash_queue_depth"), 0)
+
+    def test_login_when_busy(self):
+        """
+        Ensure logins get a 503 response while the pool is busy and succeed
+        once it frees up.
+        """
+        data = {"email": "test.user@icog.et", "password": "testpassword123"}
+        self.occupy_pool()
+
+        response = self.client.post(self.login_url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(response.json()["status_code"], 503)
+
+        self.release.set()
+        response = self.client.post(self.login_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_signup_when_busy(self):
+        """
+        Ensure signups get a 503 response without creating the user while the
+        pool is busy.
+        """
+        data = {"email": "new.user@icog.et", "password": "newpassword123"}
+        self.occupy_pool()
+
+        response = self.client.post(self.register_url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(User.objects.filter(email="new.user@icog.et").exists())
@@ -0,0 +1,119 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.tests.helpers import TemporaryMediaMixin, make_image
+from users.models import Role
+from users.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+
+@override_settings(PROFILE_PICTURE_THUMBNAIL_SIZES=[32, 128])
+class ProfilePictureThumbnailsTestCase(TemporaryMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        Role.objects.create(name="Not-Assigned")
+        self.user = User.objects.create_user(
+            email="user@email.com",
+            password="1234abcd!A",
+            first_name="Test",
+            last_name="User",
+        )
+        token = TokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def set_picture(self, content, filename="picture.jpg"):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile_picture.save(filename, content)
+        self.user.refresh_from_db()
+
+    def get_thumbnails(self):
+        response = self.client.get(reverse("user-me", kwargs={"version": "v1"}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["profile_picture_thumbnails"]
+
+    def test_thumbnails_of_new_picture(self):
+        """
+        Ensure square WebP and JPEG thumbnails of each size are stored next to
+        a new picture and listed by the serializer.
+        """
+        self.set_picture(make_image(size=(300, 200)))
+        picture = self.user.profile_picture.name
+        root = picture.rsplit(".", 1)[0]
+
+        thumbnails = self.get_thumbnails()
+        self.assertEqual(set(thumbnails), {"32", "128"})
+        for size, urls in thumbnails.items():
+            self.assertEqual(set(urls), {"webp", "jpeg"})
+            for extension, url in urls.items():
+                name = f"{root}_{size}.{extension}"
+                self.assertTrue(url.endswith(name))
+                with default_storage.open(name) as file:
+                    image = Image.open(file)
+                    self.assertEqual(image.size, (int(size), int(size)))
+                    self.assertEqual(image.format, extension.upper())
+
+    def test_thumbnails_of_transparent_picture(self):
+        """
+        Ensure pictures with transparency get JPEG thumbnails too.
+        """
+        self.set_picture(make_image("PNG", mode="RGBA"), filename="picture.png")
+        self.assertEqual(set(self.get_thumbnails()["32"]), {"webp", "jpeg"})
+
+    def test_thumbnails_of_previous_picture_are_ignored(self):
+        """
+        Ensure thumbnails are hidden once the picture changes, until those of
+        the new picture are generated.
+        """
+        self.set_picture(make_image())
+        # Replaced without generating its thumbnails, e.g. before a restart
+        User.objects.filter(pk=self.user.pk).update(
+            profile_picture=default_storage.save(
+                "profile-pictures/new.jpg", make_image()
+            )
+        )
+        self.assertEqual(self.get_thumbnails(), {})
+
+        call_command("generate_thumbnails", stdout=io.StringIO())
+        thumbnails = self.get_thumbnails()
+        self.assertIn("profile-pictures/new_32.webp", thumbnails["32"]["webp"])
+
+    def test_invalid_picture_keeps_no_thumbnails(self):
+        """
+        Ensure a picture that cannot be read gets no thumbnails, without
+        failing the request that set it.
+        """
+        with self.assertLogs("users.thumbnails", "ERROR"):
+            self.set_picture(ContentFile(b"not an image"))
+        self.assertEqual(self.user.profile_picture_thumbnails, {})
+        self.assertEqual(self.get_thumbnails(), {})
+
+    def test_backfill_command(self):
+        """
+        Ensure the command generates the missing thumbnails only, unless asked
+        to generate all of them again.
+        """
+        name = default_storage.save("profile-pictures/old.jpg", make_image())
+        User.objects.filter(pk=self.user.pk).update(profile_picture=name)
+
+        output = io.StringIO()
+        call_command("generate_thumbnails", stdout=output)
+        self.assertIn("Generated the thumbnails of 1 pictures", output.getvalue())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_picture_thumbnails["source"], name)
+
+        call_command("generate_thumbnails", stdout=output)
+        self.assertIn("Generated the thumbnails of 0 pictures", output.getvalue())
+
+        with override_settings(PROFILE_PICTURE_THUMBNAIL_SIZES=[48]):
+            call_command("generate_thumbnails", "--all", stdout=output)
+        self.assertEqual(set(self.get_thumbnails()), {"48"})
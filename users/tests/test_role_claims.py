@@ -0,0 +1,182 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from basedata.models import Department, Position
+from tasks.models import KSI
+from users.checks import check_role_claims_cache
+from users.models import Role
+from users.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+
+@override_settings(TOKEN_ROLE_CLAIMS=True)
+class RoleClaimsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        self.leads_role = Role.objects.create(name="Leads")
+        self.experts_role = Role.objects.create(name="Experts")
+        for role in [self.leads_role, self.experts_role]:
+            role.permissions.add(*Permission.objects.filter(codename="view_ksi"))
+
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        self.lead_user = User.objects.create_user(
+            email="lead@email.com",
+            password="1234abcd!A",
+            first_name="Lead",
+            last_name="User",
+        )
+        self.lead_user.is_active = True
+        self.lead_user.groups.set([self.leads_role])
+
+        self.department = Department.objects.create(
+            department_name="Engineering",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.department2 = Department.objects.create(
+            department_name="HR",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.position = Position.objects.create(
+            department=self.department,
+            position_name="Engineer",
+            created_by=self.admin_user,
+            updated_by=self.admin_user,
+        )
+        self.lead_user.position = self.position
+        self.lead_user.save()
+
+        for department in [self.department, self.department2]:
+            KSI.objects.create(
+                ksi_name=f"{department.department_name} initiative",
+                start_date="2024-01-01",
+                end_date="2024-12-31",
+                department=department,
+                status="not_started",
+                created_by=self.admin_user,
+                updated_by=self.admin_user,
+            )
+
+        self.refresh = TokenObtainPairSerializer.get_token(self.lead_user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+        self.list_url = reverse("ksi-list", kwargs={"version": "v1"})
+
+    def get_ksi_names(self):
+        response = self.client.get(self.list_url, {"ordering": "ksi_name"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [ksi["name"] for ksi in response.data["results"]]
+
+    def test_claims_are_signed(self):
+        """
+        Ensure access tokens carry the roles, department and position.
+        """
+        access = self.refresh.access_token
+
+        self.assertEqual(access["user_role"], "Leads")
+        self.assertEqual(access["roles"], ["Leads"])
+        self.assertEqual(access["department_id"], str(self.department.id))
+        self.assertEqual(access["position_id"], str(self.position.id))
+        self.assertTrue(access["role_version"])
+
+    def test_user_role_is_the_first_role(self):
+        """
+        Ensure `user_role` is the role created first, however the roles are
+        stored.
+        """
+        self.lead_user.groups.set([self.experts_role, self.leads_role])
+        access = TokenObtainPairSerializer.get_token(self.lead_user).access_token
+
+        self.assertEqual(access["user_role"], "Leads")
+        self.assertEqual(access["roles"], ["Leads", "Experts"])
+
+    def test_process_local_cache(self):
+        """
+        Ensure role claims with a process-local cache are reported when serving
+        with several workers.
+        """
+        with override_settings(SERVER_WORKERS=4):
+            self.assertEqual(
+                [error.id for error in check_role_claims_cache(None)], ["users.W003"]
+            )
+            with override_settings(TOKEN_ROLE_CLAIMS=False):
+                self.assertEqual(check_role_claims_cache(None), [])
+        self.assertEqual(check_role_claims_cache(None), [])
+
+    def test_scoping_reads_claims(self):
+        """
+        Ensure role scoping doesn't query the user's roles or position.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            names = self.get_ksi_names()
+
+        self.assertEqual(names, ["Engineering initiative"])
+        sql = "\n".join(query["sql"] for query in queries)
+        self.assertNotIn('"auth_group"."name"', sql)
+        self.assertNotIn('FROM "basedata_position"', sql)
+
+    def test_role_change_distrusts_claims(self):
+        """
+        Ensure a role change takes effect on tokens issued before it.
+        """
+        self.lead_user.groups.set([self.experts_role])
+
+        self.assertEqual(
+            self.get_ksi_names(), ["Engineering initiative", "HR initiative"]
+        )
+
+    def test_position_change_distrusts_claims(self):
+        """
+        Ensure a move to another department takes effect on tokens issued
+        before it.
+        """
+        self.position.department = self.department2
+        self.position.save()
+
+        self.assertEqual(self.get_ksi_names(), ["HR initiative"])
+
+    def test_refresh_updates_claims(self):
+        """
+        Ensure refreshing after a role change issues up to date claims.
+        """
+        self.lead_user.groups.set([self.experts_role])
+
+        response = self.client.post(
+            reverse("jwt-refresh", kwargs={"version": "v1"}),
+            {"refresh": str(self.refresh)},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        with CaptureQueriesContext(connection) as queries:
+            self.get_ksi_names()
+        sql = "\n".join(query["sql"] for query in queries)
+        self.assertNotIn('"auth_group"."name"', sql)
+
+    @override_settings(TOKEN_ROLE_CLAIMS=False)
+    def test_claims_disabled(self):
+        """
+        Ensure only the role is signed when role claims are disabled.
+        """
+        access = TokenObtainPairSerializer.get_token(self.lead_user).access_token
+
+        self.assertEqual(access["user_role"], "Leads")
+        self.assertNotIn("role_version", access)
+        self.assertEqual(self.get_ksi_names(), ["Engineering initiative"])
@@ -0,0 +1,181 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from users import revocation
+from users.checks import check_revocation_cache
+from users.revocation import BloomFilter
+from users.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class BloomFilterTestCase(APITestCase):
+    def test_membership(self):
+        """
+        Ensure added items are always found and others rarely are.
+        """
+        revocations = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            revocations.add(f"revoked-{index}")
+
+        self.assertTrue(all(f"revoked-{index}" in revocations for index in range(1000)))
+        false_positives = sum(f"valid-{index}" in revocations for index in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TokenRevocationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Group.objects.create(name="Not-Assigned")
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+        self.user.is_active = True
+        self.user.save()
+
+        self.refresh_url = reverse("jwt-refresh", kwargs={"version": "v1"})
+        self.verify_url = reverse("jwt-verify", kwargs={"version": "v1"})
+
+    def refresh(self, token):
+        return self.client.post(self.refresh_url, {"refresh": str(token)})
+
+    def test_refresh_skips_blacklist_table(self):
+        """
+        Ensure refreshing a valid token doesn't query the blacklist once the
+        revocation set is cached.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            RefreshToken.for_user(self.user).blacklist()
+        token = RefreshToken.for_user(self.user)
+        self.refresh(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if BlacklistedToken._meta.db_table in query["sql"]
+            ]
+        )
+
+    def test_blacklisted_token_is_rejected(self):
+        """
+        Ensure a token blacklisted after the revocation set was cached can
+        neither be refreshed nor verified.
+        """
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(self.verify_url, {"token": str(token)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_revocation_is_added_to_the_shared_filter(self):
+        """
+        Ensure blacklisting adds the token to the shared filter without
+        rebuilding it, and workers holding a copy see the new version.
+        """
+        token = RefreshToken.for_user(self.user)
+        self.assertEqual(self.refresh(token).status_code, status.HTTP_200_OK)
+        stale_copy = revocation._local_entry
+
+        with mock.patch.object(
+            revocation, "build_filter", wraps=revocation.build_filter
+        ) as build_filter:
+            with self.captureOnCommitCallbacks(execute=True):
+                token.blacklist()
+            # A worker that read the filter before the revocation
+            revocation._local_entry = stale_copy
+            self.assertTrue(revocation.is_revoked(token["jti"]))
+        build_filter.assert_not_called()
+        self.assertNotEqual(revocation._local_entry.version, stale_copy.version)
+
+    def test_process_local_cache_with_several_workers(self):
+        """
+        Ensure a process-local cache is reported with several workers.
+        """
+        with override_settings(SERVER_WORKERS=4):
+            self.assertEqual(
+                [error.id for error in check_revocation_cache(None)], ["users.W002"]
+            )
+        self.assertEqual(check_revocation_cache(None), [])
+
+    def test_verify_valid_token(self):
+        """
+        Ensure valid refresh and access tokens verify.
+        """
+        token = RefreshToken.for_user(self.user)
+
+        for value in [token, token.access_token]:
+            response = self.client.post(self.verify_url, {"token": str(value)})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class PruneTokensTestCase(APITestCase):
+    def setUp(self):
+        Group.objects.create(name="Not-Assigned")
+        self.user = User.objects.create_user(
+            email="testuser@example.com",
+            password="testpassword123",
+            first_name="Test",
+            last_name="User",
+        )
+
+    def create_token(self, index, expires_in):
+        now = timezone.now()
+        return OutstandingToken.objects.create(
+            user=self.user,
+            jti=f"jti-{index}",
+            token=f"token-{index}",
+            created_at=now - timedelta(days=8),
+            expires_at=now + expires_in,
+        )
+
+    def test_expired_tokens_are_pruned(self):
+        """
+        Ensure expired tokens and their blacklist entries are deleted in
+        batches, keeping the unexpired ones.
+        """
+        expired = [self.create_token(index, timedelta(days=-1)) for index in range(5)]
+        unexpired = self.create_token(5, timedelta(days=1))
+        BlacklistedToken.objects.create(token=expired[0])
+        BlacklistedToken.objects.create(token=unexpired)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command("prune_tokens", "--batch-size=2", "--pause=0", stdout=out)
+
+        # One delete of the blacklist entries and one of the tokens per batch
+        deletes = [query for query in queries if query["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 6)
+
+        self.assertIn("Deleted 5 expired tokens", out.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.all()), [unexpired])
+        self.assertEqual(BlacklistedToken.objects.get().token, unexpired)
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import media
+from core.media import local_urls
+from core.tests.helpers import TemporaryMediaMixin, make_image
+from users.models import Role
+from users.serializers import TokenObtainPairSerializer
+
+User = get_user_model()
+
+
+@override_settings(PROFILE_PICTURE_THUMBNAIL_SIZES=[32])
+class UserMediaURLsTestCase(TemporaryMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        local_urls.clear()
+
+        Role.objects.create(name="Super-Admin")
+        Role.objects.create(name="Not-Assigned")
+        self.admin_user = User.objects.create_superuser(
+            email="admin@email.com",
+            password="1234abcd!A",
+            first_name="Admin",
+            last_name="User",
+        )
+        for index, color in enumerate(["red", "green", "blue"]):
+            user = User.objects.create_user(
+                email=f"user{index}@email.com",
+                password="1234abcd!A",
+                first_name="Test",
+                last_name="User",
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                user.profile_picture.save("picture.jpg", make_image(color=color))
+
+        token = TokenObtainPairSerializer.get_token(self.admin_user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("user-list", kwargs={"version": "v1"})
+
+    def test_list_generates_urls_in_one_batch(self):
+        """
+        Ensure a page of users generates its media URLs in one batch, and
+        the next pages reuse the cached ones.
+        """
+        generate_url = mock.Mock(wraps=media.generate_url)
+        get_media_urls = mock.Mock(wraps=media.get_media_urls)
+        with mock.patch.multiple(
+            media, generate_url=generate_url, get_media_urls=get_media_urls
+        ):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(get_media_urls.call_count, 1)
+            # A picture and two thumbnails per user
+            self.assertEqual(generate_url.call_count, 9)
+
+            response = self.client.get(self.url)
+            self.assertEqual(generate_url.call_count, 9)
+
+        results = response.data["results"]
+        users = {user.email: user for user in User.objects.all()}
+        for result in results:
+            user = users[result["email"]]
+            if not user.profile_picture:
+                self.assertIsNone(result["profile_picture"])
+                continue
+            self.assertEqual(
+                result["profile_picture"],
+                f"http://testserver/media/{user.profile_picture.name}",
+            )
+            thumbnails = user.profile_picture_thumbnails["sizes"]["32"]
+            self.assertEqual(
+                result["profile_picture_thumbnails"]["32"]["webp"],
+                f"http://testserver/media/{thumbnails['webp']}",
+            )
+
+    def test_retrieve_uses_cached_urls(self):
+        """
+        Ensure a single user is represented with the cached URLs too.
+        """
+        user = User.objects.exclude(pk=self.admin_user.pk).first()
+        url = reverse("user-detail", kwargs={"version": "v1", "id": user.pk})
+        self.client.get(self.url)
+        with mock.patch.object(
+            media, "generate_url", wraps=media.generate_url
+        ) as generate_url:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(generate_url.call_count, 0)
+        self.assertTrue(
+            response.data["profile_picture"].endswith(user.profile_picture.name)
+        )
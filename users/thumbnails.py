@@ -0,0 +1,127 @@
+"""Thumbnails of profile pictures, generated in the background.
+
+Once a new profile picture is committed, square thumbnails of each of
+`PROFILE_PICTURE_THUMBNAIL_SIZES` are stored next to it in WebP and JPEG,
+and recorded in `User.profile_picture_thumbnails` along with the picture
+they were made from. Until then clients get the original picture only.
+
+Each process generates thumbnails on `PROFILE_PICTURE_THUMBNAIL_WORKERS`
+threads, or in the request with 0 workers. Thumbnails lost to a restart
+are made up for by the `generate_thumbnails` command.
+"""
+
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+from core.executors import ProcessExecutor
+from core.versions import bump_model_version
+from users.models import profile_picture_thumbnail_name
+
+logger = logging.getLogger(__name__)
+
+# Pillow's format and save options by file extension
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+def make_thumbnails(name):
+    """
+    Stores the thumbnails of the picture `name` and returns their names, by
+    size then extension.
+    """
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    # JPEG has no transparency, composite it over white
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        opaque = Image.new("RGB", image.size, "white")
+        opaque.paste(image, mask=image.getchannel("A"))
+    else:
+        opaque = image.convert("RGB")
+
+    thumbnails = {}
+    for size in settings.PROFILE_PICTURE_THUMBNAIL_SIZES:
+        thumbnail = ImageOps.fit(opaque, (size, size), Image.Resampling.LANCZOS)
+        thumbnails[str(size)] = {}
+        for extension, (image_format, options) in THUMBNAIL_FORMATS.items():
+            content = io.BytesIO()
+            thumbnail.save(content, format=image_format, **options)
+            thumbnail_name = profile_picture_thumbnail_name(name, size, extension)
+            # Generating again overwrites the previous thumbnails
+            default_storage.delete(thumbnail_name)
+            thumbnails[str(size)][extension] = default_storage.save(
+                thumbnail_name, ContentFile(content.getvalue())
+            )
+    return thumbnails
+
+
+def generate_thumbnails(user_model, name):
+    """
+    Generates the thumbnails of the picture `name` and records them on the
+    users still having it.
+    """
+    thumbnails = make_thumbnails(name)
+    # A conditional update, as the picture may have changed meanwhile
+    updated = user_model.objects.filter(profile_picture=name).update(
+        profile_picture_thumbnails={"source": name, "sizes": thumbnails}
+    )
+    if updated:
+        bump_model_version(user_model)
+    return thumbnails
+
+
+class ThumbnailExecutor(ProcessExecutor):
+    def __init__(self):
+        super().__init__("PROFILE_PICTURE_THUMBNAIL_WORKERS", "thumbnails")
+
+    def submit(self, user_model, name):
+        if not settings.PROFILE_PICTURE_THUMBNAIL_WORKERS:
+            self.run(user_model, name)
+            return
+        self.get_executor().submit(self.run, user_model, name, close_connection=True)
+
+    def run(self, user_model, name, close_connection=False):
+        try:
+            generate_thumbnails(user_model, name)
+        except Exception:
+            # The picture stays usable, and the backfill command retries
+            logger.exception("Could not generate the thumbnails of %s", name)
+        finally:
+            if close_connection:
+                connection.close()
+
+
+executor = ThumbnailExecutor()
+
+
+def _on_user_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and "profile_picture" not in update_fields):
+        return
+    name = instance.profile_picture.name
+    if not name or instance.profile_picture_thumbnails.get("source") == name:
+        return
+    transaction.on_commit(lambda: executor.submit(sender, name))
+
+
+def generate_thumbnails_on_change(user_model):
+    """
+    Generate the thumbnails of new profile pictures once committed.
+    Call from `AppConfig.ready()`.
+    """
+    post_save.connect(
+        _on_user_saved,
+        sender=user_model,
+        dispatch_uid="generate_thumbnails_on_change",
+    )
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from users.claims import add_role_claims, get_token_role_claims
+from users.revocation import is_revoked
+
+
+class RefreshToken(BaseRefreshToken):
+    def check_blacklist(self):
+        """
+        Checks the blacklist through the cache-resident revocation set.
+        """
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    @property
+    def access_token(self):
+        access = super().access_token
+
+        # Claims copied from a refresh token issued before a role change
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if (
+            settings.TOKEN_ROLE_CLAIMS
+            and user_id
+            and get_token_role_claims(access, user_id) is None
+        ):
+            user = (
+                get_user_model()
+                .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+                .first()
+            )
+            if user:
+                add_role_claims(access, user)
+        return access
@@ -16,10 +16,14 @@ from rest_framework_simplejwt.views import (
 
 from config import settings
 from core.permissions import HasRole
+from users.claims import get_role_claims, has_role
 from users.filters import UserFilter
 from users.serializers import (
+    DirectUploadSerializer,
     PositionAssignSerializer,
+    ProfilePictureConfirmSerializer,
     ProfilePictureSerializer,
+    ProfilePictureUploadSerializer,
     ProviderAuthSerializer,
     RolesAssignSerializer,
     TokenObtainPairSerializer,
@@ -169,18 +173,13 @@ class UserViewSet(DjoserUserViewSet):
     ]
 
     def get_queryset(self):
-        user = self.request.user
-        user_is_lead = user.groups.filter(name="Leads").exists()
-        user_is_hr = user.groups.filter(name="HR").exists()
-
-        if (
-            self.action == "list"
-            and user_is_lead
-            and user.position
-            and user.position.department
-        ):
+        claims = get_role_claims(self.request)
+        user_is_lead = has_role(self.request, "Leads")
+        user_is_hr = has_role(self.request, "HR")
+
+        if self.action == "list" and user_is_lead and claims.department_id:
             return User.objects.filter(
-                position__department=user.position.department, is_active=True
+                position__department=claims.department_id, is_active=True
             )
 
         if self.action in ["list", "assign_position"] and user_is_hr:
@@ -246,7 +245,9 @@ class UserViewSet(DjoserUserViewSet):
         """Custom user creation endpoint at /users/signup/"""
         return super().create(request, *args, **kwargs)
 
-    @extend_schema(request=ProfilePictureSerializer, responses=UserSerializer)
+    @extend_schema(
+        request=ProfilePictureSerializer, responses=UserSerializer, deprecated=True
+    )
     @action(detail=True, methods=["post"], url_path="upload_profile_picture")
     def upload_profile_picture(self, request, pk=None, *args, **kwargs):
         user = self.get_object()
@@ -257,7 +258,9 @@ class UserViewSet(DjoserUserViewSet):
         user_serializer = UserSerializer(user, context={"request": request})
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
-    @extend_schema(request=ProfilePictureSerializer, responses=UserSerializer)
+    @extend_schema(
+        request=ProfilePictureSerializer, responses=UserSerializer, deprecated=True
+    )
     @action(detail=False, methods=["post"], url_path="me/upload_profile_picture")
     def me_upload_profile_picture(self, request, *args, **kwargs):
         user = request.user
@@ -268,6 +271,65 @@ class UserViewSet(DjoserUserViewSet):
         user_serializer = UserSerializer(user, context={"request": request})
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
+    def request_upload(self, request, user):
+        serializer = ProfilePictureUploadSerializer(
+            data=request.data, context={"request": request, "user": user}
+        )
+        serializer.is_valid(raise_exception=True)
+        ticket = serializer.save()
+        return Response(
+            DirectUploadSerializer(ticket._asdict()).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    def confirm_upload(self, request, user):
+        serializer = ProfilePictureConfirmSerializer(
+            data=request.data, context={"user": user}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        user_serializer = UserSerializer(user, context={"request": request})
+        return Response(user_serializer.data, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        description=(
+            "Returns a URL and form fields to POST the profile picture to, "
+            "then confirm the upload with its upload_id."
+        ),
+        request=ProfilePictureUploadSerializer,
+        responses={201: DirectUploadSerializer},
+    )
+    @action(detail=True, methods=["post"], url_path="request_profile_picture_upload")
+    def request_profile_picture_upload(self, request, pk=None, *args, **kwargs):
+        return self.request_upload(request, self.get_object())
+
+    @extend_schema(
+        description=(
+            "Returns a URL and form fields to POST the profile picture to, "
+            "then confirm the upload with its upload_id."
+        ),
+        request=ProfilePictureUploadSerializer,
+        responses={201: DirectUploadSerializer},
+    )
+    @action(
+        detail=False, methods=["post"], url_path="me/request_profile_picture_upload"
+    )
+    def me_request_profile_picture_upload(self, request, *args, **kwargs):
+        return self.request_upload(request, request.user)
+
+    @extend_schema(request=ProfilePictureConfirmSerializer, responses=UserSerializer)
+    @action(detail=True, methods=["post"], url_path="confirm_profile_picture_upload")
+    def confirm_profile_picture_upload(self, request, pk=None, *args, **kwargs):
+        return self.confirm_upload(request, self.get_object())
+
+    @extend_schema(request=ProfilePictureConfirmSerializer, responses=UserSerializer)
+    @action(
+        detail=False, methods=["post"], url_path="me/confirm_profile_picture_upload"
+    )
+    def me_confirm_profile_picture_upload(self, request, *args, **kwargs):
+        return self.confirm_upload(request, request.user)
+
     @extend_schema(request=RolesAssignSerializer, responses=UserSerializer)
     @action(
         detail=True,